@@ -0,0 +1,14 @@
+"""
+Put the helpers shared by the GCP tutorials on sys.path.
+
+Helpers used by both tutorials live once in Cloud Knowledge/GCP/shared (see
+its README). Import this module before importing any of them.
+"""
+
+import sys
+from pathlib import Path
+
+SHARED_DIR = Path(__file__).resolve().parents[3] / "shared"
+
+if str(SHARED_DIR) not in sys.path:
+    sys.path.append(str(SHARED_DIR))
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+asyncio-native uploads to Google Cloud Storage.
+
+google-cloud-storage is blocking, so an asyncio service has to push every
+upload into a thread. This module talks to the Cloud Storage JSON API with
+aiohttp instead, so thousands of uploads can be in flight on one event loop;
+a semaphore caps how many requests are active at once.
+
+    • upload_bytes:  single-request media upload for in-memory payloads
+    • upload_stream: resumable upload of an (async) iterator of chunks
+    • upload_file:   local file; small files as one request, larger ones
+                     streamed in chunks (disk reads run in the default executor)
+
+Prerequisites:
+    pip install aiohttp google-auth
+
+Usage:
+    import asyncio
+    from async_upload import AsyncGCSUploader
+
+    async def main():
+        async with AsyncGCSUploader(max_concurrency=200) as uploader:
+            await asyncio.gather(*(
+                uploader.upload_bytes("my-bucket", f"events/{i}.json", payload)
+                for i, payload in enumerate(payloads)
+            ))
+
+    asyncio.run(main())
+"""
+
+import asyncio
+import mimetypes
+import os
+from pathlib import Path
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Optional, Union
+
+import google.auth
+from google.api_core import exceptions
+from google.auth.transport.requests import Request
+from google.oauth2 import service_account
+
+import _shared  # noqa: F401  (puts the shared helpers on sys.path)
+from gcs_client_pool import is_emulator_endpoint, resolve_api_endpoint
+from instrumentation import get_instrumentation
+from resumable_upload import DEFAULT_CHUNK_SIZE, RESUME_INCOMPLETE, validate_chunk_size
+
+try:
+    import aiohttp
+except ImportError:  # Optional dependency, only needed for the async API
+    aiohttp = None
+
+
+DEFAULT_API_ENDPOINT = "https://storage.googleapis.com"
+DEFAULT_MAX_CONCURRENCY = 64
+DEFAULT_TIMEOUT_SECONDS = 300
+
+SCOPES = ["https://www.googleapis.com/auth/devstorage.read_write"]
+
+Chunks = Union[AsyncIterable[bytes], Iterable[bytes]]
+
+
+async def _aiter_chunks(chunks: Chunks) -> AsyncIterator[bytes]:
+    """Iterate sync or async chunk sources uniformly."""
+    if hasattr(chunks, "__aiter__"):
+        async for chunk in chunks:
+            yield chunk
+    else:
+        for chunk in chunks:
+            yield chunk
+
+
+async def _raise_for_status(response) -> None:
+    """Translate an error response into a google.api_core exception."""
+    if response.status < 400:
+        return
+    message = await response.text()
+    raise exceptions.from_http_status(response.status, f"{response.method} {response.url}: {message}")
+
+
+class AsyncGCSUploader:
+    """Non-blocking Cloud Storage uploader built on aiohttp."""
+
+    def __init__(
+        self,
+        credentials_path: Optional[str] = None,
+        credentials=None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        api_endpoint: Optional[str] = None,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+    ):
+        """
+        Initialize uploader.
+
+        Args:
+            credentials_path: Service account key file (optional, defaults to
+                GOOGLE_APPLICATION_CREDENTIALS / Application Default Credentials)
+            credentials: Pre-built google.auth credentials (optional, overrides
+                credentials_path)
+            max_concurrency: Maximum number of upload requests in flight
+            chunk_size: Bytes per request for streamed uploads (multiple of 256 KiB)
+            api_endpoint: JSON API endpoint (optional, defaults to
+                STORAGE_EMULATOR_HOST); plain-HTTP emulator endpoints don't
+                need credentials
+            timeout: Total timeout per HTTP request in seconds
+        """
+        if aiohttp is None:
+            raise ImportError("The async upload API requires: pip install aiohttp")
+        validate_chunk_size(chunk_size)
+        api_endpoint = resolve_api_endpoint(api_endpoint)
+
+        if credentials is None:
+            if is_emulator_endpoint(api_endpoint) and not credentials_path:
+                from google.auth.credentials import AnonymousCredentials
+
+                credentials = AnonymousCredentials()
+            elif credentials_path:
+                credentials = service_account.Credentials.from_service_account_file(
+                    credentials_path, scopes=SCOPES
+                )
+            else:
+                credentials, _ = google.auth.default(scopes=SCOPES)
+
+        self.credentials = credentials
+        self.chunk_size = chunk_size
+        self.api_endpoint = (api_endpoint or DEFAULT_API_ENDPOINT).rstrip("/")
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._limit = max_concurrency
+        self._token_lock = asyncio.Lock()
+        self._session: Optional["aiohttp.ClientSession"] = None
+
+    async def __aenter__(self) -> "AsyncGCSUploader":
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def open(self) -> None:
+        """Create the shared HTTP session (one connection pool for all uploads)."""
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self._limit, limit_per_host=self._limit)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+
+    async def close(self) -> None:
+        """Close the HTTP session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _auth_headers(self) -> Dict[str, str]:
+        """Return an Authorization header, refreshing the token if needed."""
+        if not self.credentials.valid:
+            async with self._token_lock:
+                if not self.credentials.valid:
+                    # Token refresh is a blocking HTTP call, but only happens
+                    # about once an hour
+                    loop = asyncio.get_running_loop()
+                    await loop.run_in_executor(None, self.credentials.refresh, Request())
+
+        token = getattr(self.credentials, "token", None)
+        return {"Authorization": f"Bearer {token}"} if token else {}
+
+    def _upload_url(self, bucket_name: str) -> str:
+        return f"{self.api_endpoint}/upload/storage/v1/b/{bucket_name}/o"
+
+    async def _upload_bytes(
+        self,
+        bucket_name: str,
+        blob_name: str,
+        data: bytes,
+        content_type: Optional[str],
+    ) -> Dict[str, Any]:
+        await self.open()
+        headers = await self._auth_headers()
+        headers["Content-Type"] = content_type or "application/octet-stream"
+
+        async with self._session.post(
+            self._upload_url(bucket_name),
+            params={"uploadType": "media", "name": blob_name},
+            data=data,
+            headers=headers,
+        ) as response:
+            await _raise_for_status(response)
+            return await response.json()
+
+    async def upload_bytes(
+        self,
+        bucket_name: str,
+        blob_name: str,
+        data: bytes,
+        content_type: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Upload an in-memory payload in a single request.
+
+        Args:
+            bucket_name: Name of the GCS bucket
+            blob_name: Destination object name
+            data: Payload
+            content_type: MIME type (optional)
+
+        Returns:
+            Object resource returned by the server
+        """
+        async with self._semaphore:
+            return await self._traced(
+                bucket_name, blob_name, self._upload_bytes(bucket_name, blob_name, data, content_type)
+            )
+
+    async def _start_session(
+        self,
+        bucket_name: str,
+        blob_name: str,
+        content_type: Optional[str],
+    ) -> str:
+        headers = await self._auth_headers()
+        if content_type:
+            headers["X-Upload-Content-Type"] = content_type
+
+        async with self._session.post(
+            self._upload_url(bucket_name),
+            params={"uploadType": "resumable"},
+            json={"name": blob_name},
+            headers=headers,
+        ) as response:
+            await _raise_for_status(response)
+            return response.headers["Location"]
+
+    async def _put_chunk(self, session_url: str, data: bytes, offset: int, total: Optional[int]):
+        """Send one chunk; returns (committed bytes, object resource or None)."""
+        total_str = "*" if total is None else str(total)
+        if data:
+            content_range = f"bytes {offset}-{offset + len(data) - 1}/{total_str}"
+        else:
+            content_range = f"bytes */{total_str}"
+
+        headers = await self._auth_headers()
+        headers["Content-Range"] = content_range
+
+        hooks = get_instrumentation()
+        with hooks.span("gcs.upload.chunk",
+                        {"gcs.upload.offset": offset, "gcs.upload.chunk_bytes": len(data)}):
+            async with self._session.put(session_url, data=data, headers=headers) as response:
+                if response.status in (200, 201):
+                    resource = await response.json()
+                    committed = int(resource.get("size", 0))
+                elif response.status == RESUME_INCOMPLETE:
+                    range_header = response.headers.get("Range")
+                    committed = int(range_header.rsplit("-", 1)[1]) + 1 if range_header else 0
+                    resource = None
+                else:
+                    await _raise_for_status(response)
+                    raise exceptions.from_http_status(
+                        response.status, "Unexpected resumable upload response"
+                    )
+
+        if hooks.enabled:
+            hooks.add("gcs.upload.chunk.bytes_sent", len(data))
+            if resource is None and committed < offset + len(data):
+                hooks.add("gcs.upload.chunk.uncommitted_bytes", offset + len(data) - committed)
+        return committed, resource
+
+    async def _traced(self, bucket_name: str, blob_name: str, upload) -> Dict[str, Any]:
+        """Await an upload coroutine inside a "gcs.upload" span."""
+        hooks = get_instrumentation()
+        with hooks.span("gcs.upload", {"gcs.bucket": bucket_name, "gcs.object": blob_name},
+                        {"gcs.upload.source": "async"}):
+            resource = await upload
+        if hooks.enabled:
+            hooks.add("gcs.upload.bytes", int(resource.get("size", 0)),
+                      {"gcs.upload.source": "async"})
+        return resource
+
+    async def _upload_stream(
+        self,
+        bucket_name: str,
+        blob_name: str,
+        chunks: Chunks,
+        content_type: Optional[str],
+    ) -> Dict[str, Any]:
+        await self.open()
+        session_url = await self._start_session(bucket_name, blob_name, content_type)
+
+        chunk_size = self.chunk_size
+        source = _aiter_chunks(chunks)
+        buffer = bytearray()
+        offset = 0
+        exhausted = False
+
+        while True:
+            # Buffer more than one chunk so we know whether the next one is the last
+            while not exhausted and len(buffer) <= chunk_size:
+                try:
+                    buffer += await source.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+
+            if exhausted and len(buffer) <= chunk_size:
+                committed, resource = await self._put_chunk(
+                    session_url, bytes(buffer), offset, offset + len(buffer)
+                )
+                if resource is not None:
+                    return resource
+                # Part of the last chunk was committed: resend the rest below
+                if committed <= offset:
+                    raise IOError("Server did not commit any of the last chunk")
+            else:
+                committed, resource = await self._put_chunk(
+                    session_url, bytes(buffer[:chunk_size]), offset, None
+                )
+                if resource is not None:
+                    return resource
+                if committed <= offset:
+                    raise IOError(f"Server did not commit any of the chunk at byte {offset}")
+            del buffer[:committed - offset]
+            offset = committed
+
+    async def upload_stream(
+        self,
+        bucket_name: str,
+        blob_name: str,
+        chunks: Chunks,
+        content_type: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Upload an iterator or async iterator of bytes through a resumable session.
+
+        Memory is bounded by about one chunk_size buffer per upload.
+
+        Args:
+            bucket_name: Name of the GCS bucket
+            blob_name: Destination object name
+            chunks: Iterable or async iterable of bytes chunks
+            content_type: MIME type (optional)
+
+        Returns:
+            Object resource returned by the server
+        """
+        async with self._semaphore:
+            return await self._traced(
+                bucket_name, blob_name, self._upload_stream(bucket_name, blob_name, chunks, content_type)
+            )
+
+    async def _read_file_chunks(self, path: str) -> AsyncIterator[bytes]:
+        """Read a file in chunk_size blocks without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        with open(path, "rb") as f:
+            while True:
+                data = await loop.run_in_executor(None, f.read, self.chunk_size)
+                if not data:
+                    return
+                yield data
+
+    async def upload_file(
+        self,
+        bucket_name: str,
+        source_file_path: str,
+        blob_name: Optional[str] = None,
+        content_type: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Upload a local file.
+
+        Args:
+            bucket_name: Name of the GCS bucket
+            source_file_path: Path to the local file
+            blob_name: Destination object name (optional, defaults to the file name)
+            content_type: MIME type (optional, guessed from the file name)
+
+        Returns:
+            Object resource returned by the server
+        """
+        blob_name = blob_name or Path(source_file_path).name
+        content_type = content_type or mimetypes.guess_type(source_file_path)[0]
+
+        async with self._semaphore:
+            if os.path.getsize(source_file_path) <= self.chunk_size:
+                loop = asyncio.get_running_loop()
+                data = await loop.run_in_executor(None, Path(source_file_path).read_bytes)
+                upload = self._upload_bytes(bucket_name, blob_name, data, content_type)
+            else:
+                upload = self._upload_stream(
+                    bucket_name, blob_name, self._read_file_chunks(source_file_path), content_type
+                )
+            return await self._traced(bucket_name, blob_name, upload)
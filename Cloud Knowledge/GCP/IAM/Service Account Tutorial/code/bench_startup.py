@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Startup-time budget check for this tutorial's CLI entry points.
+
+Each target runs in a fresh interpreter with `python -X importtime` and
+fails the check if it is over budget or imports a heavy client library just
+to start up (see startup_budget.py in Cloud Knowledge/GCP/shared).
+
+Usage:
+    python bench_startup.py
+    python bench_startup.py --budget-ms 100 --runs 10
+    python bench_startup.py --json
+    python bench_startup.py --target "upload_to_gcs.py --help" --target "-c 'import bulk_upload'"
+"""
+
+import sys
+from pathlib import Path
+
+import _shared  # noqa: F401  (puts the shared helpers on sys.path)
+from startup_budget import run_startup_check
+
+CODE_DIR = Path(__file__).resolve().parent
+
+# Arguments passed to the interpreter for each target, run from CODE_DIR
+DEFAULT_TARGETS = [
+    "upload_to_gcs.py --help",
+]
+
+
+if __name__ == "__main__":
+    sys.exit(run_startup_check(CODE_DIR, DEFAULT_TARGETS))
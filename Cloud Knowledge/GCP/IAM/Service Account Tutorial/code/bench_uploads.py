@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Benchmark the upload paths against the local Cloud Storage emulator.
+
+Cases (each for every size class at every --concurrency level):
+
+    • upload_file:   upload_file_to_gcs from a local file
+    • upload_string: upload_string_to_gcs from memory
+
+Files at or above --composite-threshold take the parallel composite path,
+so it can be exercised with small files too. The emulator runs in-process
+and is reached through STORAGE_EMULATOR_HOST, exactly as a developer would
+point the CLI at it; use the fault options to give it realistic latency.
+Results are JSON (p50/p95/p99/mean/max latency in ms, ops/sec and MiB/s),
+and --baseline compares them with an earlier run.
+
+Usage:
+    python bench_uploads.py
+    python bench_uploads.py --sizes 4KiB,1MiB,32MiB --concurrency 1,8 --output bench.json
+    python bench_uploads.py --latency-ms 10 --baseline bench.json
+    python bench_uploads.py --case upload_file --sizes 16MiB --composite-threshold 8MiB
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List
+
+import _shared  # noqa: F401  (puts the shared helpers on sys.path)
+from bench_harness import (
+    BenchResult,
+    add_report_arguments,
+    finish_report,
+    install_instrumentation,
+    parse_int_list,
+    parse_size,
+    run_benchmark,
+)
+from composite_upload import DEFAULT_COMPOSITE_THRESHOLD
+from fault_injection import add_fault_arguments, fault_injector_from_args
+from gcs_client_pool import clear_client_pool
+from gcs_emulator import GCSEmulator
+from upload_to_gcs import upload_file_to_gcs, upload_string_to_gcs
+
+BUCKET = "bench-bucket"
+MIB = 1024 * 1024
+
+# Objects are overwritten in rotation so the emulator's memory stays bounded
+OBJECT_SLOTS = 8
+
+DEFAULT_OPS = 100
+DEFAULT_SIZES = "1KiB,64KiB,1MiB"
+DEFAULT_CONCURRENCY = "1,4,16"
+
+CASES = ("upload_file", "upload_string")
+
+
+def _with_throughput(result: BenchResult, size: int) -> BenchResult:
+    result.counters["mib_s"] = round(result.ops_per_sec * size / MIB, 2)
+    return result
+
+
+def bench_upload_file(
+    source: Path,
+    size: int,
+    ops: int,
+    concurrency: int,
+    composite_threshold: int
+) -> BenchResult:
+    def operation(i: int) -> bool:
+        return upload_file_to_gcs(
+            BUCKET, str(source), f"bench/file/{size}/{i % OBJECT_SLOTS}",
+            composite_threshold=composite_threshold
+        )
+
+    result = run_benchmark("upload_file", operation, ops, concurrency, warmup=1,
+                           params={"size": size})
+    return _with_throughput(result, size)
+
+
+def bench_upload_string(content: str, ops: int, concurrency: int) -> BenchResult:
+    size = len(content)
+
+    def operation(i: int) -> bool:
+        return upload_string_to_gcs(BUCKET, content, f"bench/string/{size}/{i % OBJECT_SLOTS}")
+
+    result = run_benchmark("upload_string", operation, ops, concurrency, warmup=1,
+                           params={"size": size})
+    return _with_throughput(result, size)
+
+
+def main() -> int:
+    """Run the selected cases and write the report."""
+    parser = argparse.ArgumentParser(description="Benchmark uploads against a local GCS emulator")
+    parser.add_argument("--case", action="append", choices=CASES,
+                        help="Case to run (repeatable; default: all)")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help=f"Comma-separated payload sizes (default: {DEFAULT_SIZES})")
+    parser.add_argument("--concurrency", type=parse_int_list, default=parse_int_list(DEFAULT_CONCURRENCY),
+                        help=f"Comma-separated thread counts (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--ops", type=int, default=DEFAULT_OPS,
+                        help=f"Uploads per case (default: {DEFAULT_OPS})")
+    parser.add_argument("--composite-threshold", type=parse_size, default=DEFAULT_COMPOSITE_THRESHOLD,
+                        help="Smallest file uploaded as parallel composite parts "
+                             f"(default: {DEFAULT_COMPOSITE_THRESHOLD // MIB} MiB)")
+    add_fault_arguments(parser)
+    add_report_arguments(parser)
+    args = parser.parse_args()
+    install_instrumentation(args)
+
+    cases = args.case or list(CASES)
+    sizes = [parse_size(size) for size in args.sizes.split(",") if size.strip()]
+    results: List[BenchResult] = []
+
+    with GCSEmulator(faults=fault_injector_from_args(args)) as emulator, \
+            tempfile.TemporaryDirectory() as tmp:
+        os.environ["STORAGE_EMULATOR_HOST"] = emulator.endpoint
+        clear_client_pool()
+
+        # The upload functions narrate every upload; keep stdout for the report
+        with open(os.devnull, "w") as devnull:
+            for size in sizes:
+                if "upload_file" in cases:
+                    source = Path(tmp) / f"payload-{size}.bin"
+                    source.write_bytes(os.urandom(size))
+                    for concurrency in args.concurrency:
+                        with contextlib.redirect_stdout(devnull):
+                            results.append(bench_upload_file(
+                                source, size, args.ops, concurrency, args.composite_threshold
+                            ))
+
+                if "upload_string" in cases:
+                    content = "x" * size
+                    for concurrency in args.concurrency:
+                        with contextlib.redirect_stdout(devnull):
+                            results.append(bench_upload_string(content, args.ops, concurrency))
+
+        faults = emulator.faults.stats()
+        clear_client_pool()
+
+    config: Dict[str, Any] = {
+        "ops": args.ops,
+        "sizes": sizes,
+        "composite_threshold": args.composite_threshold,
+        "latency_ms": args.latency_ms,
+        "jitter_ms": args.jitter_ms,
+        "error_rate": args.error_rate,
+        "rate_limit": args.rate_limit,
+        "instrumentation": args.instrumentation,
+        "emulator_faults": faults,
+    }
+    return finish_report(results, args, config)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Bulk upload many files to Google Cloud Storage with a bounded worker pool.
+
+Uploading tens of thousands of small files one `upload_file_to_gcs` call at a
+time is dominated by per-request latency, not bandwidth. This module fans the
+uploads out over a thread pool that shares a single `storage.Client` (and
+therefore a single authenticated HTTP session), collects a result per file,
+and prints one aggregate throughput summary at the end.
+
+Each file is retried on transient failures (RetryPolicy), and one circuit
+breaker per batch stops the remaining files from hammering Cloud Storage
+while it is down. Uploads carry a CRC32C (or MD5) of the file, so the server
+rejects corrupted data, and each result records the stored checksums.
+
+Usage:
+    from bulk_upload import collect_directory, upload_many, print_summary
+
+    files = collect_directory("./artifacts", prefix="builds/1234")
+    results, elapsed = upload_many("my-bucket", files, max_workers=16)
+    print_summary(results, elapsed)
+"""
+
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from google.cloud import storage
+
+import _shared  # noqa: F401  (puts the shared helpers on sys.path)
+from checksums import upload_checksum
+from gcs_client_pool import DEFAULT_POOL_SIZE, get_storage_client
+from instrumentation import get_instrumentation
+from resilience import CircuitBreaker, RetryPolicy
+
+
+# Default number of concurrent uploads. Keep at or below the shared client's
+# connection pool size (DEFAULT_POOL_SIZE) so every worker gets a warm
+# keep-alive connection instead of opening a new one per request.
+DEFAULT_MAX_WORKERS = 16
+
+# Per-request timeout; the library's own retries are replaced by the policy
+DEFAULT_TIMEOUT = 60
+
+# Per-file attempts. Bulk files are usually small, so back off briefly
+BULK_RETRY_POLICY = RetryPolicy(max_attempts=3, initial_backoff=0.5, max_backoff=8.0, deadline=None)
+
+
+@dataclass
+class UploadResult:
+    """Outcome of uploading a single file."""
+
+    source: str
+    destination: str
+    success: bool
+    size: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+    crc32c: Optional[str] = None
+    md5: Optional[str] = None
+
+
+def collect_directory(directory: str, prefix: str = "") -> List[Tuple[str, str]]:
+    """
+    Build (source, destination) pairs for every file below a directory.
+
+    Args:
+        directory: Local directory to walk recursively
+        prefix: Optional object name prefix in the bucket (e.g. "builds/1234")
+
+    Returns:
+        List of (local path, object name) pairs; object names keep the
+        directory layout relative to `directory`
+    """
+    root = Path(directory)
+    if not root.is_dir():
+        raise FileNotFoundError(f"Directory not found: {directory}")
+
+    prefix = prefix.strip("/")
+    pairs = []
+    for path in sorted(root.rglob("*")):
+        if not path.is_file():
+            continue
+        relative = path.relative_to(root).as_posix()
+        destination = f"{prefix}/{relative}" if prefix else relative
+        pairs.append((str(path), destination))
+
+    return pairs
+
+
+def read_manifest(manifest_path: str, prefix: str = "") -> List[Tuple[str, str]]:
+    """
+    Build (source, destination) pairs from a manifest file.
+
+    Each non-empty line is either `local/path` (uploaded under its file name)
+    or `local/path<TAB>object/name`. Lines starting with `#` are ignored.
+
+    Args:
+        manifest_path: Path to the manifest file
+        prefix: Optional object name prefix applied to every destination
+
+    Returns:
+        List of (local path, object name) pairs
+    """
+    prefix = prefix.strip("/")
+    pairs = []
+
+    with open(manifest_path, "r") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+
+            if "\t" in line:
+                source, destination = line.split("\t", 1)
+            else:
+                source, destination = line, Path(line).name
+
+            destination = destination.lstrip("/")
+            if prefix:
+                destination = f"{prefix}/{destination}"
+            pairs.append((source.strip(), destination))
+
+    return pairs
+
+
+def _upload_one(
+    bucket: "storage.Bucket",
+    source: str,
+    destination: str,
+    retry_policy: RetryPolicy,
+    circuit_breaker: Optional[CircuitBreaker],
+    verify: bool,
+) -> UploadResult:
+    """Upload one file and capture the outcome instead of raising."""
+    started = time.perf_counter()
+    hooks = get_instrumentation()
+    try:
+        with hooks.span("gcs.upload", {"gcs.bucket": bucket.name, "gcs.object": destination},
+                        {"gcs.upload.source": "bulk"}):
+            size = Path(source).stat().st_size
+            blob = bucket.blob(destination)
+            # The library hashes the file as it sends it; the server (or the
+            # library, for resumable uploads) rejects a mismatch
+            checksum = upload_checksum() if verify else None
+
+            def attempt(timeout: Optional[float]) -> None:
+                blob.upload_from_filename(
+                    source, timeout=min(DEFAULT_TIMEOUT, timeout or DEFAULT_TIMEOUT), retry=None,
+                    checksum=checksum
+                )
+
+            retry_policy.call(attempt, circuit_breaker, operation_name="gcs.upload_file")
+        if hooks.enabled:
+            hooks.add("gcs.upload.bytes", size, {"gcs.upload.source": "bulk"})
+        return UploadResult(
+            source=source,
+            destination=destination,
+            success=True,
+            size=size,
+            seconds=time.perf_counter() - started,
+            crc32c=blob.crc32c,
+            md5=blob.md5_hash,
+        )
+    except Exception as e:
+        return UploadResult(
+            source=source,
+            destination=destination,
+            success=False,
+            seconds=time.perf_counter() - started,
+            error=f"{type(e).__name__}: {e}",
+        )
+
+
+def upload_many(
+    bucket_name: str,
+    files: Iterable[Tuple[str, str]],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    client: Optional["storage.Client"] = None,
+    verbose: bool = False,
+    retry_policy: Optional[RetryPolicy] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    verify: bool = True,
+) -> Tuple[List[UploadResult], float]:
+    """
+    Upload many files concurrently using one shared client.
+
+    Args:
+        bucket_name: Name of the GCS bucket
+        files: Iterable of (local path, object name) pairs
+        max_workers: Maximum number of uploads in flight
+        client: Storage client to share between workers (defaults to the
+            process-wide client from gcs_client_pool)
+        verbose: Print a line per finished file
+        retry_policy: Retries per file for transient failures (optional,
+            defaults to BULK_RETRY_POLICY; NO_RETRY for a single attempt)
+        circuit_breaker: Breaker shared by all workers (optional, defaults to
+            a new one for this batch); once open, remaining files fail fast
+        verify: Send each file's checksum so the server rejects corrupted uploads
+
+    Returns:
+        Tuple of (per-file results in completion order, elapsed seconds)
+    """
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+    if max_workers > DEFAULT_POOL_SIZE:
+        print(f"⚠ Warning: {max_workers} workers exceed the connection pool size "
+              f"({DEFAULT_POOL_SIZE}); extra connections will not be reused", file=sys.stderr)
+
+    client = client or get_storage_client()
+    bucket = client.bucket(bucket_name)
+    retry_policy = retry_policy or BULK_RETRY_POLICY
+    circuit_breaker = circuit_breaker or CircuitBreaker("gcs.bulk_upload")
+    results: List[UploadResult] = []
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                _upload_one, bucket, source, destination, retry_policy, circuit_breaker, verify
+            )
+            for source, destination in files
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if verbose:
+                mark = "✓" if result.success else "✗"
+                print(f"  {mark} {result.source} -> gs://{bucket_name}/{result.destination}")
+
+    return results, time.perf_counter() - started
+
+
+def print_summary(results: List[UploadResult], elapsed: float, max_failures: int = 20) -> None:
+    """
+    Print an aggregate throughput summary for a bulk upload.
+
+    Args:
+        results: Per-file results returned by `upload_many`
+        elapsed: Wall-clock seconds for the whole batch
+        max_failures: Maximum number of individual failures to list
+    """
+    succeeded = [r for r in results if r.success]
+    failed = [r for r in results if not r.success]
+    total_bytes = sum(r.size for r in succeeded)
+    elapsed = max(elapsed, 1e-9)
+
+    print(f"Files uploaded: {len(succeeded)}/{len(results)}")
+    print(f"Bytes uploaded: {total_bytes:,}")
+    print(f"Elapsed:        {elapsed:.2f}s")
+    print(f"Throughput:     {len(succeeded) / elapsed:.1f} files/s, "
+          f"{total_bytes / elapsed / (1024 * 1024):.2f} MiB/s")
+
+    if failed:
+        print(f"\n✗ {len(failed)} file(s) failed:", file=sys.stderr)
+        for result in failed[:max_failures]:
+            print(f"  • {result.source}: {result.error}", file=sys.stderr)
+        if len(failed) > max_failures:
+            print(f"  … and {len(failed) - max_failures} more", file=sys.stderr)
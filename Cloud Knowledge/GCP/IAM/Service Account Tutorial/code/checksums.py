@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+CRC32C and MD5 checksums in the format Cloud Storage reports them.
+
+Cloud Storage exposes `crc32c` (big-endian uint32) and `md5Hash` as base64
+strings in object metadata. Composite objects only have a CRC32C, so CRC32C
+is the checksum to compare when both are available.
+
+google-crc32c is installed with google-cloud-storage and uses a native C
+implementation when one is available for the platform; the pure-Python
+fallback is orders of magnitude slower, so uploads then verify with MD5
+instead (the same choice as the client library's checksum="auto").
+
+Uploads hash the buffers they are about to send (Checksummer.update_at), so
+verification needs no second read of the file, and send the result in the
+X-Goog-Hash header of the final request: Cloud Storage rejects the upload
+instead of storing a corrupted object.
+"""
+
+import base64
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple
+
+
+READ_BUFFER_SIZE = 1024 * 1024
+
+# Request header carrying the checksums of a complete upload
+HASH_HEADER = "X-Goog-Hash"
+
+# Reflected Castagnoli polynomial
+_CRC32C_POLYNOMIAL = 0x82F63B78
+
+
+class ChecksumMismatchError(IOError):
+    """The server's checksum of an uploaded object differs from ours."""
+
+
+def crc32c_implementation() -> str:
+    """"c" if google-crc32c runs natively, "python" for the slow fallback."""
+    import google_crc32c
+
+    return google_crc32c.implementation
+
+
+def upload_checksum() -> str:
+    """Checksum to verify uploads with: "crc32c" if native, else "md5"."""
+    return "crc32c" if crc32c_implementation() == "c" else "md5"
+
+
+def _gf2_times(matrix: List[int], vector: int) -> int:
+    total = 0
+    row = 0
+    while vector:
+        if vector & 1:
+            total ^= matrix[row]
+        vector >>= 1
+        row += 1
+    return total
+
+
+def _gf2_square(matrix: List[int]) -> List[int]:
+    return [_gf2_times(matrix, row) for row in matrix]
+
+
+def crc32c_combine(crc_a: int, crc_b: int, length_b: int) -> int:
+    """
+    CRC32C of A+B from the CRC32Cs of A and B (zlib's crc32_combine).
+
+    Lets the CRC32C of a composed object be checked from the checksums of
+    its parts, which were computed independently and in parallel.
+
+    Args:
+        crc_a: CRC32C of the first block
+        crc_b: CRC32C of the second block
+        length_b: Length of the second block in bytes
+
+    Returns:
+        CRC32C of the concatenation
+    """
+    if length_b <= 0:
+        return crc_a
+
+    # Operator for one zero bit, then squared up to two, four and eight bits
+    odd = [_CRC32C_POLYNOMIAL] + [1 << n for n in range(31)]
+    even = _gf2_square(odd)
+    odd = _gf2_square(even)
+
+    # Apply length_b zero bytes to crc_a, one bit of length_b at a time
+    while True:
+        even = _gf2_square(odd)
+        if length_b & 1:
+            crc_a = _gf2_times(even, crc_a)
+        length_b >>= 1
+        if not length_b:
+            break
+        odd = _gf2_square(even)
+        if length_b & 1:
+            crc_a = _gf2_times(odd, crc_a)
+        length_b >>= 1
+        if not length_b:
+            break
+
+    return crc_a ^ crc_b
+
+
+def encode_crc32c(value: int) -> str:
+    """An integer CRC32C as base64, as in the object's `crc32c` field."""
+    return base64.b64encode(value.to_bytes(4, "big")).decode("ascii")
+
+
+class Checksummer:
+    """Incrementally computes CRC32C and MD5 over the same buffers."""
+
+    def __init__(self, crc32c: bool = True, md5: bool = True):
+        """
+        Initialize empty checksums.
+
+        Args:
+            crc32c: Compute a CRC32C
+            md5: Compute an MD5
+        """
+        self._crc32c = None
+        if crc32c:
+            import google_crc32c
+
+            self._crc32c = google_crc32c.Checksum()
+        self._md5 = hashlib.md5() if md5 else None
+        self.bytes_hashed = 0
+
+    @classmethod
+    def for_upload(cls) -> "Checksummer":
+        """Only the checksum chosen by upload_checksum()."""
+        crc32c = upload_checksum() == "crc32c"
+        return cls(crc32c=crc32c, md5=not crc32c)
+
+    def update(self, data: bytes) -> None:
+        """Add a chunk of data to both checksums."""
+        if self._crc32c is not None:
+            self._crc32c.update(data)
+        if self._md5 is not None:
+            self._md5.update(data)
+        self.bytes_hashed += len(data)
+
+    def update_at(self, offset: int, data: bytes) -> None:
+        """
+        Add the bytes of `data` (which starts at `offset`) not hashed yet.
+
+        Uploads resend bytes the server did not commit; those were hashed
+        the first time and are skipped.
+
+        Raises:
+            ValueError: `offset` is past the bytes hashed so far
+        """
+        if offset > self.bytes_hashed:
+            raise ValueError(f"Checksum gap: hashed {self.bytes_hashed} bytes, got data at {offset}")
+        skip = self.bytes_hashed - offset
+        if skip == 0:
+            self.update(data)
+        elif skip < len(data):
+            # Copies, but only the tail of a resent buffer
+            self.update(bytes(data[skip:]))
+
+    @property
+    def algorithm(self) -> Optional[str]:
+        """Checksum that verify() compares first ("crc32c", "md5" or None)."""
+        if self._crc32c is not None:
+            return "crc32c"
+        return "md5" if self._md5 is not None else None
+
+    @property
+    def crc32c_value(self) -> Optional[int]:
+        """CRC32C as an integer (None if not computed)."""
+        if self._crc32c is None:
+            return None
+        return int.from_bytes(self._crc32c.digest(), "big")
+
+    @property
+    def crc32c(self) -> Optional[str]:
+        """CRC32C as base64, as in the object's `crc32c` field."""
+        if self._crc32c is None:
+            return None
+        return base64.b64encode(self._crc32c.digest()).decode("ascii")
+
+    @property
+    def md5(self) -> Optional[str]:
+        """MD5 as base64, as in the object's `md5Hash` field."""
+        if self._md5 is None:
+            return None
+        return base64.b64encode(self._md5.digest()).decode("ascii")
+
+    def header(self) -> str:
+        """X-Goog-Hash value, e.g. "crc32c=n03x6A==,md5=..."."""
+        hashes = [("crc32c", self.crc32c), ("md5", self.md5)]
+        return ",".join(f"{name}={value}" for name, value in hashes if value is not None)
+
+    def verify(self, resource: Dict[str, Any]) -> Optional[str]:
+        """
+        Compare with the checksums of an object resource.
+
+        Args:
+            resource: Object resource with `crc32c` and/or `md5Hash`
+
+        Returns:
+            Name of the checksum compared ("crc32c" or "md5"), or None if
+            the resource has none of the computed checksums (e.g. MD5 of a
+            composite object)
+
+        Raises:
+            ChecksumMismatchError: The checksums differ
+        """
+        for name, local, remote in (("crc32c", self.crc32c, resource.get("crc32c")),
+                                    ("md5", self.md5, resource.get("md5Hash"))):
+            if local is None or not remote:
+                continue
+            if local != remote:
+                raise ChecksumMismatchError(
+                    f"{name} mismatch for {resource.get('name', 'object')}: "
+                    f"sent {local}, server has {remote}"
+                )
+            return name
+        return None
+
+
+def file_checksums(path: str) -> Tuple[str, str]:
+    """
+    Compute the CRC32C and MD5 of a file in a single read pass.
+
+    Args:
+        path: Local file path
+
+    Returns:
+        Tuple of (crc32c, md5) as base64 strings
+    """
+    checksummer = Checksummer()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(READ_BUFFER_SIZE), b""):
+            checksummer.update(chunk)
+    return checksummer.crc32c, checksummer.md5
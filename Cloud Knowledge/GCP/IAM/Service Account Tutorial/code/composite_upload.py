@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Resumable, parallel composite uploads for large files.
+
+A multi-GB file uploaded with `blob.upload_from_filename` restarts from zero
+when the connection drops. This module instead:
+
+    1. Splits the file into parts of `part_size` bytes
+    2. Uploads up to `max_parallel_parts` parts concurrently, each through its
+       own resumable session sent in `chunk_size` requests
+    3. Records every session URL and finished part in a local JSON journal, so
+       re-running the same command continues where the last run stopped
+    4. Composes the parts server-side into the destination object
+
+Notes:
+    • Composed objects have a CRC32C checksum but no MD5 hash. Each part is
+      hashed while it is sent and verified by the server; the parts' CRC32Cs
+      are kept in the journal and combined to check the composed object
+      without reading the file again.
+    • Temporary part objects are deleted after composing. The Storage Object
+      Creator role cannot delete objects, so with that role the parts are left
+      behind under "<destination>.parts/" (use a lifecycle rule to clean them).
+      Set max_parallel_parts=1 to upload a single resumable part directly to
+      the destination and skip composition entirely.
+
+Usage:
+    from composite_upload import upload_large_file
+
+    upload_large_file("my-bucket", "backup.tar", "backups/backup.tar",
+                      chunk_size=16 * 1024 * 1024, max_parallel_parts=8)
+"""
+
+import json
+import math
+import os
+import sys
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from google.cloud import storage
+
+import _shared  # noqa: F401  (puts the shared helpers on sys.path)
+from checksums import ChecksumMismatchError, Checksummer, crc32c_combine, encode_crc32c
+from gcs_client_pool import get_authorized_session, get_storage_client
+from instrumentation import get_instrumentation
+from resumable_upload import (
+    DEFAULT_CHUNK_SIZE,
+    ResumableSessionExpired,
+    start_session,
+    upload_range,
+    validate_chunk_size,
+)
+
+
+DEFAULT_PART_SIZE = 64 * 1024 * 1024
+DEFAULT_PARALLEL_PARTS = 4
+
+# Files at least this large are uploaded with upload_large_file by upload_to_gcs.py
+DEFAULT_COMPOSITE_THRESHOLD = 128 * 1024 * 1024
+
+# Cloud Storage accepts at most 32 source objects per compose request
+MAX_COMPOSE_SOURCES = 32
+
+
+class UploadJournal:
+    """JSON file recording the progress of one large upload."""
+
+    def __init__(self, path: Path):
+        """
+        Initialize journal.
+
+        Args:
+            path: Location of the journal file
+        """
+        self.path = path
+        self.data: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def load(self, expected: Dict[str, Any]) -> bool:
+        """
+        Load the journal if it belongs to the same upload.
+
+        Args:
+            expected: Fields identifying the upload (source, size, mtime, ...)
+
+        Returns:
+            True if a matching journal was resumed, False if starting fresh
+        """
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text())
+            except (OSError, json.JSONDecodeError):
+                data = {}
+
+            if all(data.get(key) == value for key, value in expected.items()):
+                self.data = data
+                return True
+
+            print(f"⚠ Ignoring stale journal {self.path} (file or settings changed)",
+                  file=sys.stderr)
+
+        self.data = dict(expected, upload_id=uuid.uuid4().hex[:12], parts={})
+        return False
+
+    def part(self, index: int) -> Dict[str, Any]:
+        """Get the journal entry for a part, creating it if needed."""
+        with self._lock:
+            return self.data["parts"].setdefault(str(index), {})
+
+    def update_part(self, index: int, **fields) -> None:
+        """Update a part entry and write the journal to disk."""
+        with self._lock:
+            self.data["parts"].setdefault(str(index), {}).update(fields)
+            self._save_locked()
+
+    def _save_locked(self) -> None:
+        # Write to a temp file and rename so a crash never leaves half a journal
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(json.dumps(self.data, indent=2))
+        os.replace(tmp_path, self.path)
+
+    def delete(self) -> None:
+        """Remove the journal once the upload is complete."""
+        with self._lock:
+            self.path.unlink(missing_ok=True)
+
+
+def _default_journal_path(source_file_path: str) -> Path:
+    source = Path(source_file_path)
+    return source.with_name(f".{source.name}.upload-journal.json")
+
+
+def _upload_part(
+    client: "storage.Client",
+    session,
+    journal: UploadJournal,
+    bucket_name: str,
+    source_file_path: str,
+    index: int,
+    object_name: str,
+    start: int,
+    length: int,
+    chunk_size: int,
+    content_type: Optional[str],
+    verify: bool = True,
+) -> None:
+    """Upload (or resume) one part and record it (and its checksum) in the journal."""
+    entry = journal.part(index)
+    if entry.get("done"):
+        return
+
+    session_url = entry.get("session_url")
+    resume = session_url is not None
+    checksummer = Checksummer.for_upload() if verify else None
+
+    for _ in range(2):
+        if session_url is None:
+            session_url = start_session(client, bucket_name, object_name, length, content_type)
+            journal.update_part(index, object_name=object_name, session_url=session_url)
+
+        try:
+            upload_range(session, session_url, source_file_path, start, length, chunk_size, resume,
+                         checksummer)
+            journal.update_part(
+                index, done=True, session_url=None,
+                checksum=checksummer.algorithm if checksummer else None,
+                crc32c=checksummer.crc32c_value if checksummer else None,
+            )
+            return
+        except ResumableSessionExpired:
+            # Sessions live for a week; start this part over with a new one
+            get_instrumentation().add("gcs.upload.retries", 1, {"reason": "session_expired"})
+            session_url, resume = None, False
+
+    raise RuntimeError(f"Could not upload part {index} of {source_file_path}")
+
+
+def _compose(
+    bucket: "storage.Bucket",
+    client: "storage.Client",
+    source_names: List[str],
+    destination_name: str,
+    content_type: Optional[str],
+    temp_prefix: str,
+) -> Tuple["storage.Blob", List[str]]:
+    """
+    Compose any number of parts into one object.
+
+    Returns:
+        Tuple of (composed destination blob, names of intermediate objects
+        created along the way)
+    """
+    intermediates: List[str] = []
+    level = 0
+
+    # Compose in rounds of 32 until few enough sources remain for one request
+    while len(source_names) > MAX_COMPOSE_SOURCES:
+        next_round = []
+        for group_start in range(0, len(source_names), MAX_COMPOSE_SOURCES):
+            group = source_names[group_start:group_start + MAX_COMPOSE_SOURCES]
+            name = f"{temp_prefix}/compose-{level}-{group_start // MAX_COMPOSE_SOURCES:05d}"
+            bucket.blob(name).compose([bucket.blob(n) for n in group], client=client)
+            next_round.append(name)
+        intermediates.extend(next_round)
+        source_names = next_round
+        level += 1
+
+    destination = bucket.blob(destination_name)
+    destination.content_type = content_type
+    destination.compose([bucket.blob(n) for n in source_names], client=client)
+    return destination, intermediates
+
+
+def _combined_crc32c(parts: Dict[str, Dict[str, Any]], lengths: List[int]) -> Optional[int]:
+    """CRC32C of the whole file from the parts' CRC32Cs (None if one is missing)."""
+    combined = None
+    for index, length in enumerate(lengths):
+        crc = parts.get(str(index), {}).get("crc32c")
+        if crc is None:
+            return None
+        combined = crc if combined is None else crc32c_combine(combined, crc, length)
+    return combined
+
+
+def _delete_temporary_objects(bucket: "storage.Bucket", names: List[str]) -> None:
+    """Best-effort cleanup of part and intermediate objects."""
+    from google.api_core import exceptions
+
+    try:
+        for name in names:
+            bucket.blob(name).delete()
+    except exceptions.Forbidden:
+        print(f"⚠ No permission to delete temporary part objects "
+              f"(e.g. gs://{bucket.name}/{names[0]}); clean them up with a lifecycle rule",
+              file=sys.stderr)
+    except exceptions.NotFound:
+        pass
+
+
+def _delete_mismatched_object(blob: "storage.Blob") -> None:
+    """Best-effort removal of a composed object that failed verification."""
+    from google.api_core import exceptions
+
+    try:
+        blob.delete()
+    except (exceptions.Forbidden, exceptions.NotFound):
+        print(f"⚠ Could not delete gs://{blob.bucket.name}/{blob.name} after the checksum "
+              f"mismatch; do not use it", file=sys.stderr)
+
+
+def upload_large_file(
+    bucket_name: str,
+    source_file_path: str,
+    destination_blob_name: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    part_size: int = DEFAULT_PART_SIZE,
+    max_parallel_parts: int = DEFAULT_PARALLEL_PARTS,
+    journal_path: Optional[str] = None,
+    content_type: Optional[str] = None,
+    client: Optional["storage.Client"] = None,
+    verify: bool = True,
+) -> Dict[str, Any]:
+    """
+    Upload a large file as concurrently uploaded, resumable parts.
+
+    Args:
+        bucket_name: Name of the GCS bucket
+        source_file_path: Path to the local file
+        destination_blob_name: Object name (optional, defaults to the file name)
+        chunk_size: Bytes per request within a part (multiple of 256 KiB)
+        part_size: Bytes per part (rounded up to a multiple of chunk_size)
+        max_parallel_parts: Parts uploaded concurrently; 1 uploads the whole
+            file as a single resumable session without composition
+        journal_path: Where to keep resume state (optional, defaults to a
+            hidden file next to the source)
+        content_type: MIME type of the final object (optional)
+        client: Storage client (optional, defaults to the shared pooled client)
+        verify: Checksum the data while sending it and compare with the server
+
+    Returns:
+        Dictionary with the final object's name, size, part count and the
+        checksum that was verified ("crc32c", "md5" or None)
+
+    Raises:
+        FileNotFoundError: If the source file doesn't exist
+        ValueError: If chunk_size is not a multiple of 256 KiB
+        ChecksumMismatchError: A part or the composed object doesn't match
+            the local file (a bad composed object, its parts and the journal
+            are discarded, so a re-run starts over)
+    """
+    validate_chunk_size(chunk_size)
+    if max_parallel_parts < 1:
+        raise ValueError("max_parallel_parts must be at least 1")
+
+    stat = os.stat(source_file_path)
+    size = stat.st_size
+    destination_blob_name = destination_blob_name or Path(source_file_path).name
+
+    if max_parallel_parts == 1 or size <= part_size:
+        part_size = max(size, 1)
+    else:
+        part_size = math.ceil(part_size / chunk_size) * chunk_size
+
+    part_count = max(1, math.ceil(size / part_size))
+    composite = part_count > 1
+
+    journal = UploadJournal(Path(journal_path) if journal_path else _default_journal_path(source_file_path))
+    resumed = journal.load({
+        "source": os.path.abspath(source_file_path),
+        "size": size,
+        "mtime_ns": stat.st_mtime_ns,
+        "bucket": bucket_name,
+        "destination": destination_blob_name,
+        "part_size": part_size,
+    })
+    if resumed:
+        done = sum(1 for part in journal.data["parts"].values() if part.get("done"))
+        print(f"Resuming upload from journal: {done}/{part_count} part(s) already uploaded")
+
+    client = client or get_storage_client()
+    session = get_authorized_session()
+    bucket = client.bucket(bucket_name)
+
+    temp_prefix = f"{destination_blob_name}.parts/{journal.data['upload_id']}"
+    part_names = [
+        f"{temp_prefix}/{index:05d}" if composite else destination_blob_name
+        for index in range(part_count)
+    ]
+    part_lengths = [min(part_size, size - index * part_size) for index in range(part_count)]
+
+    with ThreadPoolExecutor(max_workers=min(max_parallel_parts, part_count)) as executor:
+        futures = [
+            executor.submit(
+                _upload_part,
+                client, session, journal, bucket_name, source_file_path, index,
+                part_names[index], index * part_size, part_lengths[index], chunk_size,
+                None if composite else content_type, verify,
+            )
+            for index in range(part_count)
+        ]
+        # Surface the first failure; the journal keeps the finished parts
+        for future in futures:
+            future.result()
+
+    parts = journal.data["parts"]
+    verified = parts.get("0", {}).get("checksum") if verify else None
+
+    if composite:
+        destination, intermediates = _compose(
+            bucket, client, part_names, destination_blob_name, content_type, temp_prefix
+        )
+
+        # Parts hashed with MD5 (no native CRC32C) or by an older run can't
+        # be combined; they were still verified one by one
+        expected = _combined_crc32c(parts, part_lengths) if verify else None
+        if expected is not None and encode_crc32c(expected) != destination.crc32c:
+            # Neither the parts nor the journal can be trusted now: drop them
+            # and the bad object, so a re-run uploads from scratch
+            _delete_mismatched_object(destination)
+            _delete_temporary_objects(bucket, part_names + intermediates)
+            journal.delete()
+            raise ChecksumMismatchError(
+                f"crc32c mismatch for composed gs://{bucket_name}/{destination_blob_name}: "
+                f"expected {encode_crc32c(expected)}, server has {destination.crc32c}"
+            )
+
+        # Only delete the parts once the composed object is known to be good
+        _delete_temporary_objects(bucket, part_names + intermediates)
+        if expected is not None:
+            verified = "crc32c"
+        elif verified is not None:
+            verified = f"{verified} (per part)"
+
+    journal.delete()
+
+    return {
+        "name": destination_blob_name,
+        "size": size,
+        "parts": part_count,
+        "resumed": resumed,
+        "verified": verified,
+    }
@@ -0,0 +1,637 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Cloud Storage JSON API, for offline tests and benchmarks.
+
+Implements the subset of the API that the upload code in this directory uses,
+in memory, over plain HTTP on localhost:
+
+    • Uploads: uploadType=media, multipart and resumable (session POST,
+      chunked PUT with Content-Range, offset queries, cancellation)
+    • Objects: get metadata, download (alt=media), list (prefix, delimiter,
+      paging), compose, delete; crc32c/md5Hash like the real service
+    • Checksums sent with an upload (multipart metadata, X-Goog-Hash on the
+      last resumable request) are checked; mismatches are rejected with 400
+    • Buckets are created on first write (or with --bucket)
+
+Every request first goes through a FaultInjector, so latency, random 503s
+and 429 quota throttling can be dialed in (see fault_injection.py).
+
+Point the existing code at it with STORAGE_EMULATOR_HOST: gcs_client_pool
+then talks to the emulator with anonymous credentials.
+
+Usage:
+    python gcs_emulator.py --port 9023 --latency-ms 20 --error-rate 0.01
+    export STORAGE_EMULATOR_HOST=http://localhost:9023
+    python upload_to_gcs.py --bucket test-bucket --file myfile.txt
+
+    # Or in-process, e.g. from a benchmark
+    with GCSEmulator(faults=FaultInjector(latency_ms=5)) as emulator:
+        client, _ = build_storage_client(api_endpoint=emulator.endpoint)
+"""
+
+import argparse
+import json
+import re
+import socket
+import sys
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+import _shared  # noqa: F401  (puts the shared helpers on sys.path)
+from checksums import HASH_HEADER, Checksummer
+from fault_injection import (
+    THROTTLED,
+    FaultInjector,
+    add_fault_arguments,
+    fault_injector_from_args,
+)
+
+DEFAULT_PORT = 9023
+DEFAULT_PAGE_SIZE = 1000
+
+RESUME_INCOMPLETE = 308
+
+_CONTENT_RANGE = re.compile(r"bytes (?:(\d+)-(\d+)|\*)/(\d+|\*)")
+
+
+class HTTPError(Exception):
+    """An error response in the JSON API's error format."""
+
+    def __init__(self, code: int, message: str, reason: str = "invalid"):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.reason = reason
+
+    def body(self) -> Dict[str, Any]:
+        return {
+            "error": {
+                "code": self.code,
+                "message": self.message,
+                "errors": [{"message": self.message, "domain": "global", "reason": self.reason}],
+            }
+        }
+
+
+def _rfc3339(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+@dataclass
+class StoredObject:
+    """One object generation held in memory."""
+
+    bucket: str
+    name: str
+    data: bytes
+    generation: int
+    content_type: str = "application/octet-stream"
+    content_encoding: Optional[str] = None
+    metadata: Optional[Dict[str, str]] = None
+    component_count: Optional[int] = None
+    created: float = field(default_factory=time.time)
+    crc32c: str = ""
+    md5: str = ""
+
+    def __post_init__(self):
+        checksummer = Checksummer()
+        checksummer.update(self.data)
+        self.crc32c, self.md5 = checksummer.crc32c, checksummer.md5
+
+    def resource(self, base_url: str) -> Dict[str, Any]:
+        """Object resource as returned by the JSON API."""
+        quoted = quote(self.name, safe="")
+        resource = {
+            "kind": "storage#object",
+            "id": f"{self.bucket}/{self.name}/{self.generation}",
+            "selfLink": f"{base_url}/storage/v1/b/{self.bucket}/o/{quoted}",
+            "mediaLink": f"{base_url}/download/storage/v1/b/{self.bucket}/o/{quoted}"
+                         f"?generation={self.generation}&alt=media",
+            "name": self.name,
+            "bucket": self.bucket,
+            "generation": str(self.generation),
+            "metageneration": "1",
+            "contentType": self.content_type,
+            "storageClass": "STANDARD",
+            "size": str(len(self.data)),
+            "crc32c": self.crc32c,
+            "etag": f"{self.crc32c}{self.generation}",
+            "timeCreated": _rfc3339(self.created),
+            "updated": _rfc3339(self.created),
+        }
+        if self.component_count is None:
+            # Like the real service, composite objects have no MD5
+            resource["md5Hash"] = self.md5
+        else:
+            resource["componentCount"] = self.component_count
+        if self.content_encoding:
+            resource["contentEncoding"] = self.content_encoding
+        if self.metadata:
+            resource["metadata"] = self.metadata
+        return resource
+
+
+@dataclass
+class ResumableUpload:
+    """State of one resumable upload session."""
+
+    bucket: str
+    name: str
+    metadata: Dict[str, Any]
+    total: Optional[int] = None
+    data: bytearray = field(default_factory=bytearray)
+    result: Optional[StoredObject] = None
+
+
+class GCSEmulatorState:
+    """Buckets, objects and upload sessions, shared by all handler threads."""
+
+    def __init__(self, auto_create_buckets: bool = True):
+        self.auto_create_buckets = auto_create_buckets
+        # Commit at most this many bytes per resumable PUT, like a server that
+        # persisted only part of a request (None: commit everything sent)
+        self.max_commit_bytes: Optional[int] = None
+        self.buckets: Dict[str, Dict[str, StoredObject]] = {}
+        self.uploads: Dict[str, ResumableUpload] = {}
+        self.lock = threading.Lock()
+        self._generation = int(time.time() * 1_000_000)
+
+    def create_bucket(self, bucket: str) -> None:
+        with self.lock:
+            self.buckets.setdefault(bucket, {})
+
+    def _bucket(self, bucket: str, create: bool = False) -> Dict[str, StoredObject]:
+        objects = self.buckets.get(bucket)
+        if objects is None:
+            if not (create and self.auto_create_buckets):
+                raise HTTPError(404, f"The specified bucket does not exist: {bucket}", "notFound")
+            objects = self.buckets[bucket] = {}
+        return objects
+
+    def get(self, bucket: str, name: str) -> StoredObject:
+        with self.lock:
+            obj = self._bucket(bucket).get(name)
+        if obj is None:
+            raise HTTPError(404, f"No such object: {bucket}/{name}", "notFound")
+        return obj
+
+    def put(self, bucket: str, name: str, data: bytes, metadata: Dict[str, Any],
+            component_count: Optional[int] = None) -> StoredObject:
+        with self.lock:
+            objects = self._bucket(bucket, create=True)
+            self._generation += 1
+            obj = StoredObject(
+                bucket=bucket,
+                name=name,
+                data=bytes(data),
+                generation=self._generation,
+                content_type=metadata.get("contentType") or "application/octet-stream",
+                content_encoding=metadata.get("contentEncoding"),
+                metadata=metadata.get("metadata"),
+                component_count=component_count,
+            )
+            objects[name] = obj
+            return obj
+
+    def delete(self, bucket: str, name: str) -> None:
+        with self.lock:
+            if self._bucket(bucket).pop(name, None) is None:
+                raise HTTPError(404, f"No such object: {bucket}/{name}", "notFound")
+
+    def list(self, bucket: str, prefix: str, delimiter: Optional[str],
+             page_token: Optional[str], max_results: int) -> Tuple[List[StoredObject], List[str], Optional[str]]:
+        with self.lock:
+            names = sorted(name for name in self._bucket(bucket) if name.startswith(prefix))
+            objects = self.buckets[bucket]
+
+            items: List[StoredObject] = []
+            prefixes: List[str] = []
+            next_token = None
+            for name in names:
+                if page_token and name <= page_token:
+                    continue
+                if delimiter:
+                    cut = name.find(delimiter, len(prefix))
+                    if cut != -1:
+                        common = name[:cut + len(delimiter)]
+                        if common not in prefixes:
+                            prefixes.append(common)
+                        continue
+                if len(items) == max_results:
+                    next_token = items[-1].name
+                    break
+                items.append(objects[name])
+            return items, prefixes, next_token
+
+
+def _parse_multipart(body: bytes, content_type: str) -> Tuple[Dict[str, Any], bytes]:
+    """Split a multipart/related upload into (metadata, media)."""
+    match = re.search(r'boundary="?([^";]+)"?', content_type)
+    if not match:
+        raise HTTPError(400, "Missing multipart boundary")
+
+    delimiter = b"--" + match.group(1).encode("ascii")
+    parts = [part for part in body.split(delimiter)[1:] if not part.startswith(b"--")]
+    if len(parts) != 2:
+        raise HTTPError(400, f"Expected 2 multipart parts, got {len(parts)}")
+
+    contents = []
+    for part in parts:
+        _headers, _, content = part.partition(b"\r\n\r\n")
+        contents.append(content[:-2] if content.endswith(b"\r\n") else content)
+
+    return json.loads(contents[0] or b"{}"), contents[1]
+
+
+def _parse_hash_header(value: Optional[str]) -> Dict[str, str]:
+    """Parse "crc32c=...,md5=..." into {"crc32c": ..., "md5": ...}."""
+    hashes = {}
+    for item in (value or "").split(","):
+        name, _, digest = item.strip().partition("=")
+        if digest:
+            hashes[name.lower()] = digest
+    return hashes
+
+
+def _check_hashes(data: bytes, expected: Dict[str, Optional[str]]) -> None:
+    """Reject data whose client-supplied checksums don't match, like the real service."""
+    expected = {name: digest for name, digest in expected.items() if digest}
+    if not expected:
+        return
+    checksummer = Checksummer(crc32c="crc32c" in expected, md5="md5" in expected)
+    checksummer.update(data)
+    for name, actual in (("crc32c", checksummer.crc32c), ("md5", checksummer.md5)):
+        if name in expected and expected[name] != actual:
+            label = name.upper()
+            raise HTTPError(400, f'Provided {label} "{expected[name]}" doesn\'t match '
+                                 f'calculated {label} "{actual}".')
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Routes JSON API requests to GCSEmulatorState."""
+
+    protocol_version = "HTTP/1.1"
+    server: "_EmulatorHTTPServer"
+
+    def setup(self) -> None:
+        super().setup()
+        # Headers and body go out in separate writes; with Nagle's algorithm
+        # the body waits for the client's delayed ACK (~40 ms per response)
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    # Plumbing
+
+    def _read_body(self) -> bytes:
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            body = bytearray()
+            while True:
+                size = int(self.rfile.readline().split(b";")[0], 16)
+                if size == 0:
+                    self.rfile.readline()
+                    return bytes(body)
+                body += self.rfile.read(size)
+                self.rfile.readline()
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send(self, status: int, body: bytes = b"", content_type: str = "application/json",
+              headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if body:
+            self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        self._send(status, json.dumps(payload).encode("utf-8"), headers=headers)
+
+    @property
+    def _base_url(self) -> str:
+        host = self.headers.get("Host") or f"{self.server.server_address[0]}:{self.server.server_address[1]}"
+        return f"http://{host}"
+
+    def _dispatch(self, method: str) -> None:
+        body = self._read_body()
+        try:
+            fault = self.server.faults.inject()
+            if fault == THROTTLED:
+                raise HTTPError(429, "The rate of change requests to the bucket is too high.",
+                                "rateLimitExceeded")
+            if fault is not None:
+                raise HTTPError(503, "Backend Error (injected)", "backendError")
+
+            url = urlsplit(self.path)
+            segments = [unquote(segment) for segment in url.path.strip("/").split("/")]
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            getattr(self, f"_handle_{method}")(segments, query, body)
+        except HTTPError as e:
+            self._send_json(e.code, e.body())
+        except (ValueError, KeyError) as e:
+            self._send_json(400, HTTPError(400, f"Invalid request: {e}").body())
+
+    def do_GET(self) -> None:
+        self._dispatch("get")
+
+    def do_POST(self) -> None:
+        self._dispatch("post")
+
+    def do_PUT(self) -> None:
+        self._dispatch("put")
+
+    def do_DELETE(self) -> None:
+        self._dispatch("delete")
+
+    # Routes
+
+    def _handle_get(self, segments: List[str], query: Dict[str, str], body: bytes) -> None:
+        state = self.server.state
+
+        # /download/storage/v1/b/{bucket}/o/{object}
+        if segments[:3] == ["download", "storage", "v1"] and len(segments) == 7:
+            obj = state.get(segments[4], segments[6])
+            return self._send(200, obj.data, obj.content_type)
+
+        if segments[:2] != ["storage", "v1"]:
+            raise HTTPError(404, f"Not found: {self.path}", "notFound")
+        rest = segments[2:]
+
+        # /storage/v1/projects/{project}/serviceAccount
+        if len(rest) == 3 and rest[0] == "projects" and rest[2] == "serviceAccount":
+            return self._send_json(200, {
+                "kind": "storage#serviceAccount",
+                "email_address": f"service-emulator@{rest[1]}.iam.gserviceaccount.com",
+            })
+
+        # /storage/v1/b/{bucket}
+        if len(rest) == 2 and rest[0] == "b":
+            with state.lock:
+                state._bucket(rest[1])
+            return self._send_json(200, {"kind": "storage#bucket", "id": rest[1], "name": rest[1]})
+
+        # /storage/v1/b/{bucket}/o
+        if len(rest) == 3 and rest[0] == "b" and rest[2] == "o":
+            items, prefixes, next_token = state.list(
+                rest[1],
+                prefix=query.get("prefix", ""),
+                delimiter=query.get("delimiter"),
+                page_token=query.get("pageToken"),
+                max_results=int(query.get("maxResults", DEFAULT_PAGE_SIZE)),
+            )
+            payload: Dict[str, Any] = {
+                "kind": "storage#objects",
+                "items": [obj.resource(self._base_url) for obj in items],
+            }
+            if prefixes:
+                payload["prefixes"] = prefixes
+            if next_token:
+                payload["nextPageToken"] = next_token
+            return self._send_json(200, payload)
+
+        # /storage/v1/b/{bucket}/o/{object}
+        if len(rest) == 4 and rest[0] == "b" and rest[2] == "o":
+            obj = state.get(rest[1], rest[3])
+            if query.get("alt") == "media":
+                return self._send(200, obj.data, obj.content_type)
+            return self._send_json(200, obj.resource(self._base_url))
+
+        raise HTTPError(404, f"Not found: {self.path}", "notFound")
+
+    def _handle_post(self, segments: List[str], query: Dict[str, str], body: bytes) -> None:
+        state = self.server.state
+
+        # /upload/storage/v1/b/{bucket}/o
+        if segments[:4] == ["upload", "storage", "v1", "b"] and len(segments) == 6:
+            return self._start_upload(segments[4], query, body)
+
+        # /storage/v1/b
+        if segments == ["storage", "v1", "b"]:
+            name = json.loads(body or b"{}")["name"]
+            state.create_bucket(name)
+            return self._send_json(200, {"kind": "storage#bucket", "id": name, "name": name})
+
+        # /storage/v1/b/{bucket}/o/{destination}/compose
+        if segments[:3] == ["storage", "v1", "b"] and len(segments) == 7 and segments[6] == "compose":
+            bucket, destination = segments[3], segments[5]
+            request = json.loads(body or b"{}")
+            sources = [state.get(bucket, source["name"]) for source in request.get("sourceObjects", [])]
+            if not 1 <= len(sources) <= 32:
+                raise HTTPError(400, "A compose request must have between 1 and 32 source objects")
+            components = sum(source.component_count or 1 for source in sources)
+            obj = state.put(
+                bucket, destination, b"".join(source.data for source in sources),
+                request.get("destination") or {}, component_count=components
+            )
+            return self._send_json(200, obj.resource(self._base_url))
+
+        raise HTTPError(404, f"Not found: {self.path}", "notFound")
+
+    def _start_upload(self, bucket: str, query: Dict[str, str], body: bytes) -> None:
+        state = self.server.state
+        upload_type = query.get("uploadType", "media")
+
+        if upload_type == "media":
+            metadata = {"contentType": self.headers.get("Content-Type")}
+            _check_hashes(body, _parse_hash_header(self.headers.get(HASH_HEADER)))
+            obj = state.put(bucket, query["name"], body, metadata)
+            return self._send_json(200, obj.resource(self._base_url))
+
+        if upload_type == "multipart":
+            metadata, media = _parse_multipart(body, self.headers.get("Content-Type", ""))
+            _check_hashes(media, {"crc32c": metadata.get("crc32c"), "md5": metadata.get("md5Hash")})
+            name = metadata.get("name") or query["name"]
+            obj = state.put(bucket, name, media, metadata)
+            return self._send_json(200, obj.resource(self._base_url))
+
+        if upload_type == "resumable":
+            metadata = json.loads(body or b"{}")
+            metadata.setdefault("contentType", self.headers.get("X-Upload-Content-Type"))
+            name = metadata.get("name") or query["name"]
+            total = self.headers.get("X-Upload-Content-Length")
+
+            upload_id = uuid.uuid4().hex
+            with state.lock:
+                state._bucket(bucket, create=True)
+                state.uploads[upload_id] = ResumableUpload(
+                    bucket, name, metadata, int(total) if total else None
+                )
+
+            location = (f"{self._base_url}/upload/storage/v1/b/{bucket}/o"
+                        f"?uploadType=resumable&upload_id={upload_id}")
+            return self._send(200, headers={"Location": location})
+
+        raise HTTPError(400, f"Unsupported uploadType: {upload_type}")
+
+    def _handle_put(self, segments: List[str], query: Dict[str, str], body: bytes) -> None:
+        state = self.server.state
+        with state.lock:
+            upload = state.uploads.get(query.get("upload_id", ""))
+        if upload is None:
+            raise HTTPError(404, "No such upload session", "notFound")
+
+        if upload.result is not None:
+            return self._send_json(200, upload.result.resource(self._base_url))
+
+        match = _CONTENT_RANGE.fullmatch(self.headers.get("Content-Range", "").strip())
+        if match is None:
+            raise HTTPError(400, f"Invalid Content-Range: {self.headers.get('Content-Range')}")
+        start, end, total = match.groups()
+
+        if total != "*":
+            upload.total = int(total)
+
+        if start is not None:
+            start, end = int(start), int(end)
+            committed = len(upload.data)
+            if start > committed or end - start + 1 != len(body):
+                raise HTTPError(400, f"Content-Range {start}-{end} does not continue at byte {committed}")
+            # Bytes already committed may be resent after a lost response
+            new_data = body[committed - start:]
+            if state.max_commit_bytes is not None:
+                new_data = new_data[:state.max_commit_bytes]
+            upload.data += new_data
+
+        if upload.total is not None and len(upload.data) >= upload.total:
+            data = bytes(upload.data[:upload.total])
+            _check_hashes(data, _parse_hash_header(self.headers.get(HASH_HEADER)))
+            upload.result = state.put(upload.bucket, upload.name, data, upload.metadata)
+            upload.data = bytearray()
+            return self._send_json(200, upload.result.resource(self._base_url))
+
+        headers = {"Range": f"bytes=0-{len(upload.data) - 1}"} if upload.data else {}
+        return self._send(RESUME_INCOMPLETE, headers=headers)
+
+    def _handle_delete(self, segments: List[str], query: Dict[str, str], body: bytes) -> None:
+        state = self.server.state
+
+        # Cancel a resumable upload
+        if "upload_id" in query:
+            with state.lock:
+                state.uploads.pop(query["upload_id"], None)
+            return self._send(499)
+
+        # /storage/v1/b/{bucket}/o/{object}
+        if segments[:3] == ["storage", "v1", "b"] and len(segments) == 6 and segments[4] == "o":
+            state.delete(segments[3], segments[5])
+            return self._send(204)
+
+        raise HTTPError(404, f"Not found: {self.path}", "notFound")
+
+
+class _EmulatorHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, state: GCSEmulatorState, faults: FaultInjector, verbose: bool):
+        self.state = state
+        self.faults = faults
+        self.verbose = verbose
+        super().__init__(address, _Handler)
+
+
+class GCSEmulator:
+    """In-process Cloud Storage emulator serving on a background thread."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        faults: Optional[FaultInjector] = None,
+        auto_create_buckets: bool = True,
+        verbose: bool = False
+    ):
+        """
+        Initialize emulator (call start() or use it as a context manager).
+
+        Args:
+            host: Interface to listen on
+            port: TCP port (0 picks a free port)
+            faults: Latency/error/throttling injection (optional)
+            auto_create_buckets: Create buckets on first write (default: True)
+            verbose: Log every request to stderr
+        """
+        self.state = GCSEmulatorState(auto_create_buckets)
+        self.faults = faults or FaultInjector()
+        self._server = _EmulatorHTTPServer((host, port), self.state, self.faults, verbose)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def endpoint(self) -> str:
+        """Base URL to use as api_endpoint / STORAGE_EMULATOR_HOST."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "GCSEmulator":
+        """Serve from a daemon thread."""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="gcs-emulator", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "GCSEmulator":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def object_data(self, bucket: str, name: str) -> bytes:
+        """Contents of a stored object (for assertions in tests)."""
+        return self.state.get(bucket, name).data
+
+
+def main():
+    """Run the emulator in the foreground."""
+    parser = argparse.ArgumentParser(description="Local Cloud Storage JSON API emulator")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT,
+                        help=f"Port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument("--bucket", action="append", default=[],
+                        help="Create this bucket at startup (repeatable)")
+    parser.add_argument("--no-auto-create", action="store_true",
+                        help="Return 404 for writes to buckets that don't exist")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    emulator = GCSEmulator(
+        host=args.host,
+        port=args.port,
+        faults=fault_injector_from_args(args),
+        auto_create_buckets=not args.no_auto_create,
+        verbose=args.verbose,
+    )
+    for bucket in args.bucket:
+        emulator.state.create_bucket(bucket)
+
+    print(f"✓ GCS emulator listening on {emulator.endpoint}")
+    print(f"  export STORAGE_EMULATOR_HOST={emulator.endpoint}")
+
+    try:
+        emulator._server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n\nInterrupted by user")
+    finally:
+        emulator._server.server_close()
+        print(f"  Requests: {emulator.faults.stats()}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Low-level helpers for the Cloud Storage JSON API resumable upload protocol.
+
+`blob.upload_from_filename` hides the resumable session, so an interrupted
+upload cannot be continued by a later process. These helpers work with the
+session URL directly: it can be saved to disk, queried for the number of bytes
+the server has committed, and continued chunk by chunk from that offset.
+
+Protocol summary (https://cloud.google.com/storage/docs/performing-resumable-uploads):
+    1. Start a session      -> session URL (valid for one week)
+    2. PUT chunks with      Content-Range: bytes START-END/TOTAL
+       - 308 Resume Incomplete + Range header: more data expected
+       - 200/201: upload finished, body is the object resource
+    3. PUT with             Content-Range: bytes */TOTAL   to ask for the offset
+
+Every chunk except the last must be a multiple of 256 KiB.
+
+With a Checksummer, each chunk is hashed as it is sent and the final request
+carries an X-Goog-Hash header, so the server rejects a corrupted upload and
+the returned resource is checked against the local checksum.
+"""
+
+from typing import TYPE_CHECKING, Any, BinaryIO, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+import _shared  # noqa: F401  (puts the shared helpers on sys.path)
+from checksums import HASH_HEADER, READ_BUFFER_SIZE, Checksummer
+from instrumentation import get_instrumentation
+
+if TYPE_CHECKING:
+    from google.auth.transport.requests import AuthorizedSession
+    from google.cloud import storage
+
+
+# Chunk sizes must be multiples of this (except for the final chunk)
+CHUNK_ALIGNMENT = 256 * 1024
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+
+RESUME_INCOMPLETE = 308
+
+
+class ResumableSessionExpired(Exception):
+    """The session URL is no longer valid and the upload must be restarted."""
+
+
+def validate_chunk_size(chunk_size: int) -> None:
+    """
+    Check that a chunk size is accepted by the resumable upload API.
+
+    Raises:
+        ValueError: If chunk_size is not a positive multiple of 256 KiB
+    """
+    if chunk_size <= 0 or chunk_size % CHUNK_ALIGNMENT:
+        raise ValueError(
+            f"Chunk size must be a positive multiple of 256 KiB ({CHUNK_ALIGNMENT} bytes), "
+            f"got {chunk_size}"
+        )
+
+
+def start_session(
+    client: "storage.Client",
+    bucket_name: str,
+    blob_name: str,
+    size: Optional[int] = None,
+    content_type: Optional[str] = None,
+    blob: Optional["storage.Blob"] = None,
+) -> str:
+    """
+    Start a resumable upload session.
+
+    Args:
+        client: Storage client used to authorize the session
+        bucket_name: Name of the GCS bucket
+        blob_name: Destination object name
+        size: Total upload size in bytes, or None if not known up front
+        content_type: MIME type of the object (optional)
+        blob: Pre-configured blob whose metadata (e.g. content_encoding) is
+            sent with the session (optional, built from bucket/blob name)
+
+    Returns:
+        Session URL to PUT data to
+    """
+    if blob is None:
+        blob = client.bucket(bucket_name).blob(blob_name)
+    return blob.create_resumable_upload_session(
+        content_type=content_type,
+        size=size,
+        client=client,
+    )
+
+
+def _content_range(offset: int, length: int, total: Optional[int]) -> str:
+    total_str = "*" if total is None else str(total)
+    if length == 0:
+        return f"bytes */{total_str}"
+    return f"bytes {offset}-{offset + length - 1}/{total_str}"
+
+
+def _parse_response(response) -> Tuple[int, Optional[Dict[str, Any]]]:
+    """Turn a session response into (committed bytes, object resource or None)."""
+    if response.status_code in (200, 201):
+        resource = response.json()
+        return int(resource.get("size", 0)), resource
+
+    if response.status_code == RESUME_INCOMPLETE:
+        # Range header looks like "bytes=0-1048575"; absent means nothing stored yet
+        range_header = response.headers.get("Range")
+        if not range_header:
+            return 0, None
+        return int(range_header.rsplit("-", 1)[1]) + 1, None
+
+    if response.status_code in (404, 410):
+        raise ResumableSessionExpired(
+            f"Resumable session expired or was cancelled (HTTP {response.status_code})"
+        )
+
+    from google.api_core import exceptions
+
+    raise exceptions.from_http_response(response)
+
+
+def query_offset(
+    session: "AuthorizedSession",
+    session_url: str,
+    total: Optional[int] = None,
+) -> Tuple[int, Optional[Dict[str, Any]]]:
+    """
+    Ask the server how many bytes of a session it has committed.
+
+    Args:
+        session: Authorized HTTP session
+        session_url: Session URL returned by `start_session`
+        total: Total upload size, if known
+
+    Returns:
+        Tuple of (committed bytes, object resource if the upload already finished)
+    """
+    response = session.put(
+        session_url,
+        headers={"Content-Range": _content_range(0, 0, total)},
+        data=b"",
+    )
+    return _parse_response(response)
+
+
+def put_chunk(
+    session: "AuthorizedSession",
+    session_url: str,
+    data: bytes,
+    offset: int,
+    total: Optional[int] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> Tuple[int, Optional[Dict[str, Any]]]:
+    """
+    Send one chunk of a resumable upload.
+
+    Args:
+        session: Authorized HTTP session
+        session_url: Session URL returned by `start_session`
+        data: Chunk payload (multiple of 256 KiB unless it is the last chunk)
+        offset: Byte offset of `data` within the object
+        total: Total upload size; pass it with the last chunk to finish
+        headers: Extra request headers (e.g. X-Goog-Hash on the last chunk)
+
+    Returns:
+        Tuple of (committed bytes, object resource once the upload finishes).
+        The server may commit fewer bytes than sent; callers must resume
+        from the returned offset.
+    """
+    hooks = get_instrumentation()
+    with hooks.span("gcs.upload.chunk",
+                        {"gcs.upload.offset": offset, "gcs.upload.chunk_bytes": len(data)}):
+        response = session.put(
+            session_url,
+            headers={"Content-Range": _content_range(offset, len(data), total), **(headers or {})},
+            data=data,
+        )
+        committed, resource = _parse_response(response)
+
+    if hooks.enabled:
+        hooks.add("gcs.upload.chunk.bytes_sent", len(data))
+        if resource is None and committed < offset + len(data):
+            # Sent but not committed: the caller resends these bytes
+            hooks.add("gcs.upload.chunk.uncommitted_bytes", offset + len(data) - committed)
+    return committed, resource
+
+
+def _final_headers(checksummer: Optional[Checksummer]) -> Optional[Dict[str, str]]:
+    if checksummer is None:
+        return None
+    return {HASH_HEADER: checksummer.header()}
+
+
+def _verify(checksummer: Optional[Checksummer], resource: Dict[str, Any]) -> Dict[str, Any]:
+    if checksummer is not None:
+        checksummer.verify(resource)
+    return resource
+
+
+def _hash_committed(checksummer: Checksummer, f: BinaryIO, start: int, committed: int) -> None:
+    """Hash what an earlier process already uploaded (only read when resuming)."""
+    f.seek(start + checksummer.bytes_hashed)
+    while checksummer.bytes_hashed < committed:
+        data = f.read(min(READ_BUFFER_SIZE, committed - checksummer.bytes_hashed))
+        if not data:
+            break
+        checksummer.update(data)
+
+
+def upload_range(
+    session: "AuthorizedSession",
+    session_url: str,
+    path: str,
+    start: int,
+    length: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    resume: bool = False,
+    checksummer: Optional[Checksummer] = None,
+) -> Dict[str, Any]:
+    """
+    Upload a byte range of a local file through a resumable session.
+
+    Args:
+        session: Authorized HTTP session
+        session_url: Session URL for an object of exactly `length` bytes
+        path: Local file path
+        start: Offset of the range within the file
+        length: Number of bytes to upload
+        chunk_size: Bytes sent per request (multiple of 256 KiB)
+        resume: Query the server first and continue from its committed offset
+        checksummer: Hash the range while sending it and verify the result
+            (e.g. Checksummer.for_upload(); empty, or fed with this range only)
+
+    Returns:
+        Object resource returned by the server
+
+    Raises:
+        ChecksumMismatchError: The server's checksum differs from the data read
+    """
+    validate_chunk_size(chunk_size)
+
+    committed = 0
+    resource = None
+    if resume:
+        committed, resource = query_offset(session, session_url, length)
+
+    with open(path, "rb") as f:
+        if checksummer is not None and checksummer.bytes_hashed < committed:
+            _hash_committed(checksummer, f, start, committed)
+        if resource is not None:
+            return _verify(checksummer, resource)
+
+        while True:
+            f.seek(start + committed)
+            data = f.read(min(chunk_size, length - committed))
+            if not data and committed < length:
+                raise IOError(f"{path} is shorter than expected (file changed during upload?)")
+
+            headers = None
+            if checksummer is not None:
+                checksummer.update_at(committed, data)
+                if committed + len(data) == length:
+                    headers = _final_headers(checksummer)
+
+            committed, resource = put_chunk(session, session_url, data, committed, length, headers)
+            if resource is not None:
+                return _verify(checksummer, resource)
+
+
+def iter_file_chunks(fileobj: BinaryIO, read_size: int = CHUNK_ALIGNMENT) -> Iterator[bytes]:
+    """
+    Read a binary file-like object (e.g. sys.stdin.buffer) in chunks.
+
+    Args:
+        fileobj: Object with a read(size) method returning bytes
+        read_size: Maximum bytes per read
+
+    Yields:
+        Chunks of bytes until end of stream
+    """
+    while True:
+        data = fileobj.read(read_size)
+        if not data:
+            return
+        yield data
+
+
+def upload_stream(
+    session: "AuthorizedSession",
+    session_url: str,
+    source: Union[BinaryIO, Iterable[bytes]],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    checksummer: Optional[Checksummer] = None,
+) -> Dict[str, Any]:
+    """
+    Upload a stream of unknown length through a resumable session.
+
+    Incoming data is re-blocked into `chunk_size` requests, so memory use is
+    bounded by roughly one chunk plus the largest piece the source yields,
+    whatever the total size.
+
+    Args:
+        session: Authorized HTTP session
+        session_url: Session URL started with size=None
+        source: Binary file-like object or iterable of bytes chunks
+        chunk_size: Bytes per request (multiple of 256 KiB)
+        checksummer: Hash the stream while sending it and verify the result
+
+    Returns:
+        Object resource returned by the server
+
+    Raises:
+        ChecksumMismatchError: The server's checksum differs from the data sent
+    """
+    validate_chunk_size(chunk_size)
+
+    chunks = iter_file_chunks(source, chunk_size) if hasattr(source, "read") else iter(source)
+    buffer = bytearray()
+    offset = 0
+    exhausted = False
+
+    while True:
+        # Buffer more than one chunk so we know whether the next one is the last
+        while not exhausted and len(buffer) <= chunk_size:
+            try:
+                buffer += next(chunks)
+            except StopIteration:
+                exhausted = True
+
+        if exhausted and len(buffer) <= chunk_size:
+            # Final request: the total size is known now
+            total = offset + len(buffer)
+            data = bytes(buffer)
+            if checksummer is not None:
+                checksummer.update_at(offset, data)
+            committed, resource = put_chunk(session, session_url, data, offset, total,
+                                            _final_headers(checksummer))
+            if resource is not None:
+                return _verify(checksummer, resource)
+            # Part of the last chunk was committed: resend the rest below
+            if committed <= offset:
+                raise IOError("Server did not commit any of the last chunk")
+        else:
+            data = bytes(buffer[:chunk_size])
+            if checksummer is not None:
+                checksummer.update_at(offset, data)
+            committed, resource = put_chunk(session, session_url, data, offset, None)
+            if resource is not None:
+                return _verify(checksummer, resource)
+            if committed <= offset:
+                raise IOError(f"Server did not commit any of the chunk at byte {offset}")
+
+        # Keep anything the server did not commit at the front of the buffer
+        del buffer[:committed - offset]
+        offset = committed
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Incremental, rsync-like directory sync to Google Cloud Storage.
+
+Re-uploading an entire directory every night wastes hours on files that have
+not changed. A sync run instead:
+
+    1. Walks the local directory and looks each file up in a local manifest
+       (path, size, mtime, CRC32C, MD5); files whose size and mtime match the
+       manifest reuse the stored checksums instead of being re-read
+    2. Lists the remote prefix once (paginated, only name/size/checksum fields)
+    3. Uploads only files that are missing remotely or whose checksum differs,
+       using the parallel bulk uploader
+    4. Checks the checksums of each stored object against the manifest entry
+       and saves the updated manifest
+
+Objects that exist remotely but not locally are left alone: the Storage Object
+Creator role cannot delete objects, and a publishing job rarely wants that.
+
+Usage:
+    from sync_upload import sync_directory
+
+    report = sync_directory("my-bucket", "./site", prefix="public")
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from google.cloud import storage
+
+import _shared  # noqa: F401  (puts the shared helpers on sys.path)
+from bulk_upload import DEFAULT_MAX_WORKERS, UploadResult, collect_directory, upload_many
+from checksums import file_checksums
+from gcs_client_pool import get_storage_client
+from resilience import CircuitBreaker, RetryPolicy
+
+
+MANIFEST_FILENAME = ".gcs-sync-manifest.json"
+
+# Ask the listing for just what the comparison needs
+LIST_FIELDS = "items(name,size,crc32c,md5Hash),nextPageToken"
+LIST_PAGE_SIZE = 1000
+
+
+@dataclass
+class SyncReport:
+    """Summary of one sync run."""
+
+    new: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    rehashed: int = 0
+    results: List[UploadResult] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def success(self) -> bool:
+        """True if every planned upload succeeded."""
+        return all(result.success for result in self.results)
+
+
+def load_manifest(manifest_path: Path) -> Dict[str, Dict[str, Any]]:
+    """Load the local manifest, or return an empty one if missing or corrupt."""
+    try:
+        return json.loads(manifest_path.read_text())
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def save_manifest(manifest_path: Path, manifest: Dict[str, Dict[str, Any]]) -> None:
+    """Write the manifest atomically."""
+    tmp_path = manifest_path.with_name(manifest_path.name + ".tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=1, sort_keys=True))
+    os.replace(tmp_path, manifest_path)
+
+
+def local_entry(path: str, previous: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], bool]:
+    """
+    Describe a local file, reusing checksums when size and mtime are unchanged.
+
+    Args:
+        path: Local file path
+        previous: Manifest entry from the last run (optional)
+
+    Returns:
+        Tuple of (manifest entry, whether the file had to be re-hashed)
+    """
+    stat = os.stat(path)
+    if (previous
+            and previous.get("size") == stat.st_size
+            and previous.get("mtime_ns") == stat.st_mtime_ns):
+        return previous, False
+
+    crc32c, md5 = file_checksums(path)
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "crc32c": crc32c,
+        "md5": md5,
+    }, True
+
+
+def list_remote(
+    client: "storage.Client",
+    bucket_name: str,
+    prefix: str,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    List remote objects under a prefix with one paginated listing.
+
+    Returns:
+        Mapping of object name to {"size", "crc32c", "md5"}
+    """
+    remote = {}
+    blobs = client.list_blobs(
+        bucket_name,
+        prefix=f"{prefix}/" if prefix else None,
+        fields=LIST_FIELDS,
+        page_size=LIST_PAGE_SIZE,
+    )
+    for blob in blobs:
+        remote[blob.name] = {
+            "size": blob.size,
+            "crc32c": blob.crc32c,
+            "md5": blob.md5_hash,
+        }
+    return remote
+
+
+def is_unchanged(local: Dict[str, Any], remote: Dict[str, Any]) -> bool:
+    """Compare a manifest entry to remote metadata (CRC32C first, then MD5)."""
+    if remote.get("size") != local["size"]:
+        return False
+    if remote.get("crc32c"):
+        return remote["crc32c"] == local["crc32c"]
+    if remote.get("md5"):
+        return remote["md5"] == local["md5"]
+    return False
+
+
+def _check_uploads(
+    results: List[UploadResult],
+    root: Path,
+    manifest: Dict[str, Dict[str, Any]],
+) -> None:
+    """
+    Fail uploads whose stored checksums differ from their manifest entry.
+
+    That happens when a file changes between being hashed and being sent;
+    its entry is dropped so the next run hashes it again.
+    """
+    for result in results:
+        if not result.success:
+            continue
+        relative = Path(result.source).relative_to(root).as_posix()
+        stored = {"size": result.size, "crc32c": result.crc32c, "md5": result.md5}
+        if not is_unchanged(manifest[relative], stored):
+            result.success = False
+            result.error = ("ChecksumMismatchError: stored object doesn't match the "
+                            "checksums in the manifest (changed during the sync?)")
+            del manifest[relative]
+
+
+def sync_directory(
+    bucket_name: str,
+    directory: str,
+    prefix: str = "",
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    manifest_path: Optional[str] = None,
+    dry_run: bool = False,
+    client: Optional["storage.Client"] = None,
+    verbose: bool = False,
+    retry_policy: Optional[RetryPolicy] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    verify: bool = True,
+) -> SyncReport:
+    """
+    Upload only the new or changed files of a directory.
+
+    Args:
+        bucket_name: Name of the GCS bucket
+        directory: Local directory to sync
+        prefix: Object name prefix in the bucket (optional)
+        max_workers: Number of parallel uploads
+        manifest_path: Local manifest location (optional, defaults to
+            .gcs-sync-manifest.json inside the directory, which is never uploaded)
+        dry_run: Compare and report, but don't upload or update the manifest
+        client: Storage client (optional, defaults to the shared pooled client)
+        verbose: Print a line per uploaded file
+        retry_policy: Retries per file (optional, see bulk_upload.upload_many)
+        circuit_breaker: Breaker shared by the uploads (optional)
+        verify: Send checksums with the uploads and check the stored objects'
+            checksums against the manifest; mismatches count as failures and
+            are not recorded
+
+    Returns:
+        SyncReport describing what was (or would be) uploaded
+    """
+    client = client or get_storage_client()
+    prefix = prefix.strip("/")
+    manifest_file = Path(manifest_path) if manifest_path else Path(directory) / MANIFEST_FILENAME
+
+    manifest = load_manifest(manifest_file)
+    remote = list_remote(client, bucket_name, prefix)
+    report = SyncReport()
+
+    root = Path(directory)
+    pending: List[Tuple[str, str]] = []
+    updated_manifest: Dict[str, Dict[str, Any]] = {}
+
+    for source, destination in collect_directory(directory, prefix=prefix):
+        relative = Path(source).relative_to(root).as_posix()
+        if Path(source).resolve() == manifest_file.resolve():
+            continue
+
+        entry, rehashed = local_entry(source, manifest.get(relative))
+        report.rehashed += rehashed
+        updated_manifest[relative] = entry
+
+        remote_entry = remote.get(destination)
+        if remote_entry is None:
+            report.new.append(destination)
+            pending.append((source, destination))
+        elif not is_unchanged(entry, remote_entry):
+            report.changed.append(destination)
+            pending.append((source, destination))
+        else:
+            report.unchanged += 1
+
+    if dry_run or not pending:
+        if not dry_run:
+            save_manifest(manifest_file, updated_manifest)
+        return report
+
+    report.results, report.elapsed = upload_many(
+        bucket_name, pending, max_workers=max_workers, client=client, verbose=verbose,
+        retry_policy=retry_policy, circuit_breaker=circuit_breaker, verify=verify
+    )
+    if verify:
+        _check_uploads(report.results, root, updated_manifest)
+
+    # The manifest only caches local checksums; failed files are still
+    # detected as new/changed next run because the comparison is remote
+    save_manifest(manifest_file, updated_manifest)
+
+    return report
@@ -0,0 +1,22 @@
+"""Shared fixtures: the tutorial modules on sys.path and a local GCS emulator."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import _shared  # noqa: E402,F401  (puts the shared helpers on sys.path)
+from gcs_client_pool import clear_client_pool  # noqa: E402
+from gcs_emulator import GCSEmulator  # noqa: E402
+
+
+@pytest.fixture
+def gcs(monkeypatch):
+    """A running GCS emulator that the pooled storage clients talk to."""
+    with GCSEmulator() as emulator:
+        monkeypatch.setenv("STORAGE_EMULATOR_HOST", emulator.endpoint)
+        clear_client_pool()
+        yield emulator
+        clear_client_pool()
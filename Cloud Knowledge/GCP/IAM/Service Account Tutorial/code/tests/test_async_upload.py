@@ -0,0 +1,79 @@
+"""Tests for AsyncGCSUploader (async_upload.py) against the local GCS emulator."""
+
+import asyncio
+
+import pytest
+
+from async_upload import AsyncGCSUploader
+from resumable_upload import CHUNK_ALIGNMENT
+
+BUCKET = "test-bucket"
+
+
+def _payload(size: int) -> bytes:
+    return bytes(i % 251 for i in range(size))
+
+
+def _run(gcs, upload, **options):
+    async def main():
+        async with AsyncGCSUploader(api_endpoint=gcs.endpoint, chunk_size=CHUNK_ALIGNMENT,
+                                    **options) as uploader:
+            return await upload(uploader)
+
+    return asyncio.run(main())
+
+
+def test_concurrent_uploads_respect_max_concurrency(gcs, tmp_path):
+    gcs.faults.latency_ms = 20
+    large = tmp_path / "large.bin"
+    large.write_bytes(_payload(2 * CHUNK_ALIGNMENT + 1000))
+    in_flight = peak = 0
+
+    async def upload(uploader):
+        upload_bytes = uploader._upload_bytes
+
+        async def counted(*args):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            try:
+                return await upload_bytes(*args)
+            finally:
+                in_flight -= 1
+
+        uploader._upload_bytes = counted
+        return await asyncio.gather(
+            uploader.upload_file(BUCKET, str(large), "files/large.bin"),
+            *(uploader.upload_bytes(BUCKET, f"events/{i}.json", b'{"i": %d}' % i,
+                                    "application/json")
+              for i in range(20))
+        )
+
+    resources = _run(gcs, upload, max_concurrency=4)
+
+    assert len(resources) == 21
+    assert 1 < peak <= 4
+    assert gcs.object_data(BUCKET, "files/large.bin") == large.read_bytes()
+    for i in range(20):
+        assert gcs.object_data(BUCKET, f"events/{i}.json") == b'{"i": %d}' % i
+    assert gcs.state.get(BUCKET, "events/0.json").content_type == "application/json"
+
+
+@pytest.mark.parametrize("size", [1000, CHUNK_ALIGNMENT + 1000])
+def test_upload_stream_resends_partially_committed_chunks(gcs, size):
+    gcs.state.max_commit_bytes = 300
+    data = _payload(size)
+
+    resource = _run(gcs, lambda uploader: uploader.upload_stream(
+        BUCKET, "partial.bin", [data[:400], data[400:]]))
+
+    assert int(resource["size"]) == len(data)
+    assert gcs.object_data(BUCKET, "partial.bin") == data
+
+
+@pytest.mark.parametrize("size", [1000, CHUNK_ALIGNMENT + 1000])
+def test_upload_stream_fails_when_nothing_is_committed(gcs, size):
+    gcs.state.max_commit_bytes = 0
+
+    with pytest.raises(IOError, match="did not commit"):
+        _run(gcs, lambda uploader: uploader.upload_stream(BUCKET, "stuck.bin", [_payload(size)]))
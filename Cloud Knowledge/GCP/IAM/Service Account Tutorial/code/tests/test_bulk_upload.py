@@ -0,0 +1,126 @@
+"""Tests for bulk_upload.py against the local GCS emulator."""
+
+import argparse
+import sys
+from pathlib import Path
+
+import pytest
+
+from bulk_upload import collect_directory, print_summary, read_manifest, upload_many
+from checksums import file_checksums
+from fault_injection import UNAVAILABLE
+from resilience import NO_RETRY, CircuitBreaker, RetryPolicy
+from upload_to_gcs import bulk_upload, main
+
+BUCKET = "test-bucket"
+
+
+@pytest.fixture
+def artifacts(tmp_path):
+    root = tmp_path / "artifacts"
+    (root / "logs").mkdir(parents=True)
+    (root / "index.html").write_text("<html></html>")
+    (root / "logs" / "build.log").write_text("ok\n" * 100)
+    return root
+
+
+def test_collect_directory_keeps_layout_under_prefix(artifacts):
+    assert [dest for _, dest in collect_directory(str(artifacts), prefix="/builds/1/")] == [
+        "builds/1/index.html", "builds/1/logs/build.log"
+    ]
+
+
+def test_read_manifest(tmp_path, artifacts):
+    manifest = tmp_path / "files.txt"
+    manifest.write_text(f"# comment\n\n{artifacts / 'index.html'}\n"
+                        f"{artifacts / 'logs' / 'build.log'}\tlogs/latest.log\n")
+
+    assert read_manifest(str(manifest), prefix="site") == [
+        (str(artifacts / "index.html"), "site/index.html"),
+        (str(artifacts / "logs" / "build.log"), "site/logs/latest.log"),
+    ]
+
+
+def test_upload_many_uploads_every_file(gcs, artifacts):
+    files = collect_directory(str(artifacts), prefix="builds/1")
+
+    results, elapsed = upload_many(BUCKET, files, max_workers=4)
+
+    assert all(result.success for result in results) and elapsed > 0
+    for source, destination in files:
+        assert gcs.object_data(BUCKET, destination) == Path(source).read_bytes()
+    assert sum(result.size for result in results) == sum(Path(source).stat().st_size
+                                                         for source, _ in files)
+
+
+def test_upload_many_captures_per_file_failures(gcs, artifacts, capsys):
+    files = collect_directory(str(artifacts)) + [(str(artifacts / "missing.txt"), "missing.txt")]
+
+    results, elapsed = upload_many(BUCKET, files, max_workers=4)
+
+    failed = [result for result in results if not result.success]
+    assert len(results) == 3 and len(failed) == 1
+    assert failed[0].destination == "missing.txt"
+    assert failed[0].error.startswith("FileNotFoundError")
+
+    print_summary(results, elapsed)
+    out, err = capsys.readouterr()
+    assert "Files uploaded: 2/3" in out
+    assert "1 file(s) failed" in err and "missing.txt" in err
+
+
+def _bulk_args(**overrides):
+    args = dict(dir=None, manifest=None, prefix="", workers=4, verbose=False, no_verify=False)
+    args.update(overrides)
+    return argparse.Namespace(**args)
+
+
+def test_bulk_upload_exit_status(gcs, artifacts, tmp_path):
+    assert bulk_upload(BUCKET, _bulk_args(dir=str(artifacts))) == 0
+
+    manifest = tmp_path / "files.txt"
+    manifest.write_text(f"{artifacts / 'index.html'}\n{tmp_path / 'missing.txt'}\n")
+    assert bulk_upload(BUCKET, _bulk_args(manifest=str(manifest))) == 1
+
+
+def test_transient_failures_are_retried(gcs, artifacts, monkeypatch):
+    inject = gcs.faults.inject
+    failures = iter([UNAVAILABLE, UNAVAILABLE])
+    monkeypatch.setattr(gcs.faults, "inject", lambda: next(failures, None) or inject())
+    policy = RetryPolicy(max_attempts=3, initial_backoff=0, deadline=None)
+
+    results, _ = upload_many(BUCKET, collect_directory(str(artifacts)), max_workers=1,
+                             retry_policy=policy)
+
+    assert all(result.success for result in results)
+    assert gcs.faults.stats()["requests"] == 2
+
+
+def test_open_breaker_stops_the_batch(gcs, tmp_path):
+    for i in range(10):
+        (tmp_path / f"{i}.txt").write_text(str(i))
+    gcs.faults.error_rate = 1.0
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=60)
+
+    results, _ = upload_many(BUCKET, collect_directory(str(tmp_path)), max_workers=1,
+                             retry_policy=NO_RETRY, circuit_breaker=breaker)
+
+    # Three files reach the server, the rest fail fast without a request
+    errors = sorted(result.error.split(":")[0] for result in results)
+    assert errors == ["CircuitOpenError"] * 7 + ["ServiceUnavailable"] * 3
+
+
+def test_cli_rejects_compression_for_bulk_uploads(artifacts, monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["upload_to_gcs.py", "--bucket", BUCKET,
+                                      "--dir", str(artifacts), "--compress", "gzip"])
+
+    assert main() == 1
+    assert "--compress only applies to single-file uploads" in capsys.readouterr().err
+
+
+def test_results_carry_the_stored_checksums(gcs, artifacts):
+    results, _ = upload_many(BUCKET, collect_directory(str(artifacts)))
+
+    for result in results:
+        assert (result.crc32c, result.md5) == file_checksums(result.source)
+
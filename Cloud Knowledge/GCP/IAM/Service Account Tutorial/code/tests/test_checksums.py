@@ -0,0 +1,60 @@
+"""Tests for checksums.py."""
+
+import base64
+import hashlib
+
+import google_crc32c
+import pytest
+
+from checksums import ChecksumMismatchError, Checksummer, crc32c_combine, file_checksums
+
+
+def _crc(data: bytes) -> int:
+    return google_crc32c.value(data)
+
+
+@pytest.mark.parametrize("split", [0, 1, 1000, 4096])
+def test_crc32c_combine_matches_whole_buffer(split):
+    data = bytes(range(256)) * 16
+    a, b = data[:split], data[split:]
+
+    assert crc32c_combine(_crc(a), _crc(b), len(b)) == _crc(data)
+
+
+def test_update_at_skips_resent_bytes():
+    data = b"0123456789" * 100
+    checksummer = Checksummer()
+    checksummer.update_at(0, data[:600])
+    # The server committed only 400 bytes; the rest is resent with new data
+    checksummer.update_at(400, data[400:])
+
+    assert checksummer.crc32c_value == _crc(data)
+    assert checksummer.md5 == base64.b64encode(hashlib.md5(data).digest()).decode("ascii")
+
+
+def test_update_at_rejects_gaps():
+    checksummer = Checksummer()
+    with pytest.raises(ValueError):
+        checksummer.update_at(10, b"data")
+
+
+def test_verify_detects_mismatch():
+    checksummer = Checksummer()
+    checksummer.update(b"sent")
+    other = Checksummer()
+    other.update(b"stored")
+
+    assert checksummer.verify({"crc32c": checksummer.crc32c}) == "crc32c"
+    # Composite objects have no MD5; nothing to compare
+    assert Checksummer(crc32c=False).verify({"crc32c": checksummer.crc32c}) is None
+    with pytest.raises(ChecksumMismatchError):
+        checksummer.verify({"crc32c": other.crc32c, "name": "obj"})
+
+
+def test_file_checksums(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"hello" * 1000)
+    checksummer = Checksummer()
+    checksummer.update(path.read_bytes())
+
+    assert file_checksums(str(path)) == (checksummer.crc32c, checksummer.md5)
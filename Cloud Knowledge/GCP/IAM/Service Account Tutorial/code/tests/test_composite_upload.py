@@ -0,0 +1,73 @@
+"""Tests for composite_upload.py against the local GCS emulator."""
+
+import os
+
+import pytest
+
+import composite_upload
+from checksums import ChecksumMismatchError
+from composite_upload import _default_journal_path, upload_large_file
+
+BUCKET = "test-bucket"
+CHUNK = 256 * 1024
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "backup.tar"
+    path.write_bytes(os.urandom(3 * CHUNK + 1000))
+    return path
+
+
+def _upload(source):
+    return upload_large_file(BUCKET, str(source), "backups/backup.tar",
+                             chunk_size=CHUNK, part_size=CHUNK, max_parallel_parts=4)
+
+
+def _object_names(gcs):
+    return sorted(gcs.state.buckets.get(BUCKET, {}))
+
+
+def test_parts_are_composed_verified_and_cleaned_up(gcs, source):
+    result = _upload(source)
+
+    assert result["parts"] == 4
+    assert result["verified"] == "crc32c"
+    assert gcs.object_data(BUCKET, "backups/backup.tar") == source.read_bytes()
+    assert _object_names(gcs) == ["backups/backup.tar"]
+    assert not _default_journal_path(str(source)).exists()
+
+
+def test_interrupted_upload_resumes_from_journal(gcs, source, monkeypatch):
+    compose = composite_upload._compose
+
+    def fail_once(*args, **kwargs):
+        monkeypatch.setattr(composite_upload, "_compose", compose)
+        raise ConnectionError("dropped")
+
+    monkeypatch.setattr(composite_upload, "_compose", fail_once)
+    with pytest.raises(ConnectionError):
+        _upload(source)
+    assert _default_journal_path(str(source)).exists()
+
+    result = _upload(source)
+    assert result["resumed"]
+    assert gcs.object_data(BUCKET, "backups/backup.tar") == source.read_bytes()
+    assert _object_names(gcs) == ["backups/backup.tar"]
+
+
+def test_combined_checksum_mismatch_discards_journal_and_parts(gcs, source, monkeypatch):
+    combined = composite_upload._combined_crc32c
+    monkeypatch.setattr(composite_upload, "_combined_crc32c",
+                        lambda parts, lengths: combined(parts, lengths) ^ 1)
+
+    with pytest.raises(ChecksumMismatchError):
+        _upload(source)
+    assert _object_names(gcs) == []
+    assert not _default_journal_path(str(source)).exists()
+
+    # A re-run starts over instead of composing parts that are gone
+    monkeypatch.setattr(composite_upload, "_combined_crc32c", combined)
+    result = _upload(source)
+    assert not result["resumed"]
+    assert gcs.object_data(BUCKET, "backups/backup.tar") == source.read_bytes()
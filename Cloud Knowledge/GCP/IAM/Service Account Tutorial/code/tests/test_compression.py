@@ -0,0 +1,44 @@
+"""Tests for compression.py."""
+
+import gzip
+
+import pytest
+
+from compression import CompressionStats, compress_chunks, should_compress
+
+
+def test_gzip_round_trip_and_stats():
+    data = [b"log line %d\n" % i for i in range(1000)]
+    stats = CompressionStats("gzip")
+
+    compressed = b"".join(compress_chunks(data, "gzip", stats=stats))
+
+    assert gzip.decompress(compressed) == b"".join(data)
+    assert stats.bytes_in == sum(map(len, data))
+    assert stats.bytes_out == len(compressed)
+    assert stats.ratio < 1
+
+
+def test_zstd_round_trip():
+    zstandard = pytest.importorskip("zstandard")
+    data = b"x" * 100_000
+
+    compressed = b"".join(compress_chunks([data], "zstd"))
+
+    assert zstandard.ZstdDecompressor().decompressobj().decompress(compressed) == data
+
+
+def test_unknown_codec_raises_value_error():
+    with pytest.raises(ValueError, match="Unknown codec"):
+        list(compress_chunks([b"data"], "brotli"))
+
+
+@pytest.mark.parametrize("path, content_type, size, expected", [
+    ("app.log", "text/plain", 10_000, True),
+    ("app.log", "text/plain", 10, False),
+    ("backup.tar.gz", None, 10_000, False),
+    ("photo", "image/jpeg", 10_000, False),
+    ("icon.svg", "image/svg+xml", 10_000, True),
+])
+def test_should_compress(path, content_type, size, expected):
+    assert should_compress(path, content_type, size) is expected
@@ -0,0 +1,48 @@
+"""Tests for resumable_upload.py against the local GCS emulator."""
+
+import pytest
+
+from checksums import Checksummer
+from gcs_client_pool import get_authorized_session, get_storage_client
+from resumable_upload import CHUNK_ALIGNMENT, start_session, upload_stream
+
+BUCKET = "test-bucket"
+
+
+def _payload(size: int) -> bytes:
+    return bytes(i % 251 for i in range(size))
+
+
+def test_upload_stream_unknown_length(gcs):
+    data = _payload(3 * CHUNK_ALIGNMENT + 1000)
+    session_url = start_session(get_storage_client(), BUCKET, "stream.bin")
+
+    resource = upload_stream(get_authorized_session(), session_url, [data[:5000], data[5000:]],
+                             chunk_size=CHUNK_ALIGNMENT, checksummer=Checksummer())
+
+    assert int(resource["size"]) == len(data)
+    assert gcs.object_data(BUCKET, "stream.bin") == data
+
+
+@pytest.mark.parametrize("size", [1000, CHUNK_ALIGNMENT + 1000])
+def test_upload_stream_resends_partially_committed_last_chunk(gcs, size):
+    # Every PUT, including the last one, commits only part of what was sent
+    gcs.state.max_commit_bytes = 300
+    data = _payload(size)
+    session_url = start_session(get_storage_client(), BUCKET, "partial.bin")
+
+    resource = upload_stream(get_authorized_session(), session_url, [data],
+                             chunk_size=CHUNK_ALIGNMENT, checksummer=Checksummer())
+
+    assert int(resource["size"]) == len(data)
+    assert gcs.object_data(BUCKET, "partial.bin") == data
+
+
+@pytest.mark.parametrize("size", [1000, CHUNK_ALIGNMENT + 1000])
+def test_upload_stream_fails_when_nothing_is_committed(gcs, size):
+    gcs.state.max_commit_bytes = 0
+    session_url = start_session(get_storage_client(), BUCKET, "stuck.bin")
+
+    with pytest.raises(IOError, match="did not commit"):
+        upload_stream(get_authorized_session(), session_url, [_payload(size)],
+                      chunk_size=CHUNK_ALIGNMENT)
@@ -0,0 +1,99 @@
+"""Tests for sync_upload.py against the local GCS emulator."""
+
+import os
+
+import pytest
+
+import sync_upload
+from checksums import file_checksums
+from sync_upload import MANIFEST_FILENAME, is_unchanged, load_manifest, sync_directory
+
+BUCKET = "test-bucket"
+
+
+@pytest.fixture
+def bucket(gcs):
+    # Listing a bucket that doesn't exist is an error, as in Cloud Storage
+    gcs.state.create_bucket(BUCKET)
+    return gcs
+
+
+def _site(tmp_path):
+    root = tmp_path / "site"
+    (root / "css").mkdir(parents=True)
+    (root / "index.html").write_text("<html>v1</html>")
+    (root / "css" / "style.css").write_text("body {}")
+    return root
+
+
+def test_is_unchanged_prefers_crc32c():
+    local = {"size": 3, "crc32c": "aaa", "md5": "mmm"}
+
+    assert is_unchanged(local, {"size": 3, "crc32c": "aaa", "md5": "other"})
+    assert not is_unchanged(local, {"size": 3, "crc32c": "bbb", "md5": "mmm"})
+    assert not is_unchanged(local, {"size": 4, "crc32c": "aaa"})
+    # Composite objects have no MD5; without any checksum, upload again
+    assert is_unchanged(local, {"size": 3, "crc32c": None, "md5": "mmm"})
+    assert not is_unchanged(local, {"size": 3, "crc32c": None, "md5": None})
+
+
+def test_second_sync_uploads_nothing(bucket, tmp_path):
+    root = _site(tmp_path)
+
+    first = sync_directory(BUCKET, str(root), prefix="public")
+    assert sorted(first.new) == ["public/css/style.css", "public/index.html"]
+    assert first.success and first.rehashed == 2
+    assert bucket.object_data(BUCKET, "public/index.html") == b"<html>v1</html>"
+
+    manifest = load_manifest(root / MANIFEST_FILENAME)
+    assert sorted(manifest) == ["css/style.css", "index.html"]
+    assert (manifest["index.html"]["crc32c"], manifest["index.html"]["md5"]) == \
+        file_checksums(str(root / "index.html"))
+
+    second = sync_directory(BUCKET, str(root), prefix="public")
+    assert second.new == [] and second.changed == [] and second.results == []
+    assert second.unchanged == 2 and second.rehashed == 0
+    # The manifest itself is never uploaded
+    assert f"public/{MANIFEST_FILENAME}" not in bucket.state.buckets[BUCKET]
+
+
+def test_modified_file_is_uploaded_again(bucket, tmp_path):
+    root = _site(tmp_path)
+    sync_directory(BUCKET, str(root), prefix="public")
+
+    index = root / "index.html"
+    index.write_text("<html>v2!</html>")
+    os.utime(index, ns=(index.stat().st_atime_ns, index.stat().st_mtime_ns + 1_000_000_000))
+
+    report = sync_directory(BUCKET, str(root), prefix="public")
+    assert report.changed == ["public/index.html"]
+    assert report.unchanged == 1 and report.rehashed == 1
+    assert bucket.object_data(BUCKET, "public/index.html") == b"<html>v2!</html>"
+
+
+def test_dry_run_uploads_nothing(bucket, tmp_path):
+    root = _site(tmp_path)
+
+    report = sync_directory(BUCKET, str(root), dry_run=True)
+    assert len(report.new) == 2 and report.results == []
+    assert not bucket.state.buckets[BUCKET]
+    assert not (root / MANIFEST_FILENAME).exists()
+
+
+def test_file_changed_during_sync_is_not_recorded(bucket, tmp_path, monkeypatch):
+    root = _site(tmp_path)
+    upload_many = sync_upload.upload_many
+
+    def change_then_upload(*args, **kwargs):
+        # Hashed already; the bytes sent no longer match the manifest entry
+        (root / "index.html").write_text("<html>edited</html>")
+        return upload_many(*args, **kwargs)
+
+    monkeypatch.setattr(sync_upload, "upload_many", change_then_upload)
+    report = sync_directory(BUCKET, str(root))
+
+    failed = [result for result in report.results if not result.success]
+    assert [result.destination for result in failed] == ["index.html"]
+    assert failed[0].error.startswith("ChecksumMismatchError")
+    assert not report.success
+    assert sorted(load_manifest(root / MANIFEST_FILENAME)) == ["css/style.css"]
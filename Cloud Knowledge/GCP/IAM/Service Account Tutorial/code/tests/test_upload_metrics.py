@@ -0,0 +1,82 @@
+"""Spans and counters reported by the uploaders, against the local GCS emulator."""
+
+import pytest
+
+from bulk_upload import upload_many
+from instrumentation import Instrumentation, RecordingInstrumentation, set_instrumentation
+from upload_to_gcs import upload_file_to_gcs, upload_stream_to_gcs, upload_string_to_gcs
+
+BUCKET = "test-bucket"
+
+
+@pytest.fixture
+def recorder():
+    recorder = RecordingInstrumentation()
+    previous = set_instrumentation(recorder)
+    yield recorder
+    set_instrumentation(previous)
+
+
+def _upload_durations(recorder):
+    return recorder.snapshot()["histograms"]["gcs.upload.duration"]
+
+
+def test_file_upload(gcs, tmp_path, recorder):
+    source = tmp_path / "report.txt"
+    source.write_bytes(b"hello world\n" * 100)
+
+    assert upload_file_to_gcs(BUCKET, str(source), "report.txt")
+    assert recorder.counter("gcs.upload.bytes",
+                            {"gcs.upload.source": "file", "gcs.upload.method": "simple"}) == 1200
+    assert sum(recorder.snapshot()["counters"]["gcs.upload.checksums"].values()) == 1
+    assert _upload_durations(recorder)["gcs.upload.source=file,outcome=ok"]["count"] == 1
+
+
+def test_stream_upload_counts_chunks_and_resent_bytes(gcs, recorder):
+    # Each PUT commits only part of what was sent, so bytes are resent
+    gcs.state.max_commit_bytes = 300
+    data = b"x" * 1000
+
+    assert upload_stream_to_gcs(BUCKET, [data], "stream.bin", verify=False)
+
+    sent = recorder.counter("gcs.upload.chunk.bytes_sent")
+    assert sent > len(data)
+    assert recorder.counter("gcs.upload.chunk.uncommitted_bytes") == sent - len(data)
+    assert recorder.counter("gcs.upload.bytes",
+                            {"gcs.upload.source": "stream", "gcs.upload.method": "resumable"}) == len(data)
+    assert recorder.snapshot()["histograms"]["gcs.upload.chunk.duration"]["outcome=ok"]["count"] == 4
+
+
+def test_string_upload(gcs, recorder):
+    assert upload_string_to_gcs(BUCKET, "hello", "hello.txt", verify=False)
+
+    assert recorder.counter("gcs.upload.bytes",
+                            {"gcs.upload.source": "string", "gcs.upload.method": "simple"}) == 5
+    assert "gcs.upload.checksums" not in recorder.snapshot()["counters"]
+
+
+def test_bulk_upload_counts_successes_and_failures(gcs, tmp_path, recorder):
+    (tmp_path / "a.txt").write_bytes(b"aaaa")
+    results, _ = upload_many(BUCKET, [(str(tmp_path / "a.txt"), "a.txt"),
+                                   (str(tmp_path / "missing.txt"), "missing.txt")])
+
+    assert {result.destination: result.success for result in results} == {
+        "a.txt": True, "missing.txt": False
+    }
+    assert recorder.counter("gcs.upload.bytes", {"gcs.upload.source": "bulk"}) == 4
+    durations = _upload_durations(recorder)
+    assert durations["gcs.upload.source=bulk,outcome=ok"]["count"] == 1
+    assert durations["gcs.upload.source=bulk,outcome=error"]["count"] == 1
+
+
+def test_default_instrumentation_records_nothing(gcs, tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(Instrumentation, "add", lambda self, *args, **kwargs: calls.append(args))
+    monkeypatch.setattr(Instrumentation, "record", lambda self, *args, **kwargs: calls.append(args))
+    source = tmp_path / "report.txt"
+    source.write_bytes(b"hello world\n")
+
+    assert upload_file_to_gcs(BUCKET, str(source), "report.txt")
+    assert upload_string_to_gcs(BUCKET, "hello", "hello.txt")
+
+    assert calls == []
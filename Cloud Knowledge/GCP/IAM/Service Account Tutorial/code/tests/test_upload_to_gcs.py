@@ -0,0 +1,48 @@
+"""Tests for upload_to_gcs.py against the local GCS emulator."""
+
+import pytest
+
+from upload_to_gcs import UPLOAD_RETRY_POLICY, upload_file_to_gcs, upload_string_to_gcs
+
+BUCKET = "test-bucket"
+
+
+def test_upload_file_simple_path(gcs, tmp_path):
+    source = tmp_path / "report.txt"
+    source.write_bytes(b"hello world\n" * 100)
+
+    assert upload_file_to_gcs(BUCKET, str(source), "reports/report.txt")
+    assert gcs.object_data(BUCKET, "reports/report.txt") == source.read_bytes()
+
+
+def test_whole_file_attempts_have_no_deadline():
+    # A long composite attempt must still be retried
+    assert UPLOAD_RETRY_POLICY.deadline is None
+    assert UPLOAD_RETRY_POLICY.max_attempts > 1
+
+
+@pytest.mark.parametrize("compression", [None, "gzip"])
+def test_upload_string_verifies_checksum(gcs, capsys, compression):
+    content = "line of text\n" * 1000
+
+    assert upload_string_to_gcs(BUCKET, content, "notes.txt", compression=compression)
+    assert "Integrity: " in capsys.readouterr().out
+
+
+def test_upload_string_no_verify(gcs, capsys):
+    assert upload_string_to_gcs(BUCKET, "hello", "hello.txt", verify=False)
+    assert "Integrity: " not in capsys.readouterr().out
+    assert gcs.object_data(BUCKET, "hello.txt") == b"hello"
+
+
+def test_composite_upload_keeps_guessed_content_type(gcs, tmp_path):
+    source = tmp_path / "export.csv"
+    source.write_bytes(b"id,name\n" * 100_000)
+
+    assert upload_file_to_gcs(BUCKET, str(source), "exports/export.csv",
+                              composite_threshold=256 * 1024, chunk_size=256 * 1024,
+                              part_size=256 * 1024)
+    stored = gcs.state.get(BUCKET, "exports/export.csv")
+    assert stored.component_count is not None
+    assert stored.content_type == "text/csv"
+    assert stored.data == source.read_bytes()
@@ -17,60 +17,293 @@ Usage:
 
     # Or specify custom bucket and file
     python upload_to_gcs.py --bucket my-bucket --file myfile.txt
+
+    # Bulk upload a whole directory (or a manifest of files) in parallel
+    python upload_to_gcs.py --bucket my-bucket --dir ./artifacts --prefix builds/1234 --workers 16
+    python upload_to_gcs.py --bucket my-bucket --manifest files.txt
+
+    # Stream from stdin with constant memory (destination is required)
+    pg_dump mydb | python upload_to_gcs.py --bucket my-bucket --file - --destination dumps/mydb.sql
+
+    # Incremental sync: upload only files that are new or changed remotely
+    python upload_to_gcs.py --bucket my-bucket --dir ./site --prefix public --sync
+
+    # Large files are split into parts uploaded in parallel and resumed from a
+    # local journal if interrupted (re-run the same command to continue)
+    python upload_to_gcs.py --bucket my-bucket --file backup.tar \\
+        --chunk-size-mib 16 --part-size-mib 128 --parallel-parts 8
+
+    # Compress text-heavy content on the fly (already-compressed files are skipped)
+    python upload_to_gcs.py --bucket my-bucket --file app.log --compress gzip --compress-level 6
+
+    # Transient failures (5xx, 429, timeouts) are retried with jittered backoff
+    python upload_to_gcs.py --bucket my-bucket --file report.pdf --max-attempts 5
+
+    # Uploads are checksummed (CRC32C, or MD5 without the native google-crc32c)
+    # as they are sent and compared with the server's; to skip the check:
+    python upload_to_gcs.py --bucket my-bucket --file report.pdf --no-verify
 """
 
+import argparse
+import dataclasses
+import mimetypes
 import os
 import sys
 from datetime import datetime
 from pathlib import Path
-from google.cloud import storage
-from google.api_core import exceptions
-import argparse
+from typing import Any, BinaryIO, Dict, Iterable, Optional, Tuple, Union
+
+import _shared  # noqa: F401  (puts the shared helpers on sys.path)
+from bulk_upload import (
+    DEFAULT_MAX_WORKERS,
+    collect_directory,
+    print_summary,
+    read_manifest,
+    upload_many,
+)
+from checksums import ChecksumMismatchError, Checksummer, crc32c_implementation, upload_checksum
+from composite_upload import (
+    DEFAULT_COMPOSITE_THRESHOLD,
+    DEFAULT_PARALLEL_PARTS,
+    DEFAULT_PART_SIZE,
+    upload_large_file,
+)
+from compression import CODECS, CompressionStats, compress_chunks, should_compress
+from gcs_client_pool import get_authorized_session, get_storage_client
+from instrumentation import Span, get_instrumentation
+from resilience import CircuitBreaker, CircuitOpenError, RetryPolicy
+from resumable_upload import DEFAULT_CHUNK_SIZE, iter_file_chunks, start_session, upload_stream
+from sync_upload import sync_directory
+
+MIB = 1024 * 1024
+
+# Per-request timeout of the simple upload path when no deadline applies
+DEFAULT_TIMEOUT = 60
+
+# Whole-file attempts, bounded by max_attempts and each request's own timeout
+# rather than a deadline: a composite or multi-GB attempt can run longer than
+# any fixed budget, and a spent budget would stop it from being retried at all
+UPLOAD_RETRY_POLICY = RetryPolicy(max_attempts=3, initial_backoff=1.0, max_backoff=16.0, deadline=None)
+
+
+def _stream_to_blob(
+    bucket_name: str,
+    chunks: Iterable[bytes],
+    destination_blob_name: str,
+    content_type: Optional[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    compression: Optional[str] = None,
+    compression_level: Optional[int] = None,
+    verify: bool = True
+) -> Tuple[Dict[str, Any], Optional[CompressionStats], Optional[str]]:
+    """
+    Sends chunks through a resumable upload, optionally compressing them first.
+
+    With `verify`, the bytes sent (after compression) are checksummed on the
+    way out and compared with the server's checksum.
+
+    Returns:
+        Tuple of (object resource, compression stats or None, checksum
+        verified or None)
+    """
+    storage_client = get_storage_client()
+    blob = storage_client.bucket(bucket_name).blob(destination_blob_name)
+
+    stats = None
+    if compression:
+        stats = CompressionStats(compression)
+        chunks = compress_chunks(chunks, compression, compression_level, stats)
+        # Sent with the session so readers know how to decode the object
+        blob.content_encoding = compression
+
+    session_url = start_session(
+        storage_client, bucket_name, destination_blob_name,
+        content_type=content_type, blob=blob
+    )
+    checksummer = Checksummer.for_upload() if verify else None
+    resource = upload_stream(get_authorized_session(), session_url, chunks, chunk_size, checksummer)
+    return resource, stats, checksummer.verify(resource) if checksummer else None
+
+
+def _print_compression_stats(stats: Optional[CompressionStats]) -> None:
+    """Prints bytes saved and compression throughput."""
+    if stats is None:
+        return
+    print(f"  Compression: {stats.codec}, {stats.bytes_in:,} -> {stats.bytes_out:,} bytes "
+          f"({stats.ratio:.1%}, saved {stats.saved_bytes:,} bytes)")
+    print(f"  Compression throughput: {stats.throughput_mib_s:.1f} MiB/s")
+
+
+def _report_integrity(span: Span, verified: Optional[str]) -> None:
+    """Prints which checksum matched the server's and counts it."""
+    if verified is None:
+        return
+    implementation = crc32c_implementation() if verified.startswith("crc32c") else None
+    suffix = f" (google-crc32c: {implementation})" if implementation else ""
+    print(f"  Integrity: {verified} verified{suffix}")
+    span.set_attribute("gcs.upload.checksum", verified)
+    hooks = get_instrumentation()
+    if hooks.enabled:
+        hooks.add("gcs.upload.checksums", 1, {"gcs.upload.checksum": verified})
+
+
+def _print_retry(attempt: int, error: BaseException, delay: float) -> None:
+    """Reports a failed attempt before the next one starts."""
+    print(f"⚠ Attempt {attempt} failed ({type(error).__name__}); "
+          f"retrying in {delay:.1f}s", file=sys.stderr)
+
+
+def _record_upload(span: Span, source: str, method: str, size: int) -> None:
+    """Tag the upload span with the path taken and count the bytes stored."""
+    span.set_attribute("gcs.upload.method", method)
+    hooks = get_instrumentation()
+    if hooks.enabled:
+        hooks.add("gcs.upload.bytes", size, {"gcs.upload.source": source, "gcs.upload.method": method})
 
 
 def upload_file_to_gcs(
     bucket_name: str,
     source_file_path: str,
-    destination_blob_name: str = None
+    destination_blob_name: str = None,
+    composite_threshold: int = DEFAULT_COMPOSITE_THRESHOLD,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    part_size: int = DEFAULT_PART_SIZE,
+    parallel_parts: int = DEFAULT_PARALLEL_PARTS,
+    compression: Optional[str] = None,
+    compression_level: Optional[int] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    verify: bool = True
 ) -> bool:
     """
     Uploads a file to Google Cloud Storage.
 
+    Files of at least `composite_threshold` bytes are uploaded as parallel,
+    resumable parts (see composite_upload.py); smaller files in one request.
+    With `compression`, compressible files are instead streamed through the
+    compressor into a single resumable upload (the compressed size is not
+    known up front, so they cannot be split into parts).
+
     Args:
         bucket_name: Name of the GCS bucket
         source_file_path: Path to the local file to upload
         destination_blob_name: Name for the file in GCS (optional, defaults to filename)
+        composite_threshold: Minimum size in bytes for the large-file upload path
+        chunk_size: Bytes per request for large files (multiple of 256 KiB)
+        part_size: Bytes per part for large files
+        parallel_parts: Number of parts uploaded concurrently for large files
+        compression: "gzip" or "zstd" to compress before uploading (optional)
+        compression_level: Codec compression level (optional)
+        retry_policy: Retries for transient failures (optional, defaults to
+            UPLOAD_RETRY_POLICY; NO_RETRY for a single attempt)
+        circuit_breaker: Fail fast while Cloud Storage keeps failing
+            (optional; share one breaker between concurrent uploads)
+        verify: Checksum the bytes as they are sent and compare with the
+            checksum the server computed (no extra read of the file)
 
     Returns:
-        True if upload succeeded, False otherwise
+        True if upload succeeded, False otherwise (including when the
+        circuit breaker is open or the checksums differ)
     """
-    try:
-        # Initialize the Cloud Storage client
-        # This automatically uses credentials from GOOGLE_APPLICATION_CREDENTIALS
-        # environment variable or Application Default Credentials
-        storage_client = storage.Client()
-
-        # Get the bucket
-        bucket = storage_client.bucket(bucket_name)
-
-        # If no destination name provided, use the source filename
-        if destination_blob_name is None:
-            destination_blob_name = Path(source_file_path).name
-
-        # Create a blob (object) in the bucket
-        blob = bucket.blob(destination_blob_name)
+    # Deferred so `--help` and argument errors don't pay for the client libraries
+    from google.api_core import exceptions
 
-        # Upload the file
-        print(f"Uploading {source_file_path} to gs://{bucket_name}/{destination_blob_name}...")
-
-        blob.upload_from_filename(source_file_path)
-
-        print(f"✓ File uploaded successfully!")
-        print(f"  GCS URI: gs://{bucket_name}/{destination_blob_name}")
-        print(f"  Size: {blob.size} bytes")
-        print(f"  Content Type: {blob.content_type}")
-
-        return True
+    try:
+        with get_instrumentation().span(
+            "gcs.upload", {"gcs.bucket": bucket_name}, {"gcs.upload.source": "file"}
+        ) as span:
+            # Get the shared Cloud Storage client
+            # This automatically uses credentials from GOOGLE_APPLICATION_CREDENTIALS
+            # environment variable or Application Default Credentials, and is
+            # reused across calls so connections stay warm
+            storage_client = get_storage_client()
+
+            # Get the bucket
+            bucket = storage_client.bucket(bucket_name)
+
+            # If no destination name provided, use the source filename
+            if destination_blob_name is None:
+                destination_blob_name = Path(source_file_path).name
+            span.set_attribute("gcs.object", destination_blob_name)
+
+            file_size = os.path.getsize(source_file_path)
+            content_type = mimetypes.guess_type(source_file_path)[0]
+
+            def attempt(timeout: Optional[float]) -> bool:
+                # Compressible files: stream through the compressor
+                if compression and should_compress(source_file_path, content_type, file_size):
+                    print(f"Uploading {source_file_path} to gs://{bucket_name}/{destination_blob_name} "
+                          f"({compression}-compressed)...")
+
+                    with open(source_file_path, "rb") as f:
+                        resource, stats, verified = _stream_to_blob(
+                            bucket_name, iter_file_chunks(f, chunk_size), destination_blob_name,
+                            content_type, chunk_size, compression, compression_level, verify
+                        )
+
+                    print(f"✓ File uploaded successfully!")
+                    print(f"  GCS URI: gs://{bucket_name}/{destination_blob_name}")
+                    print(f"  Size: {resource.get('size')} bytes stored")
+                    _print_compression_stats(stats)
+                    _report_integrity(span, verified)
+                    _record_upload(span, "file", "compressed", int(resource.get("size", 0)))
+                    return True
+
+                # Large files: parallel, resumable parts composed server-side
+                if file_size >= composite_threshold:
+                    print(f"Uploading {source_file_path} ({file_size / MIB:.1f} MiB) to "
+                          f"gs://{bucket_name}/{destination_blob_name} in parts...")
+
+                    result = upload_large_file(
+                        bucket_name=bucket_name,
+                        source_file_path=source_file_path,
+                        destination_blob_name=destination_blob_name,
+                        chunk_size=chunk_size,
+                        part_size=part_size,
+                        max_parallel_parts=parallel_parts,
+                        content_type=content_type,
+                        client=storage_client,
+                        verify=verify
+                    )
+
+                    print(f"✓ File uploaded successfully!")
+                    print(f"  GCS URI: gs://{bucket_name}/{destination_blob_name}")
+                    print(f"  Size: {result['size']} bytes in {result['parts']} part(s)")
+                    _report_integrity(span, result["verified"])
+                    _record_upload(span, "file", "composite", file_size)
+                    return True
+
+                # Create a blob (object) in the bucket
+                blob = bucket.blob(destination_blob_name)
+
+                # Upload the file
+                print(f"Uploading {source_file_path} to gs://{bucket_name}/{destination_blob_name}...")
+
+                # retry_policy replaces the library's own retries (up to two
+                # minutes per attempt); a policy with a deadline also caps the
+                # request timeout at the time left.
+                # The library hashes the buffer it sends and the server
+                # rejects the upload if the checksum doesn't match
+                checksum = upload_checksum() if verify else None
+                blob.upload_from_filename(
+                    source_file_path, timeout=min(DEFAULT_TIMEOUT, timeout or DEFAULT_TIMEOUT), retry=None,
+                    checksum=checksum
+                )
+
+                print(f"✓ File uploaded successfully!")
+                print(f"  GCS URI: gs://{bucket_name}/{destination_blob_name}")
+                print(f"  Size: {blob.size} bytes")
+                print(f"  Content Type: {blob.content_type}")
+                _report_integrity(span, checksum)
+
+                _record_upload(span, "file", "simple", file_size)
+                return True
+
+            # Composite uploads resume from their journal, so a retry only
+            # re-sends the parts that hadn't finished
+            return (retry_policy or UPLOAD_RETRY_POLICY).call(
+                attempt, circuit_breaker, operation_name="gcs.upload_file", on_retry=_print_retry
+            )
 
     except exceptions.Forbidden as e:
         print(f"✗ Permission denied: {e}", file=sys.stderr)
@@ -89,6 +322,14 @@ def upload_file_to_gcs(
         print(f"✗ File not found: {source_file_path}", file=sys.stderr)
         return False
 
+    except CircuitOpenError as e:
+        print(f"✗ Not attempted: {e}", file=sys.stderr)
+        return False
+
+    except ChecksumMismatchError as e:
+        print(f"✗ Integrity check failed: {e}", file=sys.stderr)
+        return False
+
     except Exception as e:
         print(f"✗ Unexpected error: {e}", file=sys.stderr)
         return False
@@ -98,37 +339,133 @@ def upload_string_to_gcs(
     bucket_name: str,
     content: str,
     destination_blob_name: str,
-    content_type: str = "text/plain"
+    content_type: str = "text/plain",
+    compression: Optional[str] = None,
+    compression_level: Optional[int] = None,
+    verify: bool = True
 ) -> bool:
     """
     Uploads string content directly to GCS without creating a local file.
 
+    The whole payload is held in memory; for large or generated content use
+    upload_stream_to_gcs instead.
+
     Args:
         bucket_name: Name of the GCS bucket
         content: String content to upload
         destination_blob_name: Name for the file in GCS
         content_type: MIME type of the content
+        compression: "gzip" or "zstd" to compress before uploading (optional)
+        compression_level: Codec compression level (optional)
+        verify: Checksum the content as it is sent and compare with the
+            checksum the server computed
 
     Returns:
         True if upload succeeded, False otherwise
     """
     try:
-        storage_client = storage.Client()
-        bucket = storage_client.bucket(bucket_name)
-        blob = bucket.blob(destination_blob_name)
+        with get_instrumentation().span(
+            "gcs.upload", {"gcs.bucket": bucket_name, "gcs.object": destination_blob_name},
+            {"gcs.upload.source": "string"}
+        ) as span:
+            data = content.encode("utf-8")
+            if compression and should_compress(content_type=content_type, size=len(data)):
+                print(f"Uploading content to gs://{bucket_name}/{destination_blob_name} "
+                      f"({compression}-compressed)...")
+
+                resource, stats, verified = _stream_to_blob(
+                    bucket_name, [data], destination_blob_name, content_type,
+                    compression=compression, compression_level=compression_level, verify=verify
+                )
+
+                print(f"✓ Content uploaded successfully!")
+                print(f"  GCS URI: gs://{bucket_name}/{destination_blob_name}")
+                print(f"  Size: {resource.get('size')} bytes stored")
+                _print_compression_stats(stats)
+                _report_integrity(span, verified)
+                _record_upload(span, "string", "compressed", int(resource.get("size", 0)))
+                return True
+
+            storage_client = get_storage_client()
+            bucket = storage_client.bucket(bucket_name)
+            blob = bucket.blob(destination_blob_name)
+
+            print(f"Uploading content to gs://{bucket_name}/{destination_blob_name}...")
+
+            # The library hashes the payload and the server rejects the
+            # upload if the checksum doesn't match
+            checksum = upload_checksum() if verify else None
+            blob.upload_from_string(data, content_type=content_type, checksum=checksum)
+
+            print(f"✓ Content uploaded successfully!")
+            print(f"  GCS URI: gs://{bucket_name}/{destination_blob_name}")
+            print(f"  Size: {blob.size} bytes")
+            _report_integrity(span, checksum)
+
+            _record_upload(span, "string", "simple", len(data))
+            return True
 
-        print(f"Uploading content to gs://{bucket_name}/{destination_blob_name}...")
+    except Exception as e:
+        print(f"✗ Error uploading content: {e}", file=sys.stderr)
+        return False
 
-        blob.upload_from_string(content, content_type=content_type)
 
-        print(f"✓ Content uploaded successfully!")
-        print(f"  GCS URI: gs://{bucket_name}/{destination_blob_name}")
-        print(f"  Size: {blob.size} bytes")
+def upload_stream_to_gcs(
+    bucket_name: str,
+    source: Union[BinaryIO, Iterable[bytes]],
+    destination_blob_name: str,
+    content_type: str = "application/octet-stream",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    compression: Optional[str] = None,
+    compression_level: Optional[int] = None,
+    verify: bool = True
+) -> bool:
+    """
+    Uploads a stream of unknown length to GCS with bounded memory.
 
-        return True
+    Unlike upload_string_to_gcs, the payload never has to fit in memory: it is
+    sent through a resumable upload one chunk at a time, so pipelines such as
+    `pg_dump | upload_to_gcs.py --file -` run in constant memory.
+
+    Args:
+        bucket_name: Name of the GCS bucket
+        source: Binary file-like object (e.g. sys.stdin.buffer) or an
+            iterable/generator of bytes chunks
+        destination_blob_name: Name for the file in GCS
+        content_type: MIME type of the content
+        chunk_size: Bytes per request (multiple of 256 KiB)
+        compression: "gzip" or "zstd" to compress before uploading (optional)
+        compression_level: Codec compression level (optional)
+        verify: Checksum the stream as it is sent and compare with the server
+
+    Returns:
+        True if upload succeeded, False otherwise
+    """
+    try:
+        with get_instrumentation().span(
+            "gcs.upload", {"gcs.bucket": bucket_name, "gcs.object": destination_blob_name},
+            {"gcs.upload.source": "stream"}
+        ) as span:
+            print(f"Streaming content to gs://{bucket_name}/{destination_blob_name}...")
+
+            chunks = iter_file_chunks(source, chunk_size) if hasattr(source, "read") else source
+            resource, stats, verified = _stream_to_blob(
+                bucket_name, chunks, destination_blob_name, content_type,
+                chunk_size, compression, compression_level, verify
+            )
+
+            print(f"✓ Stream uploaded successfully!")
+            print(f"  GCS URI: gs://{bucket_name}/{destination_blob_name}")
+            print(f"  Size: {resource.get('size')} bytes")
+            _print_compression_stats(stats)
+            _report_integrity(span, verified)
+
+            _record_upload(span, "stream", "compressed" if stats else "resumable",
+                           int(resource.get("size", 0)))
+            return True
 
     except Exception as e:
-        print(f"✗ Error uploading content: {e}", file=sys.stderr)
+        print(f"✗ Error uploading stream: {e}", file=sys.stderr)
         return False
 
 
@@ -188,7 +525,7 @@ def verify_credentials():
     print(f"✓ Using credentials: {creds_path}")
 
     try:
-        storage_client = storage.Client()
+        storage_client = get_storage_client(creds_path)
         # Try to get the service account email
         print(f"✓ Authenticated as: {storage_client.get_service_account_email()}")
         return True
@@ -197,6 +534,125 @@ def verify_credentials():
         return False
 
 
+def bulk_upload(
+    bucket_name: str,
+    args: argparse.Namespace,
+    retry_policy: Optional[RetryPolicy] = None
+) -> int:
+    """
+    Runs a bulk upload for --dir/--manifest and prints an aggregate summary.
+
+    Args:
+        bucket_name: Name of the GCS bucket
+        args: Parsed command line arguments
+        retry_policy: Retries per file for transient failures (optional)
+
+    Returns:
+        Process exit code (0 if every file uploaded, 1 otherwise)
+    """
+    try:
+        if args.dir:
+            files = collect_directory(args.dir, prefix=args.prefix)
+        else:
+            files = read_manifest(args.manifest, prefix=args.prefix)
+    except FileNotFoundError as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return 1
+
+    if not files:
+        print("Nothing to upload")
+        return 0
+
+    print(f"Uploading {len(files)} file(s) to gs://{bucket_name}/ "
+          f"with {args.workers} worker(s)...")
+    print()
+
+    results, elapsed = upload_many(
+        bucket_name=bucket_name,
+        files=files,
+        max_workers=args.workers,
+        verbose=args.verbose,
+        retry_policy=retry_policy,
+        verify=not args.no_verify
+    )
+
+    print_summary(results, elapsed)
+
+    print()
+    print("=" * 60)
+
+    if all(result.success for result in results):
+        print("✓ Bulk upload completed successfully!")
+        return 0
+
+    print("✗ Bulk upload finished with failures")
+    return 1
+
+
+def sync_upload(
+    bucket_name: str,
+    args: argparse.Namespace,
+    retry_policy: Optional[RetryPolicy] = None
+) -> int:
+    """
+    Runs an incremental sync of --dir and prints what changed.
+
+    Args:
+        bucket_name: Name of the GCS bucket
+        args: Parsed command line arguments
+        retry_policy: Retries per file for transient failures (optional)
+
+    Returns:
+        Process exit code (0 if every changed file uploaded, 1 otherwise)
+    """
+    from google.api_core import exceptions
+
+    print(f"Syncing {args.dir} to gs://{bucket_name}/{args.prefix.strip('/')}...")
+    print()
+
+    try:
+        report = sync_directory(
+            bucket_name=bucket_name,
+            directory=args.dir,
+            prefix=args.prefix,
+            max_workers=args.workers,
+            dry_run=args.dry_run,
+            verbose=args.verbose,
+            retry_policy=retry_policy,
+            verify=not args.no_verify
+        )
+    except FileNotFoundError as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return 1
+    except exceptions.GoogleAPIError as e:
+        print(f"✗ Error listing gs://{bucket_name}: {e}", file=sys.stderr)
+        return 1
+
+    print(f"New files:       {len(report.new)}")
+    print(f"Changed files:   {len(report.changed)}")
+    print(f"Unchanged files: {report.unchanged}")
+    print(f"Files re-hashed: {report.rehashed}")
+
+    if args.dry_run:
+        for name in report.new + report.changed:
+            print(f"  would upload: {name}")
+        return 0
+
+    if report.results:
+        print()
+        print_summary(report.results, report.elapsed)
+
+    print()
+    print("=" * 60)
+
+    if report.success:
+        print("✓ Sync completed successfully!")
+        return 0
+
+    print("✗ Sync finished with failures")
+    return 1
+
+
 def main():
     """Main function to demonstrate uploading files to GCS."""
     parser = argparse.ArgumentParser(
@@ -209,7 +665,7 @@ def main():
     )
     parser.add_argument(
         "--file",
-        help="Local file to upload",
+        help="Local file to upload, or - to stream from stdin",
         default=None
     )
     parser.add_argument(
@@ -222,8 +678,100 @@ def main():
         action="store_true",
         help="Create a test file and upload it"
     )
+    parser.add_argument(
+        "--dir",
+        help="Upload every file below this directory (bulk mode)",
+        default=None
+    )
+    parser.add_argument(
+        "--manifest",
+        help="Upload the files listed in this manifest, one per line (bulk mode)",
+        default=None
+    )
+    parser.add_argument(
+        "--prefix",
+        help="Object name prefix for bulk uploads (optional)",
+        default=""
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help=f"Number of parallel uploads in bulk mode (default: {DEFAULT_MAX_WORKERS})",
+        default=DEFAULT_MAX_WORKERS
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Print a line per file in bulk mode"
+    )
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="With --dir: upload only new or changed files (keeps a local manifest)"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="With --sync: report what would be uploaded without uploading"
+    )
+    parser.add_argument(
+        "--compress",
+        choices=CODECS,
+        help="Compress uploads on the fly (skips already-compressed files)",
+        default=None
+    )
+    parser.add_argument(
+        "--compress-level",
+        type=int,
+        help="Compression level (default: 6 for gzip, 3 for zstd)",
+        default=None
+    )
+    parser.add_argument(
+        "--composite-threshold-mib",
+        type=int,
+        help=f"Upload files of at least this size as parallel resumable parts "
+             f"(default: {DEFAULT_COMPOSITE_THRESHOLD // MIB})",
+        default=DEFAULT_COMPOSITE_THRESHOLD // MIB
+    )
+    parser.add_argument(
+        "--chunk-size-mib",
+        type=int,
+        help=f"Request size for large-file uploads, in MiB (default: {DEFAULT_CHUNK_SIZE // MIB})",
+        default=DEFAULT_CHUNK_SIZE // MIB
+    )
+    parser.add_argument(
+        "--part-size-mib",
+        type=int,
+        help=f"Part size for large-file uploads, in MiB (default: {DEFAULT_PART_SIZE // MIB})",
+        default=DEFAULT_PART_SIZE // MIB
+    )
+    parser.add_argument(
+        "--parallel-parts",
+        type=int,
+        help=f"Parts uploaded concurrently for large files; 1 disables composition "
+             f"(default: {DEFAULT_PARALLEL_PARTS})",
+        default=DEFAULT_PARALLEL_PARTS
+    )
+    parser.add_argument(
+        "--max-attempts",
+        type=int,
+        help=f"Attempts per file for transient failures; 1 disables retries "
+             f"(default: {UPLOAD_RETRY_POLICY.max_attempts})",
+        default=UPLOAD_RETRY_POLICY.max_attempts
+    )
+    parser.add_argument(
+        "--no-verify",
+        action="store_true",
+        help="Don't checksum uploads and compare with the server's checksum"
+    )
 
     args = parser.parse_args()
+    retry_policy = dataclasses.replace(UPLOAD_RETRY_POLICY, max_attempts=args.max_attempts)
+
+    if (args.sync or args.dir or args.manifest) and args.compress:
+        # Bulk and sync compare and report uncompressed sizes and checksums
+        print("Error: --compress only applies to single-file uploads", file=sys.stderr)
+        return 1
 
     print("=" * 60)
     print("  Google Cloud Storage Upload Demo")
@@ -254,8 +802,35 @@ def main():
 
     print()
 
+    # Sync mode: only the delta between --dir and the bucket
+    if args.sync:
+        if not args.dir:
+            print("Error: --sync requires --dir", file=sys.stderr)
+            return 1
+        return sync_upload(bucket_name, args, retry_policy)
+
+    # Bulk mode: many files over a shared client and worker pool
+    if args.dir or args.manifest:
+        return bulk_upload(bucket_name, args, retry_policy)
+
     # Determine what to upload
-    if args.create_test_file or not args.file:
+    if args.file == "-":
+        # Stream stdin through a resumable upload
+        if not args.destination:
+            print("Error: --destination is required when streaming from stdin", file=sys.stderr)
+            return 1
+
+        success = upload_stream_to_gcs(
+            bucket_name=bucket_name,
+            source=sys.stdin.buffer,
+            destination_blob_name=args.destination,
+            chunk_size=args.chunk_size_mib * MIB,
+            compression=args.compress,
+            compression_level=args.compress_level,
+            verify=not args.no_verify
+        )
+
+    elif args.create_test_file or not args.file:
         # Create and upload a test file
         test_file = create_test_file()
         print()
@@ -263,7 +838,9 @@ def main():
         success = upload_file_to_gcs(
             bucket_name=bucket_name,
             source_file_path=test_file,
-            destination_blob_name=args.destination or f"test-uploads/{test_file}"
+            destination_blob_name=args.destination or f"test-uploads/{test_file}",
+            retry_policy=retry_policy,
+            verify=not args.no_verify
         )
 
         # Also upload some string content
@@ -277,7 +854,8 @@ def main():
             upload_string_to_gcs(
                 bucket_name=bucket_name,
                 content=content,
-                destination_blob_name=f"test-uploads/timestamp-{timestamp}.txt"
+                destination_blob_name=f"test-uploads/timestamp-{timestamp}.txt",
+                verify=not args.no_verify
             )
 
     else:
@@ -285,7 +863,15 @@ def main():
         success = upload_file_to_gcs(
             bucket_name=bucket_name,
             source_file_path=args.file,
-            destination_blob_name=args.destination
+            destination_blob_name=args.destination,
+            composite_threshold=args.composite_threshold_mib * MIB,
+            chunk_size=args.chunk_size_mib * MIB,
+            part_size=args.part_size_mib * MIB,
+            parallel_parts=args.parallel_parts,
+            compression=args.compress,
+            compression_level=args.compress_level,
+            retry_policy=retry_policy,
+            verify=not args.no_verify
         )
 
     print()
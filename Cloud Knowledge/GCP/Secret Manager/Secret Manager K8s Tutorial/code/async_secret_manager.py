@@ -0,0 +1,585 @@
+#!/usr/bin/env python3
+"""
+Example: asyncio access to Secret Manager over the async gRPC transport
+
+SecretManagerClient wraps the blocking client library, so asyncio services
+(aiohttp, FastAPI, ...) have to push every call into a thread. The clients
+here await the library's async gRPC client instead: thousands of concurrent
+accesses are just coroutines multiplexed over one HTTP/2 channel, and no
+executor threads are tied up.
+
+    • AsyncSecretManagerClient: access_secret_version, access_many, and
+      paginated listing (iter_secrets, iter_secret_versions,
+      list_versions_many), with the same ValueError / PermissionError
+      translation, retry policy and circuit breaker as SecretManagerClient
+    • AsyncCachedSecretManagerClient: the same caching behaviour as
+      CachedSecretManagerClient (TTL policy, coalesced misses,
+      refresh-ahead, serving stale values during outages), on the event loop
+
+A client is bound to the event loop it is first used on; create one per
+loop (e.g. in the application's startup hook) and close it on shutdown.
+
+Usage:
+  export GOOGLE_APPLICATION_CREDENTIALS=/path/to/service-account-key.json
+
+  # Fetch several secrets concurrently (SECRET or SECRET:VERSION)
+  python async_secret_manager.py --project my-project --secrets demo-app-api-key,demo-app-db-url:3
+
+  # List secrets, or the versions of one secret
+  python async_secret_manager.py --project my-project --list
+  python async_secret_manager.py --project my-project --list-versions demo-app-api-key
+
+  # In application code
+  async with AsyncCachedSecretManagerClient("my-project", refresh_ahead=30) as secrets:
+      api_key = await secrets.access_secret_version("demo-app-api-key")
+
+  # Against the local emulator (secret_manager_emulator.py), no GCP needed
+  export SECRET_MANAGER_EMULATOR_HOST=localhost:9024
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import TYPE_CHECKING, AsyncIterator, Awaitable, Dict, Iterable, List, Optional, Tuple, Union
+
+import _shared  # noqa: F401  (puts the shared helpers on sys.path)
+from instrumentation import get_instrumentation
+from read_secret_direct import (
+    ACCESS_RETRY_POLICY,
+    DEFAULT_BATCH_WORKERS,
+    EMULATOR_HOST_ENV,
+    SecretCache,
+    TTLPolicy,
+    VersionAwareTTLPolicy,
+    access_error,
+    list_error,
+    list_metadata,
+    list_request,
+    parse_secret_ref,
+    request_errors,
+    transient_errors,
+)
+from resilience import CircuitBreaker, RetryPolicy
+from singleflight import AsyncSingleFlight
+
+# Imported when the first client is built, like read_secret_direct.py
+if TYPE_CHECKING:
+    from google.cloud.secretmanager_v1 import (
+        AccessSecretVersionResponse,
+        Secret,
+        SecretManagerServiceAsyncClient,
+        SecretVersion,
+    )
+
+
+class AsyncSecretManagerClient:
+    """asyncio client for accessing Google Secret Manager."""
+
+    def __init__(
+        self,
+        project_id: str,
+        endpoint: Optional[str] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None
+    ):
+        """
+        Initialize client (the connection is opened on first use).
+
+        Args:
+            project_id: GCP project ID (not project number)
+            endpoint: host:port of a Secret Manager emulator, reached over an
+                insecure channel without credentials (optional, defaults to
+                SECRET_MANAGER_EMULATOR_HOST)
+            retry_policy: Retries and time budget for each access (optional,
+                defaults to ACCESS_RETRY_POLICY)
+            circuit_breaker: Fail fast while Secret Manager keeps failing
+                (optional; share one breaker between clients of a process)
+        """
+        self.project_id = project_id
+        self.endpoint = endpoint or os.environ.get(EMULATOR_HOST_ENV)
+        self.retry_policy = retry_policy or ACCESS_RETRY_POLICY
+        self.circuit_breaker = circuit_breaker
+        self._client: Optional["SecretManagerServiceAsyncClient"] = None
+
+    @property
+    def client(self) -> "SecretManagerServiceAsyncClient":
+        """The library's async client, created on the running event loop."""
+        if self._client is None:
+            from google.cloud import secretmanager
+
+            if self.endpoint:
+                import grpc
+                from google.cloud.secretmanager_v1.services.secret_manager_service.transports import (
+                    SecretManagerServiceGrpcAsyncIOTransport,
+                )
+
+                transport = SecretManagerServiceGrpcAsyncIOTransport(
+                    channel=grpc.aio.insecure_channel(self.endpoint)
+                )
+                self._client = secretmanager.SecretManagerServiceAsyncClient(transport=transport)
+            else:
+                self._client = secretmanager.SecretManagerServiceAsyncClient()
+        return self._client
+
+    async def close(self) -> None:
+        """Close the gRPC channel."""
+        if self._client is not None:
+            await self._client.transport.close()
+            self._client = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def access_secret_version(
+        self,
+        secret_id: str,
+        version: str = "latest"
+    ) -> str:
+        """
+        Access a secret version from Secret Manager.
+
+        Args:
+            secret_id: Secret name (not full resource path)
+            version: Version to access (default: "latest")
+
+        Returns:
+            Secret payload as string
+
+        Transient failures are retried according to `retry_policy`, within
+        its deadline; while `circuit_breaker` is open, calls fail at once.
+
+        Raises:
+            ValueError: Secret or version not found
+            PermissionError: Lacking access permissions
+            CircuitOpenError: Secret Manager has been failing; not attempted
+        """
+        name = f"projects/{self.project_id}/secrets/{secret_id}/versions/{version}"
+        hooks = get_instrumentation()
+
+        def attempt(timeout: Optional[float]) -> Awaitable["AccessSecretVersionResponse"]:
+            # The policy replaces the library's own retries, as in
+            # SecretManagerClient
+            return self.client.access_secret_version(
+                request={"name": name}, retry=None, timeout=timeout
+            )
+
+        with hooks.span("secretmanager.access_secret_version",
+                        {"secret.id": secret_id, "secret.version": version}):
+            try:
+                response = await self.retry_policy.call_async(
+                    attempt, self.circuit_breaker, operation_name="secretmanager.access_secret_version"
+                )
+            except request_errors() as e:
+                raise access_error(e, self.project_id, secret_id, version)
+
+        if hooks.enabled:
+            hooks.add("secretmanager.payload.bytes", len(response.payload.data))
+        return response.payload.data.decode("UTF-8")
+
+    async def access_many(
+        self,
+        secrets: Iterable[Union[str, Tuple[str, str]]],
+        max_concurrency: int = DEFAULT_BATCH_WORKERS
+    ) -> Tuple[Dict[str, str], Dict[str, Exception]]:
+        """
+        Access many secret versions concurrently.
+
+        Args:
+            secrets: Secret references: "secret", "secret:version" or
+                (secret, version) tuples
+            max_concurrency: Maximum number of requests in flight
+
+        Returns:
+            Tuple of (values, errors), both keyed by "secret_id:version".
+            A secret appears in exactly one of the two dictionaries.
+        """
+        refs = list(dict.fromkeys(parse_secret_ref(ref) for ref in secrets))
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fetch(secret_id: str, version: str) -> str:
+            async with semaphore:
+                return await self.access_secret_version(secret_id, version)
+
+        results = await asyncio.gather(
+            *(fetch(secret_id, version) for secret_id, version in refs),
+            return_exceptions=True
+        )
+
+        values: Dict[str, str] = {}
+        errors: Dict[str, Exception] = {}
+        for (secret_id, version), result in zip(refs, results):
+            key = f"{secret_id}:{version}"
+            if isinstance(result, Exception):
+                errors[key] = result
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                values[key] = result
+        return values, errors
+
+    async def iter_secrets(
+        self,
+        page_size: Optional[int] = None,
+        filter_expr: Optional[str] = None,
+        fields: Optional[Iterable[str]] = None
+    ) -> AsyncIterator["Secret"]:
+        """
+        Stream the project's secrets, fetching pages as they are consumed.
+
+        Args:
+            page_size: Secrets per page (None for the server default)
+            filter_expr: Server-side filter, e.g. "labels.env=prod" or "name:db-"
+            fields: Secret fields to return, e.g. ["name", "labels"] (None for all)
+
+        Yields:
+            Secret resources
+
+        Raises:
+            PermissionError: Lacking secretmanager.secrets.list
+        """
+        request = list_request(f"projects/{self.project_id}", page_size, filter_expr)
+        try:
+            pager = await self.client.list_secrets(
+                request=request, metadata=list_metadata("secrets", fields)
+            )
+            async for secret in pager:
+                yield secret
+        except request_errors() as e:
+            raise list_error(e, self.project_id)
+
+    async def iter_secret_versions(
+        self,
+        secret_id: str,
+        page_size: Optional[int] = None,
+        filter_expr: Optional[str] = None,
+        fields: Optional[Iterable[str]] = None
+    ) -> AsyncIterator["SecretVersion"]:
+        """
+        Stream the versions of a secret, newest first.
+
+        Args:
+            secret_id: Secret name
+            page_size: Versions per page (None for the server default)
+            filter_expr: Server-side filter, e.g. "state:ENABLED"
+            fields: SecretVersion fields to return (None for all)
+
+        Yields:
+            SecretVersion resources
+
+        Raises:
+            ValueError: Secret not found
+            PermissionError: Lacking secretmanager.versions.list
+        """
+        request = list_request(f"projects/{self.project_id}/secrets/{secret_id}", page_size, filter_expr)
+        try:
+            pager = await self.client.list_secret_versions(
+                request=request, metadata=list_metadata("versions", fields)
+            )
+            async for version in pager:
+                yield version
+        except request_errors() as e:
+            raise list_error(e, self.project_id, secret_id)
+
+    async def list_secrets(
+        self,
+        filter_expr: Optional[str] = None,
+        fields: Optional[Iterable[str]] = None
+    ) -> List["Secret"]:
+        """
+        List all secrets in the project (see iter_secrets).
+
+        Returns:
+            Secret resources (name, labels, create_time, ...)
+
+        Raises:
+            PermissionError: Lacking secretmanager.secrets.list
+        """
+        return [secret async for secret in self.iter_secrets(filter_expr=filter_expr, fields=fields)]
+
+    async def list_secret_versions(
+        self,
+        secret_id: str,
+        filter_expr: Optional[str] = None,
+        fields: Optional[Iterable[str]] = None
+    ) -> List["SecretVersion"]:
+        """
+        List all versions of a secret, newest first (see iter_secret_versions).
+
+        Returns:
+            SecretVersion resources (name, state, create_time, ...)
+
+        Raises:
+            ValueError: Secret not found
+        """
+        return [
+            version async for version in
+            self.iter_secret_versions(secret_id, filter_expr=filter_expr, fields=fields)
+        ]
+
+    async def list_versions_many(
+        self,
+        secret_ids: Iterable[str],
+        max_concurrency: int = DEFAULT_BATCH_WORKERS,
+        page_size: Optional[int] = None,
+        filter_expr: Optional[str] = None,
+        fields: Optional[Iterable[str]] = None
+    ) -> Tuple[Dict[str, List["SecretVersion"]], Dict[str, Exception]]:
+        """
+        List the versions of many secrets concurrently.
+
+        Args:
+            secret_ids: Secret names, e.g. from iter_secrets
+            max_concurrency: Maximum number of listings in flight
+            page_size, filter_expr, fields: As for iter_secret_versions
+
+        Returns:
+            Tuple of (versions, errors), both keyed by secret ID. A secret
+            appears in exactly one of the two dictionaries.
+        """
+        secret_ids = list(dict.fromkeys(secret_ids))
+        fields = list(fields) if fields else None
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def list_one(secret_id: str) -> List["SecretVersion"]:
+            async with semaphore:
+                return [
+                    version async for version in
+                    self.iter_secret_versions(secret_id, page_size, filter_expr, fields)
+                ]
+
+        results = await asyncio.gather(
+            *(list_one(secret_id) for secret_id in secret_ids), return_exceptions=True
+        )
+
+        versions: Dict[str, List["SecretVersion"]] = {}
+        errors: Dict[str, Exception] = {}
+        for secret_id, result in zip(secret_ids, results):
+            if isinstance(result, Exception):
+                errors[secret_id] = result
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                versions[secret_id] = result
+        return versions, errors
+
+
+class AsyncCachedSecretManagerClient(AsyncSecretManagerClient):
+    """
+    asyncio Secret Manager client with caching.
+
+    Behaves like CachedSecretManagerClient: entries live as long as
+    `ttl_policy` says (pinned versions until evicted, aliases such as
+    "latest" for `cache_ttl` seconds), concurrent misses for the same secret
+    version share one RPC, hits within `refresh_ahead` seconds of expiry are
+    refreshed in a background task, and with `max_staleness` the last good
+    value is served while Secret Manager is unreachable.
+    """
+
+    def __init__(
+        self,
+        project_id: str,
+        cache_ttl: int = 300,
+        cache_max_entries: int = 1024,
+        refresh_ahead: float = 0,
+        max_staleness: float = 0,
+        ttl_policy: Optional[TTLPolicy] = None,
+        endpoint: Optional[str] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None
+    ):
+        """
+        Initialize client with cache.
+
+        Args:
+            project_id: GCP project ID
+            cache_ttl: Cache time-to-live in seconds (default: 5 minutes)
+            cache_max_entries: Maximum number of cached secret versions
+            refresh_ahead: Seconds before expiry to start a background refresh
+                (default: 0, disabled)
+            max_staleness: Seconds past expiry the last good value may be served
+                while Secret Manager is unreachable (default: 0, disabled)
+            ttl_policy: Callable (secret_id, version) -> TTL seconds (optional,
+                defaults to VersionAwareTTLPolicy(alias_ttl=cache_ttl))
+            endpoint: Secret Manager emulator host:port (optional)
+            retry_policy: Retries and time budget per fetch (optional)
+            circuit_breaker: Fail fast while Secret Manager keeps failing;
+                with max_staleness, cached values are served meanwhile
+        """
+        super().__init__(project_id, endpoint, retry_policy, circuit_breaker)
+        self.cache = SecretCache(
+            cache_ttl, max_entries=cache_max_entries, stale_seconds=max_staleness
+        )
+        self.ttl_policy = ttl_policy or VersionAwareTTLPolicy(alias_ttl=cache_ttl)
+        self.refresh_ahead = refresh_ahead
+        self.max_staleness = max_staleness
+        self._inflight = AsyncSingleFlight()
+        self._refreshing: Dict[str, "asyncio.Task"] = {}
+
+        # Counters for the stale-while-revalidate path
+        self.background_refreshes = 0
+        self.refresh_failures = 0
+        self.stale_served = 0
+
+    async def _fetch_and_cache(
+        self,
+        secret_id: str,
+        version: str,
+        cache_key: str,
+        force: bool = False
+    ) -> str:
+        """Fetch from Secret Manager and cache; runs once per in-flight key."""
+        if not force:
+            cached_value = self.cache.peek(cache_key)
+            if cached_value is not None:
+                return cached_value
+
+        value = await super().access_secret_version(secret_id, version)
+        self.cache.set(cache_key, value, ttl=self.ttl_policy(secret_id, version))
+        return value
+
+    def _schedule_refresh(self, secret_id: str, version: str, cache_key: str) -> None:
+        """Refresh an entry in a background task unless one is already running."""
+        if cache_key in self._refreshing:
+            return
+        task = asyncio.get_running_loop().create_task(self._refresh(secret_id, version, cache_key))
+        self._refreshing[cache_key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(cache_key, None))
+
+    async def _refresh(self, secret_id: str, version: str, cache_key: str) -> None:
+        """Background task: re-fetch one entry, keeping the old value on failure."""
+        try:
+            await self._inflight.do(
+                cache_key,
+                lambda: self._fetch_and_cache(secret_id, version, cache_key, force=True)
+            )
+            self.background_refreshes += 1
+            get_instrumentation().add("secretmanager.background_refreshes", 1, {"outcome": "ok"})
+        except Exception as e:
+            self.refresh_failures += 1
+            get_instrumentation().add("secretmanager.background_refreshes", 1, {"outcome": "error"})
+            print(f"⚠ Background refresh of {cache_key} failed: {e}", file=sys.stderr)
+
+    def _serve_stale(self, cache_key: str, error: Exception) -> str:
+        """Return the last good value after a transient failure, or re-raise."""
+        stale = self.cache.get_stale(cache_key)
+        if stale is None:
+            raise error
+
+        value, overdue = stale
+        self.stale_served += 1
+        get_instrumentation().add("secretmanager.stale_served", 1, {"error": type(error).__name__})
+        print(f"⚠ Secret Manager unavailable ({type(error).__name__}); serving "
+              f"{cache_key} {max(overdue, 0):.0f}s past expiry", file=sys.stderr)
+        return value
+
+    async def close(self) -> None:
+        """Cancel background refreshes and close the gRPC channel."""
+        tasks = list(self._refreshing.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await super().close()
+
+    async def access_secret_version(
+        self,
+        secret_id: str,
+        version: str = "latest"
+    ) -> str:
+        """
+        Access secret with caching.
+
+        The entry's TTL comes from ttl_policy, so "latest" expires after
+        cache_ttl while pinned versions like "3" stay cached.
+        """
+        cache_key = f"{secret_id}:{version}"
+
+        found = self.cache.lookup(cache_key)
+        if found is not None:
+            cached_value, remaining = found
+            if remaining < self.refresh_ahead:
+                self._schedule_refresh(secret_id, version, cache_key)
+            return cached_value
+
+        try:
+            return await self._inflight.do(
+                cache_key,
+                lambda: self._fetch_and_cache(secret_id, version, cache_key)
+            )
+        except transient_errors() as e:
+            return self._serve_stale(cache_key, e)
+
+
+async def run(args: argparse.Namespace) -> int:
+    """Run the command-line example."""
+    async with AsyncCachedSecretManagerClient(args.project, endpoint=args.endpoint) as client:
+        if args.list:
+            print(f"\nSecrets in project '{args.project}':")
+            print("─" * 60)
+            async for secret in client.iter_secrets(filter_expr=args.filter, fields=["name"]):
+                print(f"  - {secret.name.split('/')[-1]}")
+            return 0
+
+        if args.list_versions:
+            print(f"\nVersions of secret '{args.list_versions}':")
+            print("─" * 60)
+            fields = ["name", "state", "create_time"]
+            async for version in client.iter_secret_versions(
+                args.list_versions, filter_expr=args.filter, fields=fields
+            ):
+                created = version.create_time.strftime("%Y-%m-%d %H:%M:%S UTC")
+                print(f"{version.name.split('/')[-1]:<10} {version.state.name:<15} {created:<30}")
+            return 0
+
+        refs = [ref.strip() for ref in args.secrets.split(",") if ref.strip()]
+        print(f"\nAccessing {len(refs)} secret(s) concurrently...")
+
+        started = time.perf_counter()
+        values, errors = await client.access_many(refs)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        for key, value in values.items():
+            print(f"✓ {key}: {len(value)} characters")
+        for key, error in errors.items():
+            print(f"✗ {key}: {error}", file=sys.stderr)
+        print(f"  Retrieved {len(values)} secret(s) in {elapsed_ms:.0f} ms")
+
+        # Second round is served from the cache
+        started = time.perf_counter()
+        await client.access_many(values)
+        print(f"  Cached re-read: {(time.perf_counter() - started) * 1000:.2f} ms")
+
+        return 1 if errors else 0
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Access Secret Manager from asyncio code")
+    parser.add_argument("--project", default="my-project-dev",
+                        help="GCP project ID (default: my-project-dev)")
+    parser.add_argument("--secrets", default="demo-app-api-key,demo-app-db-url",
+                        help="Comma-separated secrets to fetch concurrently (SECRET or SECRET:VERSION)")
+    parser.add_argument("--list", action="store_true", help="List all secrets in project")
+    parser.add_argument("--list-versions", help="List versions of a specific secret")
+    parser.add_argument("--filter", help="Server-side filter for --list/--list-versions, e.g. labels.env=prod")
+    parser.add_argument("--endpoint",
+                        help=f"Secret Manager emulator host:port (default: ${EMULATOR_HOST_ENV})")
+    args = parser.parse_args()
+
+    try:
+        return asyncio.run(run(args))
+    except Exception as e:
+        print(f"\n✗ Fatal error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n\nInterrupted by user")
+        sys.exit(0)
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Zero-downtime service account key rotation for Cloud Storage clients.
+
+A storage.Client built from GOOGLE_APPLICATION_CREDENTIALS keeps using the
+key it was created with, so after `scripts/04-rotate-secret.sh` the process
+signs requests with the old key until the pod is restarted (and fails once
+the old key is disabled). RotatingStorageClient instead:
+
+    1. Watches the mounted key file (WatchingSecretFileReader: inotify,
+       or stat() polling as a fallback)
+    2. On rotation, builds and authenticates a new client on a background
+       thread, so no request ever waits for it
+    3. Atomically swaps the new client in; a bad or half-written key is
+       rejected and the current client keeps serving
+    4. Closes the old client's connections only after every in-flight
+       operation that leased it has finished
+
+The mounted file only changes if the CSI driver's rotation feature is
+enabled (`enableSecretRotation=true` on the driver install); otherwise the
+pod still sees the version it was started with.
+
+Usage:
+    manager = RotatingStorageClient("/var/secrets/credentials.json")
+
+    with manager.lease() as client:   # pinned for the whole upload
+        client.bucket("my-bucket").blob("a.txt").upload_from_filename("a.txt")
+"""
+
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional
+
+import _shared  # noqa: F401  (puts the shared helpers on sys.path)
+from gcs_client_pool import DEFAULT_POOL_SIZE, build_storage_client
+from secret_watcher import DEFAULT_POLL_INTERVAL, WatchingSecretFileReader
+
+# The client libraries are imported when the first client is built
+if TYPE_CHECKING:
+    from google.cloud import storage
+
+
+SwapCallback = Callable[["storage.Client"], None]
+
+
+class _ClientGeneration:
+    """One built client plus the bookkeeping needed to retire it safely."""
+
+    __slots__ = ("client", "session", "number", "key_id", "leases", "retired")
+
+    def __init__(self, client, session, number: int, key_id: Optional[str]):
+        self.client = client
+        self.session = session
+        self.number = number
+        self.key_id = key_id
+        self.leases = 0
+        self.retired = False
+
+
+class RotatingStorageClient:
+    """Storage client that follows rotations of a mounted service account key."""
+
+    def __init__(
+        self,
+        credentials_path: str,
+        project: Optional[str] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        poll_interval: float = DEFAULT_POLL_INTERVAL
+    ):
+        """
+        Build the initial client and start watching the key file.
+
+        Args:
+            credentials_path: Mounted service account key file
+            project: GCP project ID (optional, defaults to the key's project)
+            pool_size: Maximum number of pooled connections per host
+            poll_interval: Seconds between checks if inotify is unavailable
+
+        Raises:
+            FileNotFoundError: If the key file doesn't exist
+            ValueError: If the key is not a valid service account key
+        """
+        path = Path(credentials_path)
+        self.credentials_path = str(path)
+        self.project = project
+        self.pool_size = pool_size
+
+        self._lock = threading.Lock()
+        self._callbacks: List[SwapCallback] = []
+        self.swaps = 0
+        self.failed_reloads = 0
+
+        self._reader = WatchingSecretFileReader(str(path.parent), poll_interval=poll_interval)
+        self._filename = path.name
+
+        # The first build happens in the caller's thread so errors surface here
+        self._current = self._build(number=1)
+
+        self._rotation_pending = threading.Event()
+        self._stopped = False
+        self._reader.on_rotation(self._on_file_rotated)
+        self._reloader = threading.Thread(
+            target=self._reload_loop, name="credential-reloader", daemon=True
+        )
+        self._reloader.start()
+
+    def _build(self, number: int) -> _ClientGeneration:
+        """Load, validate and authenticate a new client from the key file."""
+        key_data = self._reader.read_json_secret(self._filename)
+        self._reader.validate_service_account_key(key_data)
+
+        from google.auth.credentials import AnonymousCredentials
+        from google.auth.transport.requests import Request
+
+        client, session = build_storage_client(
+            self.credentials_path, self.project, self.pool_size
+        )
+        # Fetch the first access token now, so a key that is rejected by
+        # Google is caught before it replaces a working client. Against an
+        # emulator (STORAGE_EMULATOR_HOST) there is no token to fetch.
+        if not isinstance(session.credentials, AnonymousCredentials):
+            session.credentials.refresh(Request())
+
+        return _ClientGeneration(client, session, number, key_data.get("private_key_id"))
+
+    def _on_file_rotated(self, filename: str) -> None:
+        """Watcher callback: only note the rotation, rebuild off this thread."""
+        if filename == self._filename:
+            self._rotation_pending.set()
+
+    def _reload_loop(self) -> None:
+        """Background thread rebuilding the client after each rotation."""
+        while True:
+            self._rotation_pending.wait()
+            if self._stopped:
+                return
+            # Several file events for one rotation collapse into one rebuild
+            self._rotation_pending.clear()
+            self.reload()
+
+    def reload(self) -> bool:
+        """
+        Rebuild the client from the key file and swap it in.
+
+        Called automatically on rotation; can also be called directly.
+
+        Returns:
+            True if a new client was swapped in, False if the key is unchanged
+            or the new client could not be built (the old one keeps serving)
+        """
+        with self._lock:
+            current = self._current
+
+        try:
+            candidate = self._build(current.number + 1)
+        except Exception as e:
+            self.failed_reloads += 1
+            print(f"⚠ Credential reload failed, keeping current key: {e}", file=sys.stderr)
+            return False
+
+        if candidate.key_id is not None and candidate.key_id == current.key_id:
+            candidate.session.close()
+            return False
+
+        with self._lock:
+            previous = self._current
+            self._current = candidate
+            previous.retired = True
+            close_previous = previous.leases == 0
+            self.swaps += 1
+            callbacks = list(self._callbacks)
+
+        if close_previous:
+            previous.session.close()
+
+        print(f"✓ Credentials rotated (key {candidate.key_id}, generation {candidate.number})")
+        for callback in callbacks:
+            try:
+                callback(candidate.client)
+            except Exception as e:
+                print(f"⚠ Credential swap callback failed: {e}", file=sys.stderr)
+        return True
+
+    @property
+    def client(self) -> "storage.Client":
+        """
+        The current client.
+
+        Fine for one-off calls; for longer operations use lease(), because an
+        unleased client may be closed right after a rotation.
+        """
+        with self._lock:
+            return self._current.client
+
+    @contextmanager
+    def lease(self) -> Iterator["storage.Client"]:
+        """
+        Pin the current client for the duration of an operation.
+
+        A rotation during the operation doesn't affect it: the old client
+        stays open until its last lease is released.
+
+        Yields:
+            storage.Client
+        """
+        with self._lock:
+            generation = self._current
+            generation.leases += 1
+
+        try:
+            yield generation.client
+        finally:
+            with self._lock:
+                generation.leases -= 1
+                close = generation.retired and generation.leases == 0
+            if close:
+                generation.session.close()
+
+    def on_swap(self, callback: SwapCallback) -> None:
+        """Register a callback fired with the new client after each swap."""
+        with self._lock:
+            self._callbacks.append(callback)
+
+    def stats(self) -> Dict[str, Any]:
+        """Current generation, key id, swap counters and in-flight leases."""
+        with self._lock:
+            return {
+                "generation": self._current.number,
+                "key_id": self._current.key_id,
+                "swaps": self.swaps,
+                "failed_reloads": self.failed_reloads,
+                "leases": self._current.leases,
+                "watch_mode": self._reader.mode,
+            }
+
+    def close(self) -> None:
+        """Stop watching and close the current client's connections."""
+        self._stopped = True
+        self._rotation_pending.set()
+        self._reader.stop()
+        self._reloader.join(timeout=5)
+        with self._lock:
+            self._current.retired = True
+            close = self._current.leases == 0
+        if close:
+            self._current.session.close()
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Prewarm the secret cache at startup from the SecretProviderClass manifest.
+
+k8s/secret-provider-class.yaml already lists every secret the pod needs, but
+an app using CachedSecretManagerClient only finds out on first use, so each
+first request pays a Secret Manager round-trip. Prewarming fetches the whole
+list concurrently (one round-trip of latency in total) before the app
+reports ready:
+
+    refs = load_secret_refs("k8s/secret-provider-class.yaml", name="demo-app-secrets")
+    client = CachedSecretManagerClient("my-project", refresh_ahead=30)
+    report = prewarm(client, refs)
+    if report.ok:
+        mark_ready()
+
+Manifests are parsed with PyYAML when it is installed; otherwise a line
+scanner that understands the CSI driver's `resourceName:` entries is used.
+A plain list of "secret[:version]" lines works too; any other YAML file is
+rejected rather than read as a list. The project in each
+resourceName is ignored (the tutorial's manifests use a PROJECT_NUMBER
+placeholder); secrets are read from the client's project.
+
+Usage:
+  # Check that every secret in the manifest is readable, and how long it takes
+  python prewarm.py --project my-project --manifest ../k8s/secret-provider-class.yaml \\
+      --name demo-app-secrets
+
+  # Warm the pod-wide cache (shared_secret_cache.py) and signal readiness
+  python prewarm.py --project my-project --manifest /etc/app/secret-provider-class.yaml \\
+      --shared --ready-file /tmp/secrets-ready
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import yaml
+except ImportError:  # Optional dependency; a line scanner is used without it
+    yaml = None
+
+from read_secret_direct import DEFAULT_BATCH_WORKERS, CachedSecretManagerClient, parse_secret_ref
+
+PROVIDER_CLASS_KIND = "SecretProviderClass"
+
+_RESOURCE_NAME = re.compile(r"^projects/[^/]+/secrets/([^/]+)/versions/([^/]+)$")
+_RESOURCE_LINE = re.compile(r"^\s*(?:-\s*)?resourceName:\s*[\"']?([^\"'\s]+)")
+_NAME_LINE = re.compile(r"^\s+name:\s*[\"']?([^\"'\s#]+)")
+_KIND_LINE = re.compile(r"^kind:", re.MULTILINE)
+_PROVIDER_CLASS_LINE = re.compile(rf"^kind:\s*[\"']?{PROVIDER_CLASS_KIND}\b", re.MULTILINE)
+
+# Secret IDs and versions (numbers or aliases): letters, digits, "_" and "-"
+_REF_PART = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+@dataclass
+class PrewarmReport:
+    """Outcome of one prewarm run."""
+
+    loaded: List[str]
+    errors: Dict[str, Exception] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def parse_resource_name(resource_name: str) -> Tuple[str, str]:
+    """
+    Split "projects/P/secrets/S/versions/V" into (secret_id, version).
+
+    Raises:
+        ValueError: Not a secret version resource name
+    """
+    match = _RESOURCE_NAME.match(resource_name.strip())
+    if match is None:
+        raise ValueError(f"Invalid secret version resource name: '{resource_name}'")
+    return match.group(1), match.group(2)
+
+
+def _refs_from_yaml(text: str, name: Optional[str]) -> List[str]:
+    resource_names = []
+    for document in yaml.safe_load_all(text):
+        if not isinstance(document, dict) or document.get("kind") != PROVIDER_CLASS_KIND:
+            continue
+        if name and (document.get("metadata") or {}).get("name") != name:
+            continue
+        secrets = ((document.get("spec") or {}).get("parameters") or {}).get("secrets") or ""
+        # The CSI driver takes the secret list as an embedded YAML string
+        for entry in yaml.safe_load(secrets) or []:
+            resource_names.append(entry["resourceName"])
+    return resource_names
+
+
+def _refs_from_lines(text: str, name: Optional[str]) -> List[str]:
+    resource_names = []
+    for document in re.split(r"^---\s*$", text, flags=re.MULTILINE):
+        lines = [line for line in document.splitlines() if not line.lstrip().startswith("#")]
+        if not any(line.startswith(f"kind: {PROVIDER_CLASS_KIND}") for line in lines):
+            continue
+        # metadata.name is the first indented "name:" in a SecretProviderClass
+        names = [match.group(1) for match in map(_NAME_LINE.match, lines) if match]
+        if name and (not names or names[0] != name):
+            continue
+        resource_names.extend(match.group(1) for match in map(_RESOURCE_LINE.match, lines) if match)
+    return resource_names
+
+
+def _refs_from_list(text: str, path: str) -> List[Tuple[str, str]]:
+    refs = []
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        secret_id, version = parse_secret_ref(line)
+        if not (_REF_PART.match(secret_id) and _REF_PART.match(version)):
+            raise ValueError(f"{path}:{number}: not a 'secret[:version]' reference: '{line}'")
+        refs.append((secret_id, version))
+    return refs
+
+
+def load_secret_refs(path: str, name: Optional[str] = None) -> List[Tuple[str, str]]:
+    """
+    Read the secrets to prewarm from a manifest or a plain list.
+
+    Args:
+        path: SecretProviderClass YAML (possibly several documents), or a
+            text file with one "secret[:version]" per line ("#" comments)
+        name: Only use the SecretProviderClass with this metadata.name
+            (default: every SecretProviderClass in the file)
+
+    Returns:
+        Unique (secret_id, version) pairs in manifest order
+
+    Raises:
+        FileNotFoundError: Path doesn't exist
+        ValueError: No secrets found, a YAML file without a
+            SecretProviderClass, a malformed resourceName or list line
+    """
+    text = Path(path).read_text()
+
+    if Path(path).suffix in (".yaml", ".yml") or _KIND_LINE.search(text):
+        if not _PROVIDER_CLASS_LINE.search(text):
+            raise ValueError(f"No {PROVIDER_CLASS_KIND} found in {path}")
+        if yaml is not None:
+            resource_names = _refs_from_yaml(text, name)
+        else:
+            resource_names = _refs_from_lines(text, name)
+        refs = [parse_resource_name(resource_name) for resource_name in resource_names]
+    else:
+        refs = _refs_from_list(text, path)
+
+    if not refs:
+        selector = f" in SecretProviderClass '{name}'" if name else ""
+        raise ValueError(f"No secrets found{selector} in {path}")
+    return list(dict.fromkeys(refs))
+
+
+def prewarm(
+    client: CachedSecretManagerClient,
+    refs: List[Tuple[str, str]],
+    max_workers: int = DEFAULT_BATCH_WORKERS
+) -> PrewarmReport:
+    """
+    Fetch every secret into the client's cache concurrently.
+
+    Args:
+        client: Cached client the app will use (or a
+            SharedCachedSecretManagerClient, to warm the pod-wide cache)
+        refs: (secret_id, version) pairs, e.g. from load_secret_refs
+        max_workers: Maximum number of requests in flight
+
+    Returns:
+        PrewarmReport with the loaded keys, the failures and the elapsed time
+    """
+    started = time.perf_counter()
+    values, errors = client.access_many(refs, max_workers=max_workers)
+    return PrewarmReport(
+        loaded=list(values),
+        errors=errors,
+        seconds=time.perf_counter() - started,
+    )
+
+
+def write_ready_file(path: str, report: PrewarmReport) -> None:
+    """Atomically create the readiness marker (e.g. for an exec readinessProbe)."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(f"secrets={len(report.loaded)} seconds={report.seconds:.3f}\n")
+    os.replace(tmp_path, path)
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Prewarm the secret cache from a SecretProviderClass")
+    parser.add_argument("--project", default="my-project-dev",
+                        help="GCP project ID (default: my-project-dev)")
+    parser.add_argument("--manifest", required=True,
+                        help="SecretProviderClass YAML, or a file of SECRET[:VERSION] lines")
+    parser.add_argument("--name", help="metadata.name of the SecretProviderClass to use (default: all)")
+    parser.add_argument("--max-workers", type=int, default=DEFAULT_BATCH_WORKERS,
+                        help=f"Concurrent requests (default: {DEFAULT_BATCH_WORKERS})")
+    parser.add_argument("--shared", action="store_true",
+                        help="Warm the pod-wide cache server (shared_secret_cache.py)")
+    parser.add_argument("--socket",
+                        help="With --shared: Unix socket of the cache server "
+                             "(default: $SECRET_CACHE_SOCKET or /tmp/secret-cache.sock)")
+    parser.add_argument("--ready-file", help="Create this file once every secret is cached")
+    parser.add_argument("--allow-missing", action="store_true",
+                        help="Create --ready-file even if some secrets failed")
+    parser.add_argument("--endpoint", help="Secret Manager emulator host:port")
+    args = parser.parse_args()
+
+    try:
+        refs = load_secret_refs(args.manifest, args.name)
+    except (OSError, ValueError) as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return 1
+
+    if args.shared:
+        from shared_secret_cache import DEFAULT_SOCKET_PATH, SharedCachedSecretManagerClient
+
+        # Never become the server here: this process exits after warming
+        client = SharedCachedSecretManagerClient(
+            args.project, args.socket or DEFAULT_SOCKET_PATH, elect_server=False,
+            endpoint=args.endpoint
+        )
+    else:
+        client = CachedSecretManagerClient(args.project, endpoint=args.endpoint, log_hits=False)
+
+    try:
+        # Without a server, the worker would only warm this short-lived
+        # process's own cache
+        if args.shared and client.shared_stats() is None:
+            print(f"✗ No shared cache server on {client.socket_path}", file=sys.stderr)
+            return 1
+
+        print(f"Prewarming {len(refs)} secret(s) from {args.manifest}...")
+        report = prewarm(client, refs, args.max_workers)
+
+        if args.shared and client.shared_stats() is None:
+            print(f"✗ Shared cache server on {client.socket_path} went away while prewarming",
+                  file=sys.stderr)
+            return 1
+    finally:
+        client.close()
+
+    for key in report.loaded:
+        print(f"✓ {key}")
+    for key, error in report.errors.items():
+        print(f"✗ {key}: {error}", file=sys.stderr)
+    print(f"  Warmed {len(report.loaded)}/{len(refs)} secret(s) in {report.seconds * 1000:.0f} ms")
+
+    if args.ready_file and (report.ok or args.allow_missing):
+        write_ready_file(args.ready_file, report)
+        print(f"✓ Wrote {args.ready_file}")
+
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n\nInterrupted by user")
+        sys.exit(0)
@@ -19,33 +19,254 @@ Usage:
   # Access specific secret
   python read_secret_direct.py --secret=my-secret-name --project=my-project
 
+  # Fetch several secrets concurrently (SECRET or SECRET:VERSION)
+  python read_secret_direct.py --secrets=demo-app-api-key,demo-app-db-url:3
+
+  # Inventory: list secrets (server-side filter), or count every secret's versions
+  python read_secret_direct.py --list --filter=labels.env=prod
+  python read_secret_direct.py --audit --page-size=500
+
+  # Against the local emulator (secret_manager_emulator.py), no GCP needed
+  export SECRET_MANAGER_EMULATOR_HOST=localhost:9024
+  python read_secret_direct.py --secret=demo-app-api-key
+
 Note: This method requires the service account to have both:
   1. secretmanager.secretAccessor role on the secrets
   2. Active credentials (GOOGLE_APPLICATION_CREDENTIALS or Application Default Credentials)
 """
 
 import argparse
+import asyncio
 import json
+import math
+import os
 import sys
-from typing import Optional, Dict, Any
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional, Dict, Any, Callable, Iterable, Iterator, List, Set, Tuple, Union
+
+import _shared  # noqa: F401  (puts the shared helpers on sys.path)
+from instrumentation import get_instrumentation
+from resilience import CircuitBreaker, RetryPolicy
+from singleflight import AsyncSingleFlight, SingleFlight
+
+# The client library (and gRPC underneath it) takes far longer to import than
+# the rest of this script, so it is only imported once a client is created
+if TYPE_CHECKING:
+    from google.cloud.secretmanager_v1 import AccessSecretVersionResponse, Secret, SecretVersion
+
+
+@lru_cache(maxsize=None)
+def transient_errors() -> Tuple[type, ...]:
+    """
+    Errors that mean "Secret Manager is unavailable right now", as opposed to
+    "this secret doesn't exist / you can't read it".
+    """
+    from google.api_core import exceptions
+
+    return (
+        exceptions.ServiceUnavailable,
+        exceptions.DeadlineExceeded,
+        exceptions.InternalServerError,
+        exceptions.ResourceExhausted,
+        exceptions.RetryError,
+        ConnectionError,
+        TimeoutError,
+    )
+
+
+@lru_cache(maxsize=None)
+def request_errors() -> Tuple[type, type]:
+    """
+    The (NotFound, PermissionDenied) errors that mean this request can't
+    succeed, translated by access_error / list_error.
+    """
+    from google.api_core import exceptions
+
+    return exceptions.NotFound, exceptions.PermissionDenied
+
+
+# Default number of secrets fetched concurrently by access_many
+DEFAULT_BATCH_WORKERS = 16
+
+# Secret reads are small and usually on a request path: retry quickly, and
+# give up (or serve a cached value) within seconds rather than a minute
+ACCESS_RETRY_POLICY = RetryPolicy(max_attempts=4, initial_backoff=0.1, max_backoff=2.0, deadline=10.0)
+
+# host:port of a local Secret Manager emulator; overrides the real endpoint
+EMULATOR_HOST_ENV = "SECRET_MANAGER_EMULATOR_HOST"
+
+# gRPC metadata carrying a response field mask (the REST API's $fields)
+FIELD_MASK_HEADER = "x-goog-fieldmask"
+
+
+def access_error(error: Exception, project_id: str, secret_id: str, version: str) -> Exception:
+    """
+    Translate an access failure into the exception the clients raise.
+
+    Args:
+        error: Exception raised by the client library
+        project_id: GCP project ID
+        secret_id: Secret name
+        version: Secret version
+
+    Returns:
+        ValueError for NotFound, PermissionError for PermissionDenied (both
+        with troubleshooting hints), otherwise `error` unchanged
+    """
+    not_found, permission_denied = request_errors()
+
+    if isinstance(error, not_found):
+        return ValueError(
+            f"Secret '{secret_id}' version '{version}' not found in project '{project_id}'\n"
+            f"Verify the secret exists: gcloud secrets list --project={project_id}"
+        )
+
+    if isinstance(error, permission_denied):
+        return PermissionError(
+            f"Permission denied accessing secret '{secret_id}'\n"
+            f"Grant access with:\n"
+            f"  gcloud secrets add-iam-policy-binding {secret_id} \\\n"
+            f"    --project={project_id} \\\n"
+            f"    --member='serviceAccount:YOUR_SA@{project_id}.iam.gserviceaccount.com' \\\n"
+            f"    --role='roles/secretmanager.secretAccessor'"
+        )
+
+    return error
 
-from google.cloud import secretmanager
-from google.cloud.secretmanager_v1 import AccessSecretVersionResponse
-from google.api_core import exceptions
+
+def list_error(error: Exception, project_id: str, secret_id: Optional[str] = None) -> Exception:
+    """
+    Translate a list failure into the exception the clients raise.
+
+    Args:
+        error: Exception raised by the client library
+        project_id: GCP project ID
+        secret_id: Secret whose versions were listed (None when listing secrets)
+
+    Returns:
+        ValueError if the secret doesn't exist, PermissionError for
+        PermissionDenied, otherwise `error` unchanged
+    """
+    not_found, permission_denied = request_errors()
+
+    if isinstance(error, not_found) and secret_id is not None:
+        return ValueError(f"Secret '{secret_id}' not found in project '{project_id}'")
+
+    if isinstance(error, permission_denied):
+        return PermissionError(
+            f"Permission denied listing secrets in project '{project_id}'\n"
+            "You may have access to specific secrets but not list all secrets.\n"
+            "Try accessing a specific secret by name instead."
+        )
+
+    return error
+
+
+def parse_secret_ref(ref: Union[str, Tuple[str, str]]) -> Tuple[str, str]:
+    """
+    Normalize a secret reference to (secret_id, version).
+
+    Args:
+        ref: "secret", "secret:version" or a (secret, version) tuple
+
+    Returns:
+        Tuple of (secret_id, version)
+    """
+    if isinstance(ref, tuple):
+        return ref
+    secret_id, _, version = ref.partition(":")
+    return secret_id, version or "latest"
+
+
+def list_request(
+    parent: str,
+    page_size: Optional[int] = None,
+    filter_expr: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Build a ListSecrets/ListSecretVersions request.
+
+    Args:
+        parent: "projects/P" or "projects/P/secrets/S"
+        page_size: Items per page (None for the server default)
+        filter_expr: Secret Manager list filter, e.g. "labels.env=prod" or
+            "state:ENABLED" (None for everything)
+
+    Returns:
+        Request dictionary for the client library
+    """
+    request: Dict[str, Any] = {"parent": parent}
+    if page_size:
+        request["page_size"] = page_size
+    if filter_expr:
+        request["filter"] = filter_expr
+    return request
+
+
+def list_metadata(collection: str, fields: Optional[Iterable[str]] = None) -> Tuple[Tuple[str, str], ...]:
+    """
+    Request metadata restricting a list response to some fields of each item.
+
+    The field mask travels in the x-goog-fieldmask header, so the server
+    leaves out everything else (labels, annotations, replication, ...) and
+    large inventories move far fewer bytes.
+
+    Args:
+        collection: Repeated field of the response ("secrets" or "versions")
+        fields: Item fields to return, e.g. ["name", "state"] (None for all)
+
+    Returns:
+        Metadata for the list call (empty without fields)
+    """
+    if not fields:
+        return ()
+    return ((FIELD_MASK_HEADER, f"next_page_token,{collection}({','.join(fields)})"),)
 
 
 class SecretManagerClient:
     """Client for accessing Google Secret Manager."""
 
-    def __init__(self, project_id: str):
+    def __init__(
+        self,
+        project_id: str,
+        endpoint: Optional[str] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None
+    ):
         """
         Initialize Secret Manager client.
 
         Args:
             project_id: GCP project ID (not project number)
+            endpoint: host:port of a Secret Manager emulator, reached over an
+                insecure channel without credentials (optional, defaults to
+                SECRET_MANAGER_EMULATOR_HOST)
+            retry_policy: Retries and time budget for each access (optional,
+                defaults to ACCESS_RETRY_POLICY)
+            circuit_breaker: Fail fast while Secret Manager keeps failing
+                (optional; share one breaker between clients of a process)
         """
+        from google.cloud import secretmanager
+
         self.project_id = project_id
-        self.client = secretmanager.SecretManagerServiceClient()
+        self.endpoint = endpoint or os.environ.get(EMULATOR_HOST_ENV)
+        self.retry_policy = retry_policy or ACCESS_RETRY_POLICY
+        self.circuit_breaker = circuit_breaker
+
+        if self.endpoint:
+            import grpc
+            from google.cloud.secretmanager_v1.services.secret_manager_service.transports import (
+                SecretManagerServiceGrpcTransport,
+            )
+
+            transport = SecretManagerServiceGrpcTransport(channel=grpc.insecure_channel(self.endpoint))
+            self.client = secretmanager.SecretManagerServiceClient(transport=transport)
+        else:
+            self.client = secretmanager.SecretManagerServiceClient()
 
     def access_secret_version(
         self,
@@ -62,143 +283,599 @@ class SecretManagerClient:
         Returns:
             Secret payload as string
 
+        Transient failures are retried according to `retry_policy`, within
+        its deadline; while `circuit_breaker` is open, calls fail at once.
+
         Raises:
-            google.api_core.exceptions.NotFound: Secret or version not found
-            google.api_core.exceptions.PermissionDenied: Lacking access permissions
+            ValueError: Secret or version not found
+            PermissionError: Lacking access permissions
+            CircuitOpenError: Secret Manager has been failing; not attempted
         """
         # Build the resource name
         name = f"projects/{self.project_id}/secrets/{secret_id}/versions/{version}"
+        hooks = get_instrumentation()
 
-        try:
-            # Access the secret version
-            response: AccessSecretVersionResponse = self.client.access_secret_version(
-                request={"name": name}
+        def attempt(timeout: Optional[float]) -> "AccessSecretVersionResponse":
+            # The policy above replaces the library's own retries, so one
+            # budget bounds the whole call
+            return self.client.access_secret_version(
+                request={"name": name}, retry=None, timeout=timeout
             )
 
-            # Return the decoded payload
-            payload = response.payload.data.decode("UTF-8")
-            return payload
+        with hooks.span("secretmanager.access_secret_version",
+                        {"secret.id": secret_id, "secret.version": version}):
+            try:
+                # Access the secret version
+                response: "AccessSecretVersionResponse" = self.retry_policy.call(
+                    attempt, self.circuit_breaker, operation_name="secretmanager.access_secret_version"
+                )
 
-        except exceptions.NotFound:
-            raise ValueError(
-                f"Secret '{secret_id}' version '{version}' not found in project '{self.project_id}'\n"
-                f"Verify the secret exists: gcloud secrets list --project={self.project_id}"
-            )
+                # Return the decoded payload
+                payload = response.payload.data.decode("UTF-8")
+                if hooks.enabled:
+                    hooks.add("secretmanager.payload.bytes", len(response.payload.data))
+                return payload
 
-        except exceptions.PermissionDenied:
-            raise PermissionError(
-                f"Permission denied accessing secret '{secret_id}'\n"
-                f"Grant access with:\n"
-                f"  gcloud secrets add-iam-policy-binding {secret_id} \\\n"
-                f"    --project={self.project_id} \\\n"
-                f"    --member='serviceAccount:YOUR_SA@{self.project_id}.iam.gserviceaccount.com' \\\n"
-                f"    --role='roles/secretmanager.secretAccessor'"
-            )
+            except request_errors() as e:
+                raise access_error(e, self.project_id, secret_id, version)
+
+    def access_many(
+        self,
+        secrets: Iterable[Union[str, Tuple[str, str]]],
+        max_workers: int = DEFAULT_BATCH_WORKERS
+    ) -> Tuple[Dict[str, str], Dict[str, Exception]]:
+        """
+        Access many secret versions concurrently.
 
-    def list_secrets(self) -> None:
-        """List all secrets in the project."""
-        parent = f"projects/{self.project_id}"
+        Requests are issued from a thread pool over this client's single gRPC
+        channel (HTTP/2 multiplexes them), so N secrets cost roughly one
+        round-trip of latency instead of N.
 
+        Args:
+            secrets: Secret references: "secret", "secret:version" or
+                (secret, version) tuples
+            max_workers: Maximum number of requests in flight
+
+        Returns:
+            Tuple of (values, errors), both keyed by "secret_id:version".
+            A secret appears in exactly one of the two dictionaries.
+        """
+        refs = list(dict.fromkeys(parse_secret_ref(ref) for ref in secrets))
+        values: Dict[str, str] = {}
+        errors: Dict[str, Exception] = {}
+
+        if not refs:
+            return values, errors
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(refs))) as executor:
+            futures = {
+                f"{secret_id}:{version}": executor.submit(
+                    self.access_secret_version, secret_id, version
+                )
+                for secret_id, version in refs
+            }
+            for key, future in futures.items():
+                try:
+                    values[key] = future.result()
+                except Exception as e:
+                    errors[key] = e
+
+        return values, errors
+
+    def iter_secrets(
+        self,
+        page_size: Optional[int] = None,
+        filter_expr: Optional[str] = None,
+        fields: Optional[Iterable[str]] = None
+    ) -> Iterator["Secret"]:
+        """
+        Stream the project's secrets, fetching pages as they are consumed.
+
+        Args:
+            page_size: Secrets per page (None for the server default)
+            filter_expr: Server-side filter, e.g. "labels.env=prod" or "name:db-"
+            fields: Secret fields to return, e.g. ["name", "labels"] (None for all)
+
+        Yields:
+            Secret resources
+
+        Raises:
+            PermissionError: Lacking secretmanager.secrets.list
+        """
+        request = list_request(f"projects/{self.project_id}", page_size, filter_expr)
         try:
-            print(f"\nSecrets in project '{self.project_id}':")
-            print("─" * 60)
-
-            for secret in self.client.list_secrets(request={"parent": parent}):
-                # Extract secret name from full path
-                secret_name = secret.name.split('/')[-1]
-                print(f"  - {secret_name}")
-
-                # Show labels if present
-                if secret.labels:
-                    labels_str = ", ".join([f"{k}={v}" for k, v in secret.labels.items()])
-                    print(f"    Labels: {labels_str}")
-
-        except exceptions.PermissionDenied:
-            raise PermissionError(
-                f"Permission denied listing secrets in project '{self.project_id}'\n"
-                "You may have access to specific secrets but not list all secrets.\n"
-                "Try accessing a specific secret by name instead."
+            yield from self.client.list_secrets(
+                request=request, metadata=list_metadata("secrets", fields)
             )
+        except request_errors() as e:
+            raise list_error(e, self.project_id)
 
-    def list_secret_versions(self, secret_id: str) -> None:
+    def iter_secret_versions(
+        self,
+        secret_id: str,
+        page_size: Optional[int] = None,
+        filter_expr: Optional[str] = None,
+        fields: Optional[Iterable[str]] = None
+    ) -> Iterator["SecretVersion"]:
         """
-        List all versions of a secret.
+        Stream the versions of a secret, newest first.
 
         Args:
             secret_id: Secret name
-        """
-        parent = f"projects/{self.project_id}/secrets/{secret_id}"
+            page_size: Versions per page (None for the server default)
+            filter_expr: Server-side filter, e.g. "state:ENABLED"
+            fields: SecretVersion fields to return, e.g. ["name", "state"]
+                (None for all)
+
+        Yields:
+            SecretVersion resources
 
+        Raises:
+            ValueError: Secret not found
+            PermissionError: Lacking secretmanager.versions.list
+        """
+        request = list_request(f"projects/{self.project_id}/secrets/{secret_id}", page_size, filter_expr)
         try:
-            print(f"\nVersions of secret '{secret_id}':")
-            print("─" * 60)
-            print(f"{'Version':<10} {'State':<15} {'Created':<30}")
-            print("─" * 60)
+            yield from self.client.list_secret_versions(
+                request=request, metadata=list_metadata("versions", fields)
+            )
+        except request_errors() as e:
+            raise list_error(e, self.project_id, secret_id)
 
-            for version in self.client.list_secret_versions(request={"parent": parent}):
-                version_num = version.name.split('/')[-1]
-                state = version.state.name
-                created = version.create_time.strftime("%Y-%m-%d %H:%M:%S UTC")
+    def list_versions_many(
+        self,
+        secret_ids: Iterable[str],
+        max_workers: int = DEFAULT_BATCH_WORKERS,
+        page_size: Optional[int] = None,
+        filter_expr: Optional[str] = None,
+        fields: Optional[Iterable[str]] = None
+    ) -> Tuple[Dict[str, List["SecretVersion"]], Dict[str, Exception]]:
+        """
+        List the versions of many secrets concurrently.
 
-                print(f"{version_num:<10} {state:<15} {created:<30}")
+        Like access_many, the listings share this client's gRPC channel, so
+        auditing a project costs about one round-trip per page of the
+        largest secret instead of one per page of every secret.
 
-        except exceptions.NotFound:
-            raise ValueError(
-                f"Secret '{secret_id}' not found in project '{self.project_id}'"
-            )
+        Args:
+            secret_ids: Secret names, e.g. from iter_secrets
+            max_workers: Maximum number of listings in flight
+            page_size, filter_expr, fields: As for iter_secret_versions
+
+        Returns:
+            Tuple of (versions, errors), both keyed by secret ID. A secret
+            appears in exactly one of the two dictionaries.
+        """
+        secret_ids = list(dict.fromkeys(secret_ids))
+        fields = list(fields) if fields else None
+        versions: Dict[str, List["SecretVersion"]] = {}
+        errors: Dict[str, Exception] = {}
+
+        if not secret_ids:
+            return versions, errors
+
+        def list_one(secret_id: str) -> List["SecretVersion"]:
+            return list(self.iter_secret_versions(secret_id, page_size, filter_expr, fields))
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(secret_ids))) as executor:
+            futures = {secret_id: executor.submit(list_one, secret_id) for secret_id in secret_ids}
+            for secret_id, future in futures.items():
+                try:
+                    versions[secret_id] = future.result()
+                except Exception as e:
+                    errors[secret_id] = e
+
+        return versions, errors
+
+    def list_secrets(self, filter_expr: Optional[str] = None) -> None:
+        """
+        Print all secrets in the project.
+
+        Args:
+            filter_expr: Server-side filter (optional)
+        """
+        print(f"\nSecrets in project '{self.project_id}':")
+        print("─" * 60)
+
+        for secret in self.iter_secrets(filter_expr=filter_expr, fields=["name", "labels"]):
+            # Extract secret name from full path
+            secret_name = secret.name.split('/')[-1]
+            print(f"  - {secret_name}")
+
+            # Show labels if present
+            if secret.labels:
+                labels_str = ", ".join([f"{k}={v}" for k, v in secret.labels.items()])
+                print(f"    Labels: {labels_str}")
+
+    def list_secret_versions(self, secret_id: str, filter_expr: Optional[str] = None) -> None:
+        """
+        Print all versions of a secret.
+
+        Args:
+            secret_id: Secret name
+            filter_expr: Server-side filter (optional)
+        """
+        print(f"\nVersions of secret '{secret_id}':")
+        print("─" * 60)
+        print(f"{'Version':<10} {'State':<15} {'Created':<30}")
+        print("─" * 60)
+
+        fields = ["name", "state", "create_time"]
+        for version in self.iter_secret_versions(secret_id, filter_expr=filter_expr, fields=fields):
+            version_num = version.name.split('/')[-1]
+            state = version.state.name
+            created = version.create_time.strftime("%Y-%m-%d %H:%M:%S UTC")
+
+            print(f"{version_num:<10} {state:<15} {created:<30}")
 
 
 class SecretCache:
-    """Simple in-memory cache for secrets with TTL."""
+    """
+    Thread-safe, size-bounded LRU cache for secrets with TTL.
 
-    def __init__(self, ttl_seconds: int = 300):
+    Entries expire `ttl_seconds` after they are stored. When the cache is full
+    the least recently used entry is evicted. Expired entries are removed when
+    read, plus a full sweep every `sweep_interval` operations so that keys that
+    are never read again (e.g. superseded versions) don't accumulate.
+
+    With `stale_seconds`, expired entries are kept that much longer so
+    `get_stale` can still return the last good value while the backend is
+    unreachable; `get` never returns them.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int = 300,
+        max_entries: int = 1024,
+        sweep_interval: int = 256,
+        stale_seconds: float = 0
+    ):
         """
         Initialize cache.
 
         Args:
             ttl_seconds: Time-to-live for cached secrets (default: 5 minutes)
+            max_entries: Maximum number of cached secrets (default: 1024)
+            sweep_interval: Operations between sweeps of expired entries
+            stale_seconds: How long expired entries stay available to get_stale
         """
         self.ttl_seconds = ttl_seconds
-        self.cache: Dict[str, Any] = {}
+        self.max_entries = max_entries
+        self.sweep_interval = sweep_interval
+        self.stale_seconds = stale_seconds
+        self.cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._ops_since_sweep = 0
+
+        # Counters, read them with stats()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _sweep_locked(self, now: float) -> None:
+        """Drop expired entries every sweep_interval operations (lock held)."""
+        self._ops_since_sweep += 1
+        if self._ops_since_sweep < self.sweep_interval:
+            return
+
+        self._ops_since_sweep = 0
+        expired = [
+            key for key, entry in self.cache.items()
+            if now >= entry['expires_at'] + self.stale_seconds
+        ]
+        for key in expired:
+            del self.cache[key]
+        self.expirations += len(expired)
 
     def get(self, key: str) -> Optional[str]:
         """Get secret from cache if not expired."""
-        import time
+        found = self.lookup(key)
+        return found[0] if found else None
 
-        if key not in self.cache:
-            return None
+    def lookup(self, key: str) -> Optional[Tuple[str, float]]:
+        """
+        Get secret from cache together with its remaining lifetime.
 
-        cached_data = self.cache[key]
-        if time.time() - cached_data['timestamp'] > self.ttl_seconds:
-            # Expired
-            del self.cache[key]
-            return None
+        Returns:
+            Tuple of (value, seconds until expiry), or None if missing/expired
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            self._sweep_locked(now)
+
+            cached_data = self.cache.get(key)
+            if cached_data is None:
+                self.misses += 1
+                result = None
+            elif now >= cached_data['expires_at']:
+                # Expired; keep it around for get_stale during the grace period
+                if now >= cached_data['expires_at'] + self.stale_seconds:
+                    del self.cache[key]
+                    self.expirations += 1
+                self.misses += 1
+                result = None
+            else:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                result = cached_data['value'], cached_data['expires_at'] - now
+
+        hooks = get_instrumentation()
+        if hooks.enabled:
+            hooks.add("secret_cache.lookups", 1, {"result": "miss" if result is None else "hit"})
+        return result
+
+    def get_stale(self, key: str) -> Optional[Tuple[str, float]]:
+        """
+        Get the last stored value even if expired, within stale_seconds.
 
-        return cached_data['value']
+        Returns:
+            Tuple of (value, seconds since expiry; negative if still fresh),
+            or None if nothing usable is cached
+        """
+        with self._lock:
+            cached_data = self.cache.get(key)
+            if cached_data is None:
+                return None
+
+            overdue = time.monotonic() - cached_data['expires_at']
+            if overdue >= self.stale_seconds and overdue >= 0:
+                return None
+            return cached_data['value'], overdue
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        """
+        Store secret in cache with timestamp, evicting the LRU entry if full.
+
+        Args:
+            key: Cache key
+            value: Secret value
+            ttl: Time-to-live for this entry (optional, defaults to ttl_seconds;
+                math.inf keeps it until evicted)
+        """
+        now = time.monotonic()
+        ttl = self.ttl_seconds if ttl is None else ttl
+
+        with self._lock:
+            self._sweep_locked(now)
+
+            self.cache[key] = {
+                'value': value,
+                'timestamp': now,
+                'expires_at': now + ttl
+            }
+            self.cache.move_to_end(key)
+
+            evicted = 0
+            while len(self.cache) > self.max_entries:
+                self.cache.popitem(last=False)
+                evicted += 1
+            self.evictions += evicted
+
+        hooks = get_instrumentation()
+        if hooks.enabled:
+            hooks.add("secret_cache.sets")
+            if evicted:
+                hooks.add("secret_cache.evictions", evicted)
+
+    def peek(self, key: str) -> Optional[str]:
+        """Get an unexpired value without touching LRU order or counters."""
+        with self._lock:
+            cached_data = self.cache.get(key)
+            if cached_data is None or time.monotonic() >= cached_data['expires_at']:
+                return None
+            return cached_data['value']
+
+    def invalidate(self, key: str) -> None:
+        """Remove a single entry, if present."""
+        with self._lock:
+            self.cache.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries (counters are kept)."""
+        with self._lock:
+            self.cache.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self.cache)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss/eviction counters and the current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self.cache),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+
+# A TTL policy maps (secret_id, version) to a time-to-live in seconds
+TTLPolicy = Callable[[str, str], float]
+
+
+class VersionAwareTTLPolicy:
+    """
+    TTL policy that caches pinned versions far longer than aliases.
+
+    A numbered secret version's payload is immutable, so "my-secret:3" can be
+    cached for the life of the process (or until LRU eviction). Aliases such
+    as "latest" move when a new version is added and get a short TTL.
+
+    Note: a pinned version that is later disabled or destroyed keeps being
+    served from cache until the process restarts or the entry is evicted.
+    """
+
+    def __init__(self, alias_ttl: float = 300, pinned_ttl: float = math.inf):
+        """
+        Initialize policy.
 
-    def set(self, key: str, value: str) -> None:
-        """Store secret in cache with timestamp."""
-        import time
+        Args:
+            alias_ttl: TTL in seconds for aliases like "latest" (default: 5 minutes)
+            pinned_ttl: TTL in seconds for numeric versions (default: no expiry)
+        """
+        self.alias_ttl = alias_ttl
+        self.pinned_ttl = pinned_ttl
 
-        self.cache[key] = {
-            'value': value,
-            'timestamp': time.time()
-        }
+    def __call__(self, secret_id: str, version: str) -> float:
+        return self.pinned_ttl if version.isdigit() else self.alias_ttl
 
 
 class CachedSecretManagerClient(SecretManagerClient):
-    """Secret Manager client with caching for better performance."""
+    """
+    Secret Manager client with caching for better performance.
+
+    Concurrent cache misses for the same secret version are coalesced: one
+    caller fetches from Secret Manager and the others wait for its result,
+    so an expiring hot entry costs one RPC rather than one per caller.
+
+    How long an entry lives is decided by `ttl_policy`. The default,
+    VersionAwareTTLPolicy, keeps pinned numeric versions until evicted and
+    expires aliases such as "latest" after `cache_ttl` seconds.
+
+    Optional stale-while-revalidate behaviour:
+      - refresh_ahead: a hit within this many seconds of expiry returns the
+        cached value immediately and refreshes the entry in the background,
+        so hot secrets never expire on the request path
+      - max_staleness: if Secret Manager is unreachable when an entry has
+        expired, keep serving the last good value for up to this long; with
+        a circuit_breaker, that value is served without waiting on an RPC
+        while the breaker is open
+    """
 
-    def __init__(self, project_id: str, cache_ttl: int = 300):
+    def __init__(
+        self,
+        project_id: str,
+        cache_ttl: int = 300,
+        cache_max_entries: int = 1024,
+        refresh_ahead: float = 0,
+        max_staleness: float = 0,
+        refresh_workers: int = 2,
+        ttl_policy: Optional[TTLPolicy] = None,
+        endpoint: Optional[str] = None,
+        log_hits: bool = True,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None
+    ):
         """
         Initialize client with cache.
 
         Args:
             project_id: GCP project ID
             cache_ttl: Cache time-to-live in seconds (default: 5 minutes)
+            cache_max_entries: Maximum number of cached secret versions
+            refresh_ahead: Seconds before expiry to start a background refresh
+                (default: 0, disabled)
+            max_staleness: Seconds past expiry the last good value may be served
+                while Secret Manager is unreachable (default: 0, disabled)
+            refresh_workers: Background threads used for refreshes
+            ttl_policy: Callable (secret_id, version) -> TTL seconds (optional,
+                defaults to VersionAwareTTLPolicy(alias_ttl=cache_ttl))
+            endpoint: Secret Manager emulator host:port (optional)
+            log_hits: Print a line for every cache hit (disable on hot paths
+                and in benchmarks)
+            retry_policy: Retries and time budget per fetch (optional)
+            circuit_breaker: Fail fast while Secret Manager keeps failing;
+                with max_staleness, cached values are served meanwhile
         """
-        super().__init__(project_id)
-        self.cache = SecretCache(cache_ttl)
+        super().__init__(project_id, endpoint, retry_policy, circuit_breaker)
+        self.cache = SecretCache(
+            cache_ttl, max_entries=cache_max_entries, stale_seconds=max_staleness
+        )
+        self.ttl_policy = ttl_policy or VersionAwareTTLPolicy(alias_ttl=cache_ttl)
+        self.refresh_ahead = refresh_ahead
+        self.max_staleness = max_staleness
+        self.log_hits = log_hits
+        self._inflight = SingleFlight()
+        self._async_inflight = AsyncSingleFlight()
+
+        self._refresh_workers = refresh_workers
+        self._refresh_executor: Optional[ThreadPoolExecutor] = None
+        self._refreshing: Set[str] = set()
+        self._refresh_lock = threading.Lock()
+
+        # Counters for the stale-while-revalidate path, updated from request
+        # and refresh threads under _refresh_lock
+        self.background_refreshes = 0
+        self.refresh_failures = 0
+        self.stale_served = 0
+
+    def _fetch_and_cache(
+        self,
+        secret_id: str,
+        version: str,
+        cache_key: str,
+        force: bool = False
+    ) -> str:
+        """Fetch from Secret Manager and cache; runs once per in-flight key."""
+        # A caller that finished just before we became leader may have filled it
+        if not force:
+            cached_value = self.cache.peek(cache_key)
+            if cached_value is not None:
+                return cached_value
+
+        value = super().access_secret_version(secret_id, version)
+        self.cache.set(cache_key, value, ttl=self.ttl_policy(secret_id, version))
+        return value
+
+    def _schedule_refresh(self, secret_id: str, version: str, cache_key: str) -> None:
+        """Refresh an entry in the background unless a refresh is already queued."""
+        with self._refresh_lock:
+            if cache_key in self._refreshing:
+                return
+            self._refreshing.add(cache_key)
+            if self._refresh_executor is None:
+                self._refresh_executor = ThreadPoolExecutor(
+                    max_workers=self._refresh_workers,
+                    thread_name_prefix="secret-refresh"
+                )
+            self._refresh_executor.submit(self._refresh, secret_id, version, cache_key)
+
+    def _refresh(self, secret_id: str, version: str, cache_key: str) -> None:
+        """Background worker: re-fetch one entry, keeping the old value on failure."""
+        try:
+            self._inflight.do(
+                cache_key,
+                lambda: self._fetch_and_cache(secret_id, version, cache_key, force=True)
+            )
+            with self._refresh_lock:
+                self.background_refreshes += 1
+            get_instrumentation().add("secretmanager.background_refreshes", 1, {"outcome": "ok"})
+        except Exception as e:
+            with self._refresh_lock:
+                self.refresh_failures += 1
+            get_instrumentation().add("secretmanager.background_refreshes", 1, {"outcome": "error"})
+            print(f"⚠ Background refresh of {cache_key} failed: {e}", file=sys.stderr)
+        finally:
+            with self._refresh_lock:
+                self._refreshing.discard(cache_key)
+
+    def _serve_stale(self, cache_key: str, error: Exception) -> str:
+        """Return the last good value after a transient failure, or re-raise."""
+        stale = self.cache.get_stale(cache_key)
+        if stale is None:
+            raise error
+
+        value, overdue = stale
+        with self._refresh_lock:
+            self.stale_served += 1
+        get_instrumentation().add("secretmanager.stale_served", 1, {"error": type(error).__name__})
+        print(f"⚠ Secret Manager unavailable ({type(error).__name__}); serving "
+              f"{cache_key} {max(overdue, 0):.0f}s past expiry", file=sys.stderr)
+        return value
+
+    def close(self) -> None:
+        """Stop the background refresh workers."""
+        with self._refresh_lock:
+            if self._refresh_executor is not None:
+                self._refresh_executor.shutdown(wait=False)
+                self._refresh_executor = None
 
     def access_secret_version(
         self,
@@ -208,23 +885,63 @@ class CachedSecretManagerClient(SecretManagerClient):
         """
         Access secret with caching.
 
-        Note: "latest" version should have shorter TTL than pinned versions.
+        The entry's TTL comes from ttl_policy, so "latest" expires after
+        cache_ttl while pinned versions like "3" stay cached.
         """
         cache_key = f"{secret_id}:{version}"
 
         # Try cache first
-        cached_value = self.cache.get(cache_key)
-        if cached_value:
-            print(f"  [Cache hit: {cache_key}]")
+        found = self.cache.lookup(cache_key)
+        if found is not None:
+            cached_value, remaining = found
+            if self.log_hits:
+                print(f"  [Cache hit: {cache_key}]")
+            if remaining < self.refresh_ahead:
+                self._schedule_refresh(secret_id, version, cache_key)
             return cached_value
 
-        # Cache miss - fetch from Secret Manager
-        value = super().access_secret_version(secret_id, version)
+        # Cache miss - fetch from Secret Manager (once for all concurrent callers)
+        try:
+            return self._inflight.do(
+                cache_key,
+                lambda: self._fetch_and_cache(secret_id, version, cache_key)
+            )
+        except transient_errors() as e:
+            return self._serve_stale(cache_key, e)
 
-        # Store in cache
-        self.cache.set(cache_key, value)
+    async def access_secret_version_async(
+        self,
+        secret_id: str,
+        version: str = "latest"
+    ) -> str:
+        """
+        Access secret with caching from asyncio code.
 
-        return value
+        Concurrent misses on the event loop are coalesced into one fetch, which
+        runs in the default executor so the loop is not blocked. Services
+        that are async end to end should use AsyncCachedSecretManagerClient
+        (async_secret_manager.py), which doesn't need the executor at all.
+        """
+        cache_key = f"{secret_id}:{version}"
+
+        found = self.cache.lookup(cache_key)
+        if found is not None:
+            cached_value, remaining = found
+            if remaining < self.refresh_ahead:
+                self._schedule_refresh(secret_id, version, cache_key)
+            return cached_value
+
+        def fetch() -> str:
+            # Also coalesces with synchronous callers on other threads
+            return self._inflight.do(
+                cache_key,
+                lambda: self._fetch_and_cache(secret_id, version, cache_key)
+            )
+
+        try:
+            return await self._async_inflight.do(cache_key, lambda: asyncio.to_thread(fetch))
+        except transient_errors() as e:
+            return self._serve_stale(cache_key, e)
 
 
 def parse_json_secret(secret_payload: str) -> Dict[str, Any]:
@@ -351,14 +1068,35 @@ def example_specific_version(client: SecretManagerClient) -> None:
         print(f"✗ Error: {e}")
 
 
-def example_caching(project_id: str) -> None:
+def example_batch_access(client: SecretManagerClient) -> None:
+    """Example: Fetch several secrets concurrently at startup."""
+    print("\n" + "─" * 60)
+    print("Example 6: Batch Access")
+    print("─" * 60)
+
+    started = time.perf_counter()
+    values, errors = client.access_many([
+        "demo-app-sa-key",
+        "demo-app-api-key",
+        "demo-app-db-url",
+    ])
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    print(f"✓ Retrieved {len(values)} secret(s) in {elapsed_ms:.0f} ms")
+    for key in values:
+        print(f"  - {key}")
+    for key, error in errors.items():
+        print(f"✗ {key}: {error}")
+
+
+def example_caching(project_id: str, endpoint: Optional[str] = None) -> None:
     """Example: Using cached client for better performance."""
     print("\n" + "─" * 60)
     print("Example 5: Caching for Performance")
     print("─" * 60)
 
     try:
-        client = CachedSecretManagerClient(project_id, cache_ttl=60)
+        client = CachedSecretManagerClient(project_id, cache_ttl=60, endpoint=endpoint)
 
         print("First access (cache miss):")
         secret1 = client.access_secret_version("demo-app-api-key")
@@ -369,12 +1107,51 @@ def example_caching(project_id: str) -> None:
         print(f"  Retrieved: {secret2[:8]}...")
 
         print("\n✓ Caching improves performance for frequently accessed secrets")
-        print("  ℹ Cache TTL: 60 seconds")
+        print("  ℹ Cache TTL: 60 seconds for \"latest\", pinned versions stay cached")
+        print(f"  ℹ Cache stats: {client.cache.stats()}")
 
     except Exception as e:
         print(f"✗ Error: {e}")
 
 
+def audit_project(
+    client: SecretManagerClient,
+    filter_expr: Optional[str] = None,
+    page_size: Optional[int] = None
+) -> None:
+    """
+    Print every secret with its version counts.
+
+    Secrets are streamed page by page and their version lists fetched
+    concurrently, with field masks so only names and states are transferred.
+    """
+    started = time.perf_counter()
+    secret_ids = [
+        secret.name.split('/')[-1]
+        for secret in client.iter_secrets(page_size, filter_expr, fields=["name"])
+    ]
+    versions, errors = client.list_versions_many(
+        secret_ids, page_size=page_size, fields=["name", "state"]
+    )
+    elapsed = time.perf_counter() - started
+
+    print(f"\nAudit of project '{client.project_id}':")
+    print("─" * 60)
+    print(f"{'Secret':<36} {'Versions':>8} {'Enabled':>8} {'Latest':>6}")
+    print("─" * 60)
+
+    for secret_id in secret_ids:
+        if secret_id in errors:
+            print(f"✗ {secret_id}: {errors[secret_id]}", file=sys.stderr)
+            continue
+        secret_versions = versions[secret_id]
+        enabled = sum(1 for version in secret_versions if version.state.name == "ENABLED")
+        latest = secret_versions[0].name.split('/')[-1] if secret_versions else "-"
+        print(f"{secret_id:<36} {len(secret_versions):>8} {enabled:>8} {latest:>6}")
+
+    print(f"\n✓ Audited {len(secret_ids)} secret(s) in {elapsed:.2f}s")
+
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -389,6 +1166,10 @@ def main():
         "--secret",
         help="Specific secret to access"
     )
+    parser.add_argument(
+        "--secrets",
+        help="Comma-separated secrets to fetch concurrently (SECRET or SECRET:VERSION)"
+    )
     parser.add_argument(
         "--version",
         default="latest",
@@ -403,6 +1184,24 @@ def main():
         "--list-versions",
         help="List versions of a specific secret"
     )
+    parser.add_argument(
+        "--audit",
+        action="store_true",
+        help="Count the versions of every secret, listing them concurrently"
+    )
+    parser.add_argument(
+        "--filter",
+        help="Server-side filter for --list/--list-versions/--audit, e.g. labels.env=prod"
+    )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        help="Items per list page (default: server default)"
+    )
+    parser.add_argument(
+        "--endpoint",
+        help=f"Secret Manager emulator host:port (default: ${EMULATOR_HOST_ENV})"
+    )
 
     args = parser.parse_args()
 
@@ -412,17 +1211,35 @@ def main():
     print(f"Project: {args.project}")
 
     try:
-        client = SecretManagerClient(args.project)
+        client = SecretManagerClient(args.project, args.endpoint)
 
         if args.list:
-            client.list_secrets()
+            client.list_secrets(args.filter)
             return
 
         if args.list_versions:
-            client.list_secret_versions(args.list_versions)
+            client.list_secret_versions(args.list_versions, args.filter)
+            return
+
+        if args.audit:
+            audit_project(client, args.filter, args.page_size)
             return
 
-        if args.secret:
+        if args.secrets:
+            # Access several secrets in one concurrent batch
+            refs = [ref.strip() for ref in args.secrets.split(",") if ref.strip()]
+            print(f"\nAccessing {len(refs)} secret(s) concurrently...")
+            values, errors = client.access_many(refs)
+
+            for key, value in values.items():
+                print(f"✓ {key}: {len(value)} characters")
+            for key, error in errors.items():
+                print(f"✗ {key}: {error}", file=sys.stderr)
+
+            if errors:
+                sys.exit(1)
+
+        elif args.secret:
             # Access specific secret
             print(f"\nAccessing secret '{args.secret}' version '{args.version}'...")
             payload = client.access_secret_version(args.secret, args.version)
@@ -442,7 +1259,8 @@ def main():
             example_api_key(client)
             example_database_url(client)
             example_specific_version(client)
-            example_caching(args.project)
+            example_caching(args.project, args.endpoint)
+            example_batch_access(client)
 
         print("\n" + "=" * 60)
         print("Examples complete!")
@@ -19,15 +19,31 @@ Local testing:
 import json
 import os
 import sys
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Any
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, TextIO, Tuple
 
-from google.cloud import storage
-from google.cloud import secretmanager
+import _shared  # noqa: F401  (puts the shared helpers on sys.path)
+from gcs_client_pool import get_storage_client
+from instrumentation import get_instrumentation
+
+# Only for type hints: the client library is loaded by gcs_client_pool when a
+# client is first built, so reading secret files never imports it
+if TYPE_CHECKING:
+    from google.cloud import storage
 
 
 class SecretFileReader:
-    """Helper class for reading secrets from mounted files."""
+    """
+    Helper class for reading secrets from mounted files.
+
+    Parsed values are memoized per file and reused while the file's inode,
+    mtime and size are unchanged, so a repeated read costs one stat() call.
+    The CSI driver replaces files on rotation (new inode), which always
+    invalidates the cached value. Returned objects are shared between
+    callers; treat them as read-only.
+    """
 
     def __init__(self, secrets_dir: str = "/var/secrets"):
         """
@@ -38,6 +54,76 @@ class SecretFileReader:
         """
         self.secrets_dir = Path(secrets_dir)
 
+        # (path, kind) -> ((inode, mtime_ns, size), parsed value)
+        self._parsed: Dict[Tuple[str, str], Tuple[Tuple[int, int, int], Any]] = {}
+        self._parsed_lock = threading.Lock()
+        self.stat_hits = 0
+        self.parses = 0
+
+    def _read_cached(
+        self,
+        filename: str,
+        kind: str,
+        parse: Callable[[Path, TextIO], Any],
+        hint: str
+    ) -> Any:
+        """
+        Return the parsed file, re-reading it only if its stat() changed.
+
+        Args:
+            filename: Name of secret file
+            kind: Parser name, part of the cache key
+            parse: Function (path, open file) -> parsed value
+            hint: Troubleshooting hint appended to FileNotFoundError
+        """
+        secret_path = self.secrets_dir / filename
+
+        try:
+            st = os.stat(secret_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Secret file not found: {secret_path}\n{hint}") from None
+
+        signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+        key = (str(secret_path), kind)
+        hooks = get_instrumentation()
+
+        with self._parsed_lock:
+            cached = self._parsed.get(key)
+            if cached is not None and cached[0] == signature:
+                self.stat_hits += 1
+                if hooks.enabled:
+                    hooks.add("secret_file.reads", 1, {"kind": kind, "result": "stat_hit"})
+                return cached[1]
+
+        # Keyed by the signature seen *before* reading: if the file changes
+        # mid-read, the next stat() differs and the value is parsed again
+        with hooks.span("secret_file.parse", {"file.path": str(secret_path)}, {"kind": kind}):
+            with open(secret_path, 'r') as f:
+                value = parse(secret_path, f)
+        if hooks.enabled:
+            hooks.add("secret_file.reads", 1, {"kind": kind, "result": "parsed"})
+            hooks.add("secret_file.bytes", st.st_size, {"kind": kind})
+
+        with self._parsed_lock:
+            self._parsed[key] = (signature, value)
+            self.parses += 1
+        return value
+
+    @staticmethod
+    def _parse_json(secret_path: Path, f: TextIO) -> Dict[str, Any]:
+        try:
+            return json.load(f)
+        except json.JSONDecodeError as e:
+            raise json.JSONDecodeError(
+                f"Invalid JSON in secret file {secret_path}: {e.msg}",
+                e.doc,
+                e.pos
+            )
+
+    @staticmethod
+    def _parse_text(secret_path: Path, f: TextIO) -> str:
+        return f.read().strip()
+
     def read_json_secret(self, filename: str) -> Dict[str, Any]:
         """
         Read and parse JSON secret file.
@@ -52,23 +138,10 @@ class SecretFileReader:
             FileNotFoundError: If secret file doesn't exist
             json.JSONDecodeError: If file is not valid JSON
         """
-        secret_path = self.secrets_dir / filename
-
-        if not secret_path.exists():
-            raise FileNotFoundError(
-                f"Secret file not found: {secret_path}\n"
-                f"Verify SecretProviderClass is configured correctly and pod has mounted the volume."
-            )
-
-        with open(secret_path, 'r') as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError as e:
-                raise json.JSONDecodeError(
-                    f"Invalid JSON in secret file {secret_path}: {e.msg}",
-                    e.doc,
-                    e.pos
-                )
+        return self._read_cached(
+            filename, "json", self._parse_json,
+            "Verify SecretProviderClass is configured correctly and pod has mounted the volume."
+        )
 
     def read_text_secret(self, filename: str) -> str:
         """
@@ -83,16 +156,21 @@ class SecretFileReader:
         Raises:
             FileNotFoundError: If secret file doesn't exist
         """
-        secret_path = self.secrets_dir / filename
-
-        if not secret_path.exists():
-            raise FileNotFoundError(
-                f"Secret file not found: {secret_path}\n"
-                f"Verify SecretProviderClass is configured correctly."
-            )
-
-        with open(secret_path, 'r') as f:
-            return f.read().strip()
+        return self._read_cached(
+            filename, "text", self._parse_text,
+            "Verify SecretProviderClass is configured correctly."
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Parse cache statistics: stat hits, parses and hit ratio."""
+        with self._parsed_lock:
+            reads = self.stat_hits + self.parses
+            return {
+                "entries": len(self._parsed),
+                "stat_hits": self.stat_hits,
+                "parses": self.parses,
+                "hit_ratio": self.stat_hits / reads if reads else 0.0,
+            }
 
     def validate_service_account_key(self, key_data: Dict[str, Any]) -> None:
         """
@@ -129,17 +207,21 @@ class SecretFileReader:
 class StorageClientExample:
     """Example application using Cloud Storage with mounted credentials."""
 
-    def __init__(self, secrets_dir: str = "/var/secrets"):
+    def __init__(self, secrets_dir: str = "/var/secrets", reload_on_rotation: bool = True):
         """
         Initialize storage client.
 
         Args:
             secrets_dir: Directory where secrets are mounted
+            reload_on_rotation: Follow rotations of the mounted key without a
+                restart (default: True); if False, use the shared pooled client
         """
         self.secret_reader = SecretFileReader(secrets_dir)
+        self.reload_on_rotation = reload_on_rotation
         self.storage_client = None
+        self.credential_manager = None
 
-    def initialize_client(self) -> storage.Client:
+    def initialize_client(self) -> "storage.Client":
         """
         Initialize Cloud Storage client using mounted service account key.
 
@@ -162,16 +244,12 @@ class StorageClientExample:
                 "In Kubernetes deployment, set this to point to mounted secret file."
             )
 
-        # Validate file exists
-        if not os.path.exists(credentials_path):
-            raise FileNotFoundError(
-                f"Credentials file not found: {credentials_path}\n"
-                "Verify the CSI driver volume is mounted correctly."
-            )
+        # Like the client libraries, resolve a relative path against the
+        # working directory, not secrets_dir (an absolute path overrides it)
+        credentials_path = os.path.abspath(credentials_path)
 
         # Load and validate key structure
-        with open(credentials_path, 'r') as f:
-            key_data = json.load(f)
+        key_data = self.secret_reader.read_json_secret(credentials_path)
 
         self.secret_reader.validate_service_account_key(key_data)
 
@@ -179,11 +257,47 @@ class StorageClientExample:
         print(f"✓ Service Account: {key_data['client_email']}")
         print(f"✓ Project: {key_data['project_id']}")
 
-        # Initialize client (automatically uses GOOGLE_APPLICATION_CREDENTIALS)
-        self.storage_client = storage.Client()
+        # Stop the watcher and threads of a previous initialization
+        self.close()
+
+        if self.reload_on_rotation:
+            # Imported here: credential_manager itself builds on this module
+            from credential_manager import RotatingStorageClient
+
+            # Rebuilds and swaps the client in the background after a rotation
+            self.credential_manager = RotatingStorageClient(credentials_path)
+            self.credential_manager.on_swap(self._on_client_swapped)
+            self.storage_client = self.credential_manager.client
+            print(f"✓ Watching credentials for rotation ({self.credential_manager.stats()['watch_mode']})")
+        else:
+            # Get the process-wide client for this key file, so every
+            # StorageClientExample (and any other caller) shares warm connections
+            self.storage_client = get_storage_client(credentials_path)
 
         return self.storage_client
 
+    def _on_client_swapped(self, client: "storage.Client") -> None:
+        self.storage_client = client
+
+    def close(self) -> None:
+        """Stop following key rotations and close the rotating client's connections."""
+        if self.credential_manager is not None:
+            self.credential_manager.close()
+            self.credential_manager = None
+        self.storage_client = None
+
+    @contextmanager
+    def _client(self) -> Iterator["storage.Client"]:
+        """Client for one operation; pinned across a concurrent key rotation."""
+        if not self.storage_client:
+            self.initialize_client()
+
+        if self.credential_manager is not None:
+            with self.credential_manager.lease() as client:
+                yield client
+        else:
+            yield self.storage_client
+
     def upload_file(
         self,
         bucket_name: str,
@@ -202,24 +316,20 @@ class StorageClientExample:
             google.cloud.exceptions.NotFound: If bucket doesn't exist
             google.cloud.exceptions.Forbidden: If lacking permissions
         """
-        if not self.storage_client:
-            self.initialize_client()
-
-        bucket = self.storage_client.bucket(bucket_name)
-        blob = bucket.blob(destination_blob)
+        with self._client() as client:
+            bucket = client.bucket(bucket_name)
+            blob = bucket.blob(destination_blob)
 
-        print(f"Uploading {source_file} to gs://{bucket_name}/{destination_blob}...")
-        blob.upload_from_filename(source_file)
+            print(f"Uploading {source_file} to gs://{bucket_name}/{destination_blob}...")
+            blob.upload_from_filename(source_file)
         print(f"✓ Upload complete")
 
     def list_buckets(self) -> None:
         """List all buckets in the project."""
-        if not self.storage_client:
-            self.initialize_client()
-
         print("\nBuckets in project:")
-        for bucket in self.storage_client.list_buckets():
-            print(f"  - {bucket.name}")
+        with self._client() as client:
+            for bucket in client.list_buckets():
+                print(f"  - {bucket.name}")
 
 
 class APIKeyExample:
@@ -327,13 +437,15 @@ def main():
     print("Example 1: Cloud Storage Access with Service Account Key")
     print("─" * 60)
 
+    storage_example = StorageClientExample(secrets_dir)
     try:
-        storage_example = StorageClientExample(secrets_dir)
         storage_example.initialize_client()
         # Uncomment to list buckets (requires Storage Viewer permission)
         # storage_example.list_buckets()
     except Exception as e:
         print(f"✗ Error: {e}")
+    finally:
+        storage_example.close()
 
     # Example 2: API Key
     print("\n" + "─" * 60)
@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Secret Manager gRPC API, for offline tests and benchmarks.
+
+Serves google.cloud.secretmanager.v1.SecretManagerService on localhost from an
+in-memory store, using the client library's own request/response messages, so
+SecretManagerClient and CachedSecretManagerClient work against it unchanged:
+
+    • AccessSecretVersion ("latest" = newest enabled version; disabled
+      versions fail with FAILED_PRECONDITION like the real service)
+    • GetSecret, ListSecrets, ListSecretVersions (with paging, a subset of the
+      filter syntax, and x-goog-fieldmask response field masks)
+    • CreateSecret, AddSecretVersion (so it can be seeded with the real client)
+
+Every call first goes through a FaultInjector, so latency, random UNAVAILABLE
+errors and RESOURCE_EXHAUSTED quota throttling can be dialed in (see
+fault_injection.py). Note that the client library retries UNAVAILABLE and
+RESOURCE_EXHAUSTED by default, as it would against the real service.
+
+Usage:
+    python secret_manager_emulator.py --port 9024 --secret demo-app-api-key=abc123 \\
+        --latency-ms 15 --error-rate 0.01 --rate-limit 500
+    export SECRET_MANAGER_EMULATOR_HOST=localhost:9024
+    python read_secret_direct.py --secret demo-app-api-key
+
+    # Or in-process, e.g. from a benchmark
+    with SecretManagerEmulator() as emulator:
+        emulator.add_secret_version("my-project", "api-key", b"abc123")
+        client = SecretManagerClient("my-project", endpoint=emulator.endpoint)
+"""
+
+import argparse
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import grpc
+from google.cloud import secretmanager
+
+import _shared  # noqa: F401  (puts the shared helpers on sys.path)
+from fault_injection import (
+    THROTTLED,
+    FaultInjector,
+    add_fault_arguments,
+    fault_injector_from_args,
+)
+
+try:
+    import google_crc32c
+except ImportError:  # Optional: payload checksums are omitted without it
+    google_crc32c = None
+
+
+SERVICE_NAME = "google.cloud.secretmanager.v1.SecretManagerService"
+
+DEFAULT_PORT = 9024
+DEFAULT_PROJECT = "my-project-dev"
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_MAX_WORKERS = 32
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@dataclass
+class StoredVersion:
+    """One secret version held in memory."""
+
+    number: int
+    payload: bytes
+    enabled: bool = True
+    created: datetime = field(default_factory=_now)
+
+
+@dataclass
+class StoredSecret:
+    """A secret and its versions (version N is versions[N - 1])."""
+
+    labels: Dict[str, str] = field(default_factory=dict)
+    versions: List[StoredVersion] = field(default_factory=list)
+    created: datetime = field(default_factory=_now)
+
+
+# One filter term: [NOT |-]field(:|=)value
+_FILTER_TERM = re.compile(r"^(NOT\s+|-)?([\w.]+)([:=])(.+)$")
+_FIELD_MASK = re.compile(r"(\w+)\(([^)]*)\)")
+
+
+def _matches(filter_expr: str, attributes: Dict[str, str]) -> bool:
+    """
+    Evaluate a list filter against an item's attributes.
+
+    Supports the common subset of the real syntax: whitespace-separated terms
+    (all must match; "AND" is optional), "field:value" substring matches
+    (case-insensitive, "field:*" tests presence), "field=value" equality,
+    and negation with a "NOT " or "-" prefix. Fields are "name",
+    "labels.KEY" and (for versions) "state".
+    """
+    terms = re.findall(r'(?:NOT\s+)?\S+', filter_expr)
+    for term in terms:
+        if term == "AND":
+            continue
+        match = _FILTER_TERM.match(term)
+        if match is None:
+            raise ValueError(f"Unsupported filter term '{term}' in '{filter_expr}'")
+
+        negation, key, operator, expected = match.groups()
+        expected = expected.strip('"')
+        actual = attributes.get(key)
+        if operator == "=":
+            matched = actual == expected
+        elif expected == "*":
+            matched = actual is not None
+        else:
+            matched = actual is not None and expected.lower() in actual.lower()
+
+        if matched == bool(negation):
+            return False
+    return True
+
+
+def _mask(items: List[Any], context: grpc.ServicerContext, collection: str) -> List[Any]:
+    """Keep only the item fields named in an x-goog-fieldmask header."""
+    header = dict(context.invocation_metadata()).get("x-goog-fieldmask")
+    if not header:
+        return items
+    for repeated, fields in _FIELD_MASK.findall(header):
+        if repeated == collection:
+            names = [name.strip() for name in fields.split(",") if name.strip()]
+            return [type(item)(**{name: getattr(item, name) for name in names}) for item in items]
+    return items
+
+
+def _parse_name(name: str, kind: str) -> List[str]:
+    """Split "projects/P/secrets/S[/versions/V]" into its IDs."""
+    parts = name.split("/")
+    expected = {"project": ["projects"], "secret": ["projects", "secrets"],
+                "version": ["projects", "secrets", "versions"]}[kind]
+    if len(parts) != 2 * len(expected) or parts[0::2] != expected:
+        raise ValueError(f"Invalid {kind} resource name: '{name}'")
+    return parts[1::2]
+
+
+class SecretManagerEmulator:
+    """In-process Secret Manager gRPC server."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        faults: Optional[FaultInjector] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS
+    ):
+        """
+        Initialize emulator (call start() or use it as a context manager).
+
+        Args:
+            host: Interface to listen on
+            port: TCP port (0 picks a free port)
+            faults: Latency/error/throttling injection (optional)
+            max_workers: Threads serving RPCs concurrently
+        """
+        self.faults = faults or FaultInjector()
+        self.calls: Dict[str, int] = {}
+        self._secrets: Dict[str, StoredSecret] = {}
+        self._lock = threading.Lock()
+
+        rpcs = {
+            "AccessSecretVersion": (self._access_secret_version,
+                                    secretmanager.AccessSecretVersionRequest,
+                                    secretmanager.AccessSecretVersionResponse),
+            "GetSecret": (self._get_secret, secretmanager.GetSecretRequest, secretmanager.Secret),
+            "ListSecrets": (self._list_secrets, secretmanager.ListSecretsRequest,
+                            secretmanager.ListSecretsResponse),
+            "ListSecretVersions": (self._list_secret_versions,
+                                   secretmanager.ListSecretVersionsRequest,
+                                   secretmanager.ListSecretVersionsResponse),
+            "CreateSecret": (self._create_secret, secretmanager.CreateSecretRequest,
+                             secretmanager.Secret),
+            "AddSecretVersion": (self._add_secret_version, secretmanager.AddSecretVersionRequest,
+                                 secretmanager.SecretVersion),
+        }
+        handlers = {
+            method: grpc.unary_unary_rpc_method_handler(
+                self._rpc(method, fn),
+                request_deserializer=request_type.deserialize,
+                response_serializer=response_type.serialize,
+            )
+            for method, (fn, request_type, response_type) in rpcs.items()
+        }
+
+        self._server = grpc.server(ThreadPoolExecutor(max_workers=max_workers))
+        self._server.add_generic_rpc_handlers(
+            (grpc.method_handlers_generic_handler(SERVICE_NAME, handlers),)
+        )
+        self.port = self._server.add_insecure_port(f"{host}:{port}")
+        self.host = host
+
+    @property
+    def endpoint(self) -> str:
+        """host:port to pass as endpoint / SECRET_MANAGER_EMULATOR_HOST."""
+        return f"{self.host}:{self.port}"
+
+    def start(self) -> "SecretManagerEmulator":
+        """Start serving on background threads."""
+        self._server.start()
+        return self
+
+    def stop(self, grace: Optional[float] = None) -> None:
+        """Stop serving."""
+        self._server.stop(grace).wait()
+
+    def __enter__(self) -> "SecretManagerEmulator":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    # Seeding and inspection
+
+    def add_secret_version(
+        self,
+        project_id: str,
+        secret_id: str,
+        payload: bytes,
+        labels: Optional[Dict[str, str]] = None
+    ) -> int:
+        """
+        Store a new version, creating the secret if needed.
+
+        Returns:
+            The new version number
+        """
+        name = f"projects/{project_id}/secrets/{secret_id}"
+        with self._lock:
+            secret = self._secrets.setdefault(name, StoredSecret())
+            if labels:
+                secret.labels.update(labels)
+            number = len(secret.versions) + 1
+            secret.versions.append(StoredVersion(number, bytes(payload)))
+            return number
+
+    def set_version_enabled(self, project_id: str, secret_id: str, version: int, enabled: bool) -> None:
+        """Enable or disable a stored version."""
+        with self._lock:
+            secret = self._secrets[f"projects/{project_id}/secrets/{secret_id}"]
+            secret.versions[version - 1].enabled = enabled
+
+    # RPC plumbing
+
+    def _rpc(self, method: str, fn: Callable[[Any, grpc.ServicerContext], Any]):
+        def handler(request, context: grpc.ServicerContext):
+            with self._lock:
+                self.calls[method] = self.calls.get(method, 0) + 1
+
+            fault = self.faults.inject()
+            if fault == THROTTLED:
+                context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED,
+                              f"Quota exceeded for {method} requests (injected)")
+            if fault is not None:
+                context.abort(grpc.StatusCode.UNAVAILABLE, "Service unavailable (injected)")
+
+            try:
+                return fn(request, context)
+            except ValueError as e:
+                context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+
+        return handler
+
+    def _secret(self, name: str, context: grpc.ServicerContext) -> StoredSecret:
+        _parse_name(name, "secret")
+        secret = self._secrets.get(name)
+        if secret is None:
+            context.abort(grpc.StatusCode.NOT_FOUND, f"Secret [{name}] not found.")
+        return secret
+
+    def _secret_message(self, name: str, secret: StoredSecret):
+        return secretmanager.Secret(
+            name=name,
+            labels=secret.labels,
+            create_time=secret.created,
+            replication=secretmanager.Replication(automatic=secretmanager.Replication.Automatic()),
+        )
+
+    def _version_message(self, secret_name: str, version: StoredVersion):
+        state = secretmanager.SecretVersion.State
+        return secretmanager.SecretVersion(
+            name=f"{secret_name}/versions/{version.number}",
+            create_time=version.created,
+            state=state.ENABLED if version.enabled else state.DISABLED,
+        )
+
+    @staticmethod
+    def _attributes(name: str, labels: Dict[str, str], state: Optional[str] = None) -> Dict[str, str]:
+        """Filterable fields of a secret or version."""
+        attributes = {"name": name}
+        attributes.update({f"labels.{key}": value for key, value in labels.items()})
+        if state is not None:
+            attributes["state"] = state
+        return attributes
+
+    @staticmethod
+    def _page(items: List[Any], page_size: int, page_token: str):
+        start = int(page_token) if page_token else 0
+        end = start + (page_size or DEFAULT_PAGE_SIZE)
+        return items[start:end], (str(end) if end < len(items) else "")
+
+    # RPCs
+
+    def _access_secret_version(self, request, context):
+        project, secret_id, version_id = _parse_name(request.name, "version")
+        secret_name = f"projects/{project}/secrets/{secret_id}"
+
+        with self._lock:
+            secret = self._secret(secret_name, context)
+            if version_id == "latest":
+                enabled = [version for version in secret.versions if version.enabled]
+                version = enabled[-1] if enabled else None
+            elif version_id.isdigit() and 1 <= int(version_id) <= len(secret.versions):
+                version = secret.versions[int(version_id) - 1]
+            else:
+                version = None
+
+        if version is None:
+            context.abort(grpc.StatusCode.NOT_FOUND, f"Secret Version [{request.name}] not found.")
+        if not version.enabled:
+            context.abort(grpc.StatusCode.FAILED_PRECONDITION,
+                          f"Secret Version [{request.name}] is in DISABLED state.")
+
+        payload = secretmanager.SecretPayload(data=version.payload)
+        if google_crc32c is not None:
+            payload.data_crc32c = google_crc32c.value(version.payload)
+
+        return secretmanager.AccessSecretVersionResponse(
+            name=f"{secret_name}/versions/{version.number}",
+            payload=payload,
+        )
+
+    def _get_secret(self, request, context):
+        with self._lock:
+            return self._secret_message(request.name, self._secret(request.name, context))
+
+    def _list_secrets(self, request, context):
+        _parse_name(request.parent, "project")
+        prefix = f"{request.parent}/secrets/"
+
+        with self._lock:
+            secrets = [
+                self._secret_message(name, secret)
+                for name, secret in sorted(self._secrets.items())
+                if name.startswith(prefix) and (
+                    not request.filter or _matches(request.filter, self._attributes(name, secret.labels))
+                )
+            ]
+
+        page, next_token = self._page(secrets, request.page_size, request.page_token)
+        return secretmanager.ListSecretsResponse(
+            secrets=_mask(page, context, "secrets"), next_page_token=next_token, total_size=len(secrets)
+        )
+
+    def _list_secret_versions(self, request, context):
+        with self._lock:
+            secret = self._secret(request.parent, context)
+            # Newest first, like the real service
+            versions = [
+                self._version_message(request.parent, version)
+                for version in reversed(secret.versions)
+            ]
+
+        if request.filter:
+            versions = [
+                version for version in versions
+                if _matches(request.filter, self._attributes(version.name, {}, version.state.name))
+            ]
+
+        page, next_token = self._page(versions, request.page_size, request.page_token)
+        return secretmanager.ListSecretVersionsResponse(
+            versions=_mask(page, context, "versions"), next_page_token=next_token, total_size=len(versions)
+        )
+
+    def _create_secret(self, request, context):
+        project_id = _parse_name(request.parent, "project")[0]
+        name = f"projects/{project_id}/secrets/{request.secret_id}"
+
+        with self._lock:
+            if name in self._secrets:
+                context.abort(grpc.StatusCode.ALREADY_EXISTS, f"Secret [{name}] already exists.")
+            secret = self._secrets[name] = StoredSecret(labels=dict(request.secret.labels))
+            return self._secret_message(name, secret)
+
+    def _add_secret_version(self, request, context):
+        with self._lock:
+            secret = self._secret(request.parent, context)
+            version = StoredVersion(len(secret.versions) + 1, request.payload.data)
+            secret.versions.append(version)
+            return self._version_message(request.parent, version)
+
+
+def main():
+    """Run the emulator in the foreground."""
+    parser = argparse.ArgumentParser(description="Local Secret Manager gRPC emulator")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT,
+                        help=f"Port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument("--project", default=DEFAULT_PROJECT,
+                        help=f"Project for --secret/--secret-file (default: {DEFAULT_PROJECT})")
+    parser.add_argument("--secret", action="append", default=[], metavar="NAME=VALUE",
+                        help="Seed a secret version (repeatable)")
+    parser.add_argument("--secret-file", action="append", default=[], metavar="NAME=PATH",
+                        help="Seed a secret version from a file (repeatable)")
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    emulator = SecretManagerEmulator(args.host, args.port, fault_injector_from_args(args))
+
+    try:
+        for spec in args.secret:
+            name, _, value = spec.partition("=")
+            emulator.add_secret_version(args.project, name, value.encode("utf-8"))
+        for spec in args.secret_file:
+            name, _, path = spec.partition("=")
+            with open(path, "rb") as f:
+                emulator.add_secret_version(args.project, name, f.read())
+    except OSError as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return 1
+
+    emulator.start()
+    print(f"✓ Secret Manager emulator listening on {emulator.endpoint}")
+    print(f"  export SECRET_MANAGER_EMULATOR_HOST={emulator.endpoint}")
+
+    try:
+        emulator._server.wait_for_termination()
+    except KeyboardInterrupt:
+        print("\n\nInterrupted by user")
+    finally:
+        emulator.stop()
+        print(f"  Calls: {emulator.calls}, faults: {emulator.faults.stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
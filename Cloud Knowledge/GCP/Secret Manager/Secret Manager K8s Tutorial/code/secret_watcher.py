@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Change-driven hot reload for secrets mounted by the CSI driver.
+
+SecretFileReader re-opens and re-parses a secret file on every call, and an
+application has no way to notice that the CSI driver rotated a file under
+/var/secrets short of restarting the pod. WatchingSecretFileReader keeps the
+parsed value in memory and only drops it when the file actually changes:
+
+    • Linux: inotify on the secrets directory (no polling, no per-read I/O)
+    • Elsewhere, or if inotify is unavailable: stat() every `poll_interval`
+
+Registered callbacks fire after a rotation so the app can rebuild clients
+with the new credentials.
+
+How rotations look on disk: the CSI driver (like Kubernetes secret volumes)
+writes each version into a hidden timestamped directory and atomically swaps
+a `..data` symlink, so `credentials.json -> ..data/credentials.json` changes
+all at once. A rename of `..data` therefore means "every file may have
+changed"; files written in place produce events with their own name.
+
+Usage:
+    reader = WatchingSecretFileReader("/var/secrets")
+    reader.on_rotation(lambda filename: print(f"{filename} rotated"))
+    key_data = reader.read_json_secret("credentials.json")  # cached until rotated
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import _shared  # noqa: F401  (puts the shared helpers on sys.path)
+from instrumentation import get_instrumentation
+from read_secret_from_file import SecretFileReader
+
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+)
+
+# Events that mean the watched directory itself is gone or must be rescanned
+RESCAN_MASK = IN_Q_OVERFLOW | IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+DEFAULT_POLL_INTERVAL = 10.0
+
+# How long the watcher thread blocks before checking for stop()
+_WAKEUP_INTERVAL = 1.0
+
+RotationCallback = Callable[[str], None]
+FileSignature = Optional[Tuple[int, int, int]]
+
+
+class Inotify:
+    """Minimal ctypes binding for Linux inotify."""
+
+    def __init__(self):
+        """
+        Create an inotify instance.
+
+        Raises:
+            OSError: If inotify is not available on this platform
+        """
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or not libc_name:
+            raise OSError("inotify is only available on Linux")
+
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_init1 failed: {os.strerror(errno)}")
+
+    def add_watch(self, path: str, mask: int = WATCH_MASK) -> int:
+        """Watch a path and return the watch descriptor."""
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_add_watch({path}) failed: {os.strerror(errno)}")
+        return wd
+
+    def read_events(self, timeout: float) -> List[Tuple[int, int, str]]:
+        """
+        Wait up to `timeout` seconds and return pending events.
+
+        Returns:
+            List of (watch descriptor, event mask, file name) tuples
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+
+        try:
+            buffer = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _cookie, name_len = _EVENT_HEADER.unpack_from(buffer, offset)
+            offset += _EVENT_HEADER.size
+            name = buffer[offset:offset + name_len].rstrip(b"\0").decode("utf-8", "replace")
+            offset += name_len
+            events.append((wd, mask, name))
+        return events
+
+    def close(self) -> None:
+        """Release the inotify file descriptor."""
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class WatchingSecretFileReader(SecretFileReader):
+    """
+    SecretFileReader that caches parsed secrets until the files change.
+
+    Returned objects are shared between callers; treat them as read-only.
+    """
+
+    def __init__(
+        self,
+        secrets_dir: str = "/var/secrets",
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        use_inotify: bool = True
+    ):
+        """
+        Initialize reader and start watching.
+
+        Args:
+            secrets_dir: Directory where secrets are mounted (default: /var/secrets)
+            poll_interval: Seconds between stat() checks when inotify is unavailable
+            use_inotify: Use inotify when available (default: True)
+        """
+        super().__init__(secrets_dir)
+        self.poll_interval = poll_interval
+
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, str], Any] = {}
+        self._signatures: Dict[str, FileSignature] = {}
+        self._callbacks: List[RotationCallback] = []
+        self._generation = 0
+        self._stop = threading.Event()
+
+        self._inotify: Optional[Inotify] = None
+        if use_inotify:
+            try:
+                self._inotify = Inotify()
+                self._inotify.add_watch(str(self.secrets_dir))
+            except OSError as e:
+                if self._inotify is not None:
+                    self._inotify.close()
+                    self._inotify = None
+                print(f"⚠ inotify unavailable ({e}); polling every {poll_interval}s",
+                      file=sys.stderr)
+
+        self._thread = threading.Thread(
+            target=self._watch, name="secret-file-watcher", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def mode(self) -> str:
+        """'inotify' or 'poll', depending on how changes are detected."""
+        return "inotify" if self._inotify is not None else "poll"
+
+    def on_rotation(self, callback: RotationCallback) -> None:
+        """
+        Register a callback fired with the file name after a secret changes.
+
+        Callbacks run on the watcher thread; keep them short (e.g. schedule a
+        client rebuild) and don't let them raise.
+        """
+        with self._lock:
+            self._callbacks.append(callback)
+
+    def _signature(self, filename: str) -> FileSignature:
+        """Identity of the file's current content: (inode, mtime_ns, size)."""
+        try:
+            # os.stat follows the ..data symlink to the current version
+            st = os.stat(self.secrets_dir / filename)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _cached_read(self, filename: str, kind: str, read: Callable[[str], Any]) -> Any:
+        key = (filename, kind)
+        with self._lock:
+            cached = key in self._values
+            if cached:
+                value = self._values[key]
+            generation = self._generation
+
+        if cached:
+            hooks = get_instrumentation()
+            if hooks.enabled:
+                hooks.add("secret_file.reads", 1, {"kind": kind, "result": "watch_hit"})
+            return value
+
+        signature = self._signature(filename)
+        value = read(filename)
+
+        with self._lock:
+            # Only cache if no change was processed while we were reading
+            if generation == self._generation:
+                self._values[key] = value
+                self._signatures.setdefault(filename, signature)
+        return value
+
+    def read_json_secret(self, filename: str) -> Dict[str, Any]:
+        """Read and parse a JSON secret file, cached until it changes."""
+        return self._cached_read(filename, "json", super().read_json_secret)
+
+    def read_text_secret(self, filename: str) -> str:
+        """Read a text secret file, cached until it changes."""
+        return self._cached_read(filename, "text", super().read_text_secret)
+
+    def _check_files(self, filenames: Set[str]) -> None:
+        """Invalidate tracked files whose signature changed and fire callbacks."""
+        rotated = []
+
+        with self._lock:
+            self._generation += 1
+            for filename in filenames:
+                if filename not in self._signatures:
+                    # Never read, so nothing cached can be stale; _cached_read
+                    # starts tracking a file when it is first read
+                    continue
+                signature = self._signature(filename)
+                if self._signatures[filename] == signature:
+                    continue
+
+                self._signatures[filename] = signature
+                for kind in ("json", "text"):
+                    self._values.pop((filename, kind), None)
+                rotated.append(filename)
+            callbacks = list(self._callbacks)
+
+        if rotated:
+            get_instrumentation().add("secret_file.rotations", len(rotated), {"mode": self.mode})
+
+        for filename in rotated:
+            for callback in callbacks:
+                try:
+                    callback(filename)
+                except Exception as e:
+                    print(f"⚠ Rotation callback failed for {filename}: {e}", file=sys.stderr)
+
+    def _watch(self) -> None:
+        """Watcher thread: react to inotify events or poll."""
+        while not self._stop.is_set():
+            if self._inotify is None:
+                if self._stop.wait(self.poll_interval):
+                    return
+                with self._lock:
+                    tracked = set(self._signatures)
+                self._check_files(tracked)
+                continue
+
+            events = self._inotify.read_events(_WAKEUP_INTERVAL)
+            if not events:
+                continue
+
+            with self._lock:
+                tracked = set(self._signatures)
+
+            changed: Set[str] = set()
+            for _wd, mask, name in events:
+                if mask & RESCAN_MASK or name.startswith(".."):
+                    # Overflow, directory replaced, or the ..data symlink swapped
+                    changed |= tracked
+                    if mask & (IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF):
+                        self._rewatch()
+                elif name:
+                    changed.add(name)
+
+            if changed:
+                self._check_files(changed)
+
+    def _rewatch(self) -> None:
+        """Re-add the directory watch after the directory was replaced."""
+        try:
+            self._inotify.add_watch(str(self.secrets_dir))
+        except OSError as e:
+            print(f"⚠ Lost inotify watch on {self.secrets_dir} ({e}); polling instead",
+                  file=sys.stderr)
+            self._inotify.close()
+            self._inotify = None
+
+    def stop(self) -> None:
+        """Stop watching; cached values are kept."""
+        self._stop.set()
+        self._thread.join(timeout=_WAKEUP_INTERVAL * 2)
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
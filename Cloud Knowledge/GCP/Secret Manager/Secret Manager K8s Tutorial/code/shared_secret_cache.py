@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Pod-wide shared secret cache over a Unix domain socket.
+
+Every gunicorn/uwsgi worker that builds its own CachedSecretManagerClient has
+its own cache, so N workers mean N cold misses at boot and N times the Secret
+Manager traffic. Here one process per pod owns the cache and talks to Secret
+Manager; every worker asks it over a local socket first.
+
+    worker 1 ─┐
+    worker 2 ─┼─ /tmp/secret-cache.sock ─▶ SecretCacheServer ─▶ Secret Manager
+    worker N ─┘                            (CachedSecretManagerClient)
+
+Which process serves is decided by an exclusive lock on "<socket>.lock":
+    • Election (default): the first SharedCachedSecretManagerClient to start
+      takes the lock and serves from a background thread; if it dies, the lock
+      is released and the next worker to notice takes over.
+    • Sidecar: run `python shared_secret_cache.py --project my-project` in its
+      own container sharing an emptyDir with the app.
+
+Don't start the server in a pre-fork master (e.g. gunicorn `on_starting`):
+gRPC channels do not survive fork().
+
+The server uses the same CachedSecretManagerClient, so TTLs, the version-aware
+TTL policy, refresh-ahead and stale fallback behave exactly as in-process.
+Each answer carries the entry's remaining TTL and workers keep a copy until
+then, so repeat reads skip the socket and a worker still has a stale value
+to serve if the server later loses Secret Manager.
+The socket is created with mode 0600; only processes running as the same user
+can read secrets through it.
+
+Usage:
+    client = SharedCachedSecretManagerClient("my-project")
+    api_key = client.access_secret_version("demo-app-api-key")
+"""
+
+import argparse
+import errno
+import fcntl
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+from typing import Any, Dict, Optional
+
+from read_secret_direct import CachedSecretManagerClient, transient_errors
+
+
+DEFAULT_SOCKET_PATH = os.environ.get("SECRET_CACHE_SOCKET", "/tmp/secret-cache.sock")
+
+# How long a worker waits for the server (which may be doing an RPC)
+CLIENT_TIMEOUT_SECONDS = 30
+
+# Errors translated by SecretManagerClient that are sent back as-is
+_PASSTHROUGH_ERRORS = {"ValueError": ValueError, "PermissionError": PermissionError}
+
+
+class SecretCacheBackendUnavailable(ConnectionError):
+    """The cache server could not reach Secret Manager and had no stale value."""
+
+
+def _response_error(response: Dict[str, Any]) -> Exception:
+    """Rebuild the exception described by a failed server response."""
+    message = response.get("message", "Secret cache server error")
+    if response.get("transient"):
+        return SecretCacheBackendUnavailable(message)
+    return _PASSTHROUGH_ERRORS.get(response.get("error"), RuntimeError)(message)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Serves newline-delimited JSON requests on one worker connection."""
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                response = self.server.dispatch(request)
+            except Exception as e:
+                response = {
+                    "ok": False,
+                    "error": type(e).__name__,
+                    "message": str(e),
+                    "transient": isinstance(e, transient_errors()),
+                }
+
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class SecretCacheServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server answering secret lookups from one shared cache."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, client: CachedSecretManagerClient):
+        """
+        Initialize server (the caller must hold the election lock).
+
+        Args:
+            socket_path: Filesystem path of the Unix socket
+            client: Cached client that owns the shared cache
+        """
+        self.client = client
+        self.socket_path = socket_path
+
+        # Remove a socket left behind by a previous server that died
+        try:
+            os.unlink(socket_path)
+        except FileNotFoundError:
+            pass
+
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(socket_path, _RequestHandler)
+        finally:
+            os.umask(old_umask)
+
+    def dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle one decoded request."""
+        op = request.get("op")
+
+        if op == "get":
+            secret_id, version = request["secret"], request.get("version", "latest")
+            value = self.client.access_secret_version(secret_id, version)
+
+            # Workers may keep the value as long as this cache does, no longer
+            entry = self.client.cache.get_stale(f"{secret_id}:{version}")
+            ttl = max(-entry[1], 0) if entry else 0
+            return {"ok": True, "value": value, "ttl": ttl}
+
+        if op == "stats":
+            return {"ok": True, "stats": self.client.cache.stats()}
+
+        raise ValueError(f"Unknown operation: {op}")
+
+    def start_in_background(self) -> threading.Thread:
+        """Serve from a daemon thread and return it."""
+        thread = threading.Thread(
+            target=self.serve_forever, name="secret-cache-server", daemon=True
+        )
+        thread.start()
+        return thread
+
+
+def try_acquire_server_lock(socket_path: str) -> Optional[int]:
+    """
+    Try to become the pod's cache server.
+
+    Returns:
+        File descriptor holding the lock (keep it open for the server's
+        lifetime), or None if another process is already the server
+    """
+    fd = os.open(socket_path + ".lock", os.O_CREAT | os.O_RDWR, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return fd
+    except OSError as e:
+        os.close(fd)
+        if e.errno in (errno.EAGAIN, errno.EACCES, errno.EWOULDBLOCK):
+            return None
+        raise
+
+
+class SharedCachedSecretManagerClient(CachedSecretManagerClient):
+    """
+    Cached client that consults the pod-wide cache server before Secret Manager.
+
+    Values from the server are kept in this process's cache for the TTL the
+    server reports. If the server can't be reached, this client tries to
+    become the server itself; failing that, it falls back to its own
+    in-process cache.
+    """
+
+    def __init__(
+        self,
+        project_id: str,
+        socket_path: str = DEFAULT_SOCKET_PATH,
+        elect_server: bool = True,
+        **cache_options
+    ):
+        """
+        Initialize client.
+
+        Args:
+            project_id: GCP project ID
+            socket_path: Unix socket of the shared cache server
+            elect_server: Become the server if none is running (default: True)
+            **cache_options: Passed to CachedSecretManagerClient (cache_ttl,
+                ttl_policy, refresh_ahead, max_staleness, ...); also used to
+                configure the server if this process becomes it
+        """
+        super().__init__(project_id, **cache_options)
+        self.socket_path = socket_path
+        self.elect_server = elect_server
+        self.server: Optional[SecretCacheServer] = None
+        self._server_lock_fd: Optional[int] = None
+        self._local = threading.local()
+
+        if elect_server:
+            self._maybe_become_server()
+
+    def _maybe_become_server(self) -> bool:
+        """Start serving if no other process holds the election lock."""
+        if self.server is not None:
+            return True
+
+        fd = try_acquire_server_lock(self.socket_path)
+        if fd is None:
+            return False
+
+        # This process's own cache is the shared cache from now on
+        self._server_lock_fd = fd
+        self.server = SecretCacheServer(self.socket_path, self)
+        self.server.start_in_background()
+        return True
+
+    def _connection(self):
+        """Per-thread persistent connection to the server."""
+        stream = getattr(self._local, "stream", None)
+        if stream is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(CLIENT_TIMEOUT_SECONDS)
+            try:
+                sock.connect(self.socket_path)
+            except OSError:
+                sock.close()
+                raise
+            stream = sock.makefile("rwb")
+            self._local.sock = sock
+            self._local.stream = stream
+        return stream
+
+    def _disconnect(self) -> None:
+        stream = getattr(self._local, "stream", None)
+        if stream is not None:
+            try:
+                stream.close()
+                self._local.sock.close()
+            except OSError:
+                pass
+        self._local.stream = None
+
+    def _request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        stream = self._connection()
+        stream.write(json.dumps(request).encode("utf-8") + b"\n")
+        stream.flush()
+        line = stream.readline()
+        if not line:
+            raise ConnectionError("Secret cache server closed the connection")
+        return json.loads(line)
+
+    def access_secret_version(
+        self,
+        secret_id: str,
+        version: str = "latest"
+    ) -> str:
+        """
+        Access secret through the pod-wide cache, falling back to this process.
+
+        Values the server returned earlier are served from this process's
+        cache until their TTL runs out. If the server can't reach Secret
+        Manager either, this process's own cache (including stale values,
+        with max_staleness) and client are tried. Raises the same
+        ValueError/PermissionError as SecretManagerClient.
+        """
+        if self.server is not None:
+            # We are the server: our own cache *is* the shared cache
+            return super().access_secret_version(secret_id, version)
+
+        cache_key = f"{secret_id}:{version}"
+        found = self.cache.lookup(cache_key)
+        if found is not None:
+            if self.log_hits:
+                print(f"  [Cache hit: {cache_key}]")
+            return found[0]
+
+        try:
+            response = self._request({"op": "get", "secret": secret_id, "version": version})
+        except (OSError, ValueError):
+            # Server gone: take over if we can, otherwise use our own cache
+            self._disconnect()
+            if self.elect_server:
+                self._maybe_become_server()
+            return super().access_secret_version(secret_id, version)
+
+        if response.get("ok"):
+            value = response["value"]
+            self.cache.set(cache_key, value, ttl=response.get("ttl", 0))
+            return value
+
+        error = _response_error(response)
+        if isinstance(error, SecretCacheBackendUnavailable):
+            # Serve this process's stale value, or try Secret Manager directly
+            return super().access_secret_version(secret_id, version)
+        raise error
+
+    def shared_stats(self) -> Optional[Dict[str, Any]]:
+        """Cache statistics of the server process, or None if unreachable."""
+        if self.server is not None:
+            return self.cache.stats()
+        try:
+            return self._request({"op": "stats"}).get("stats")
+        except (OSError, ValueError):
+            self._disconnect()
+            return None
+
+    def close(self) -> None:
+        """Stop serving (if this process is the server) and drop connections."""
+        super().close()
+        self._disconnect()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        if self._server_lock_fd is not None:
+            os.close(self._server_lock_fd)
+            self._server_lock_fd = None
+
+
+def main():
+    """Run the shared cache server in the foreground (sidecar mode)."""
+    parser = argparse.ArgumentParser(description="Pod-wide Secret Manager cache server")
+    parser.add_argument("--project", required=True, help="GCP project ID")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH,
+                        help=f"Unix socket path (default: {DEFAULT_SOCKET_PATH})")
+    parser.add_argument("--cache-ttl", type=int, default=300,
+                        help="TTL in seconds for \"latest\" (default: 300)")
+    parser.add_argument("--refresh-ahead", type=float, default=30,
+                        help="Refresh entries this many seconds before expiry (default: 30)")
+    parser.add_argument("--max-staleness", type=float, default=600,
+                        help="Serve last good value this long during outages (default: 600)")
+    args = parser.parse_args()
+
+    fd = try_acquire_server_lock(args.socket)
+    if fd is None:
+        print(f"✗ Another process is already serving {args.socket}", file=sys.stderr)
+        sys.exit(1)
+
+    client = CachedSecretManagerClient(
+        args.project,
+        cache_ttl=args.cache_ttl,
+        refresh_ahead=args.refresh_ahead,
+        max_staleness=args.max_staleness
+    )
+    server = SecretCacheServer(args.socket, client)
+    print(f"✓ Serving shared secret cache for '{args.project}' on {args.socket}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n\nInterrupted by user")
+    finally:
+        server.server_close()
+        client.close()
+        os.close(fd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Request coalescing ("single-flight") for cache misses.
+
+When a hot cache entry expires, every concurrent caller misses at the same
+moment and each would issue its own backend request (a thundering herd).
+With single-flight, the first caller for a key runs the fetch and everyone
+else arriving while it is in flight waits for that one result instead.
+
+Usage:
+    flight = SingleFlight()
+    value = flight.do("db-password:latest", lambda: fetch("db-password"))
+
+    async_flight = AsyncSingleFlight()
+    value = await async_flight.do("db-password:latest", lambda: afetch("db-password"))
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call:
+    """One in-flight call shared by a leader and its waiters."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key across threads."""
+
+    def __init__(self):
+        """Initialize with no calls in flight."""
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+        # Number of calls that were served by another caller's fetch
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        """
+        Run fn() once per key at a time and share its outcome.
+
+        Args:
+            key: Identity of the work (e.g. "secret_id:version")
+            fn: Function performing the fetch
+
+        Returns:
+            The result of fn(), computed by this caller or by the concurrent
+            caller that got there first
+
+        Raises:
+            Whatever fn() raised, re-raised in every waiting caller
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class AsyncSingleFlight:
+    """Coalesces concurrent coroutine calls with the same key on one event loop."""
+
+    def __init__(self):
+        """Initialize with no calls in flight."""
+        self._tasks: Dict[str, "asyncio.Task"] = {}
+
+        # Number of calls that were served by another caller's fetch
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Await fn() once per key at a time and share its outcome.
+
+        The fetch runs in its own task, so cancelling any caller - including
+        the one that started it - only stops that caller waiting; the other
+        callers still get the shared result.
+
+        Args:
+            key: Identity of the work (e.g. "secret_id:version")
+            fn: Zero-argument function returning an awaitable that performs the fetch
+
+        Returns:
+            The result of fn(), awaited by this caller or by the concurrent
+            caller that got there first
+        """
+        task = self._tasks.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: "asyncio.Task") -> None:
+        """Forget a completed fetch so the next call for key starts a new one."""
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Mark the outcome as retrieved so a fetch whose callers were all
+        # cancelled doesn't log "exception was never retrieved"
+        if not task.cancelled():
+            task.exception()
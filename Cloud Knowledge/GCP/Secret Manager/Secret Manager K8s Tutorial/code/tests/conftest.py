@@ -0,0 +1,18 @@
+"""Shared fixtures: the tutorial modules on sys.path and a local Secret Manager emulator."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import _shared  # noqa: E402,F401  (puts the shared helpers on sys.path)
+from secret_manager_emulator import SecretManagerEmulator  # noqa: E402
+
+
+@pytest.fixture
+def emulator():
+    """An empty, running Secret Manager emulator."""
+    with SecretManagerEmulator() as server:
+        yield server
@@ -0,0 +1,131 @@
+"""Tests for async_secret_manager.py against the local Secret Manager emulator."""
+
+import asyncio
+
+import pytest
+
+from async_secret_manager import AsyncCachedSecretManagerClient, AsyncSecretManagerClient
+from read_secret_direct import transient_errors
+from resilience import NO_RETRY, CircuitBreaker, CircuitOpenError, RetryPolicy
+
+PROJECT = "test-project"
+
+
+@pytest.fixture
+def secrets(emulator):
+    emulator.add_secret_version(PROJECT, "api-key", b"v1")
+    emulator.add_secret_version(PROJECT, "api-key", b"v2")
+    emulator.add_secret_version(PROJECT, "db-url", b"postgres://")
+    return emulator
+
+
+def _run(client_class, emulator, use, **options):
+    async def main():
+        async with client_class(PROJECT, endpoint=emulator.endpoint, **options) as client:
+            return await use(client)
+
+    return asyncio.run(main())
+
+
+def test_access_latest_and_pinned_versions(secrets):
+    async def use(client):
+        return (await client.access_secret_version("api-key"),
+                await client.access_secret_version("api-key", "1"))
+
+    assert _run(AsyncSecretManagerClient, secrets, use) == ("v2", "v1")
+
+
+def test_missing_secret_raises_value_error(secrets):
+    with pytest.raises(ValueError, match="not found"):
+        _run(AsyncSecretManagerClient, secrets, lambda client: client.access_secret_version("missing"))
+
+
+def test_access_many_splits_values_and_errors(secrets):
+    values, errors = _run(AsyncSecretManagerClient, secrets,
+                          lambda client: client.access_many(["api-key", "db-url", "missing"]))
+
+    assert values == {"api-key:latest": "v2", "db-url:latest": "postgres://"}
+    assert list(errors) == ["missing:latest"]
+    assert isinstance(errors["missing:latest"], ValueError)
+
+
+def test_listing(secrets):
+    async def use(client):
+        names = [secret.name.split("/")[-1] async for secret in client.iter_secrets()]
+        versions, errors = await client.list_versions_many(["api-key", "missing"])
+        return names, versions, errors
+
+    names, versions, errors = _run(AsyncSecretManagerClient, secrets, use)
+    assert sorted(names) == ["api-key", "db-url"]
+    assert len(versions["api-key"]) == 2
+    assert isinstance(errors["missing"], ValueError)
+
+
+def test_hits_are_served_from_the_cache(secrets):
+    async def use(client):
+        return [await client.access_secret_version("api-key") for _ in range(5)]
+
+    assert _run(AsyncCachedSecretManagerClient, secrets, use) == ["v2"] * 5
+    assert secrets.calls["AccessSecretVersion"] == 1
+
+
+def test_concurrent_misses_are_coalesced(secrets):
+    secrets.faults.latency_ms = 50
+
+    async def use(client):
+        return await asyncio.gather(*(client.access_secret_version("api-key") for _ in range(20)))
+
+    assert _run(AsyncCachedSecretManagerClient, secrets, use) == ["v2"] * 20
+    assert secrets.calls["AccessSecretVersion"] == 1
+
+
+def test_refresh_ahead_updates_entry_in_background(secrets):
+    async def use(client):
+        first = await client.access_secret_version("api-key")
+        secrets.add_secret_version(PROJECT, "api-key", b"v3")
+        second = await client.access_secret_version("api-key")
+        await asyncio.gather(*client._refreshing.values())
+        return first, second, client.background_refreshes, client.cache.peek("api-key:latest")
+
+    assert _run(AsyncCachedSecretManagerClient, secrets, use, cache_ttl=60, refresh_ahead=120) == (
+        "v2", "v2", 1, "v3"
+    )
+
+
+def test_transient_errors_are_retried(secrets):
+    secrets.faults.error_rate = 1.0
+    fast = RetryPolicy(max_attempts=3, initial_backoff=0.001, max_backoff=0.001, deadline=5)
+
+    async def use(client):
+        with pytest.raises(transient_errors()):
+            await client.access_secret_version("api-key")
+        secrets.faults.error_rate = 0.0
+        return await client.access_secret_version("api-key")
+
+    assert _run(AsyncSecretManagerClient, secrets, use, retry_policy=fast) == "v2"
+    assert secrets.calls["AccessSecretVersion"] == 4
+
+
+def test_open_breaker_fails_fast(secrets):
+    secrets.faults.error_rate = 1.0
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=60)
+
+    async def use(client):
+        for _ in range(2):
+            with pytest.raises(transient_errors()):
+                await client.access_secret_version("api-key")
+        with pytest.raises(CircuitOpenError):
+            await client.access_secret_version("api-key")
+
+    _run(AsyncSecretManagerClient, secrets, use, retry_policy=NO_RETRY, circuit_breaker=breaker)
+    assert secrets.calls["AccessSecretVersion"] == 2
+
+
+def test_stale_value_served_while_backend_is_unavailable(secrets):
+    async def use(client):
+        first = await client.access_secret_version("api-key")
+        secrets.faults.error_rate = 1.0
+        return first, await client.access_secret_version("api-key"), client.stale_served
+
+    assert _run(AsyncCachedSecretManagerClient, secrets, use,
+                cache_ttl=0, max_staleness=60, retry_policy=NO_RETRY) == ("v2", "v2", 1)
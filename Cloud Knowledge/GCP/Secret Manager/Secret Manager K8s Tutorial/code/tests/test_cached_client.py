@@ -0,0 +1,99 @@
+"""Tests for SecretCache and CachedSecretManagerClient (read_secret_direct.py)."""
+
+import threading
+import time
+
+import pytest
+
+from read_secret_direct import CachedSecretManagerClient, SecretCache, VersionAwareTTLPolicy
+from resilience import NO_RETRY
+
+PROJECT = "test-project"
+
+
+def test_cache_evicts_least_recently_used():
+    cache = SecretCache(ttl_seconds=60, max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expired_entries_stay_available_as_stale():
+    cache = SecretCache(ttl_seconds=60, stale_seconds=60)
+    cache.set("a", "1", ttl=0)
+
+    assert cache.get("a") is None
+    value, overdue = cache.get_stale("a")
+    assert value == "1" and overdue >= 0
+
+
+def test_version_aware_ttl_policy():
+    policy = VersionAwareTTLPolicy(alias_ttl=30)
+    assert policy("db", "latest") == 30
+    assert policy("db", "3") == float("inf")
+
+
+@pytest.fixture
+def make_client(emulator):
+    emulator.add_secret_version(PROJECT, "api-key", b"v1")
+    clients = []
+
+    def make(**kwargs):
+        kwargs.setdefault("log_hits", False)
+        client = CachedSecretManagerClient(PROJECT, endpoint=emulator.endpoint, **kwargs)
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.close()
+
+
+def test_hits_are_served_without_rpc(emulator, make_client):
+    client = make_client()
+    for _ in range(5):
+        assert client.access_secret_version("api-key") == "v1"
+    assert emulator.calls["AccessSecretVersion"] == 1
+
+
+def test_concurrent_misses_are_coalesced(emulator, make_client):
+    emulator.faults.latency_ms = 50
+    client = make_client()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(client.access_secret_version("api-key")))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == ["v1"] * 8
+    assert emulator.calls["AccessSecretVersion"] == 1
+
+
+def test_refresh_ahead_updates_entry_in_background(emulator, make_client):
+    client = make_client(cache_ttl=60, refresh_ahead=120)
+    assert client.access_secret_version("api-key") == "v1"
+    emulator.add_secret_version(PROJECT, "api-key", b"v2")
+
+    # Within refresh_ahead of expiry: served from cache, refreshed behind it
+    assert client.access_secret_version("api-key") == "v1"
+    deadline = time.monotonic() + 5
+    while client.background_refreshes == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert client.background_refreshes == 1
+    assert client.cache.peek("api-key:latest") == "v2"
+
+
+def test_stale_value_served_while_backend_is_unavailable(emulator, make_client):
+    client = make_client(cache_ttl=0, max_staleness=60, retry_policy=NO_RETRY)
+    assert client.access_secret_version("api-key") == "v1"
+
+    emulator.faults.error_rate = 1.0
+    assert client.access_secret_version("api-key") == "v1"
+    assert client.stale_served == 1
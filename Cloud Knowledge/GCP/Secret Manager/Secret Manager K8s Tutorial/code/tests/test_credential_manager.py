@@ -0,0 +1,84 @@
+"""Tests for credential_manager.py, with storage pointed at a local emulator endpoint."""
+
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from credential_manager import RotatingStorageClient
+
+
+def write_key(path, key_id):
+    """Atomically (re)write a service account key file, like the CSI driver."""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps({
+        "type": "service_account",
+        "project_id": "test-project",
+        "private_key_id": key_id,
+        "private_key": "unused with anonymous emulator credentials",
+        "client_email": "uploader@test-project.iam.gserviceaccount.com",
+        "client_id": "1234",
+    }))
+    os.replace(tmp, path)
+
+
+@pytest.fixture
+def key_file(tmp_path, monkeypatch):
+    # Emulator endpoints use anonymous credentials; nothing listens there
+    monkeypatch.setenv("STORAGE_EMULATOR_HOST", "http://127.0.0.1:9")
+    path = tmp_path / "credentials.json"
+    write_key(path, "key-1")
+    return path
+
+
+def test_builds_client_with_anonymous_emulator_credentials(key_file):
+    manager = RotatingStorageClient(str(key_file), poll_interval=0.05)
+    try:
+        assert manager.client is not None
+        assert manager.stats()["key_id"] == "key-1"
+    finally:
+        manager.close()
+
+
+def test_rotation_swaps_client_and_keeps_leased_one_open(key_file):
+    manager = RotatingStorageClient(str(key_file), poll_interval=0.05)
+    swapped = threading.Event()
+    manager.on_swap(lambda client: swapped.set())
+    try:
+        with manager.lease() as leased:
+            write_key(key_file, "key-2")
+            assert swapped.wait(5)
+            assert manager.client is not leased
+        stats = manager.stats()
+        assert stats["key_id"] == "key-2"
+        assert stats["swaps"] == 1
+    finally:
+        manager.close()
+
+
+def test_invalid_key_keeps_current_client(key_file):
+    manager = RotatingStorageClient(str(key_file), poll_interval=0.05)
+    try:
+        client = manager.client
+        tmp = key_file.with_name("invalid.tmp")
+        tmp.write_text("{}")
+        os.replace(tmp, key_file)
+
+        deadline = time.monotonic() + 5
+        while manager.stats()["failed_reloads"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert manager.stats()["failed_reloads"] >= 1
+        assert manager.client is client
+        assert manager.stats()["key_id"] == "key-1"
+    finally:
+        manager.close()
+
+
+def test_invalid_initial_key_is_rejected(tmp_path):
+    path = tmp_path / "credentials.json"
+    path.write_text("{}")
+
+    with pytest.raises(ValueError):
+        RotatingStorageClient(str(path), poll_interval=0.05)
@@ -0,0 +1,135 @@
+"""Tests for prewarm.py against the local Secret Manager emulator."""
+
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+import prewarm
+from prewarm import load_secret_refs, main
+from read_secret_direct import CachedSecretManagerClient
+from shared_secret_cache import SharedCachedSecretManagerClient
+
+PROJECT = "test-project"
+K8S_DIR = Path(__file__).resolve().parents[2] / "k8s"
+MANIFEST = K8S_DIR / "secret-provider-class.yaml"
+SECRETS = ["demo-app-sa-key", "demo-app-api-key", "demo-app-db-url"]
+
+
+@pytest.fixture(params=["pyyaml", "line-scanner"])
+def parser(request, monkeypatch):
+    if request.param == "line-scanner":
+        monkeypatch.setattr(prewarm, "yaml", None)
+    elif prewarm.yaml is None:
+        pytest.skip("PyYAML is not installed")
+    return request.param
+
+
+def test_manifest_refs(parser):
+    assert load_secret_refs(str(MANIFEST), "demo-app-secrets") == [
+        (secret, "latest") for secret in SECRETS
+    ]
+    assert load_secret_refs(str(MANIFEST), "demo-app-storage-secrets") == [
+        ("demo-app-sa-key", "latest")
+    ]
+    # Every SecretProviderClass, without duplicates
+    refs = load_secret_refs(str(MANIFEST))
+    assert refs[:3] == [(secret, "latest") for secret in SECRETS]
+    assert ("demo-app-sa-key", "3") in refs and len(refs) == len(set(refs))
+
+
+def test_unknown_provider_class_name(parser):
+    with pytest.raises(ValueError, match="No secrets found in SecretProviderClass 'other'"):
+        load_secret_refs(str(MANIFEST), "other")
+
+
+@pytest.mark.parametrize("manifest", ["service-account.yaml", "deployment.yaml"])
+def test_other_kubernetes_manifests_are_rejected(parser, manifest):
+    with pytest.raises(ValueError, match="No SecretProviderClass"):
+        load_secret_refs(str(K8S_DIR / manifest))
+
+
+def test_plain_list(tmp_path):
+    path = tmp_path / "secrets.txt"
+    path.write_text("# needed at startup\napi-key\ndb-url:3  # pinned\n\napi-key\n")
+
+    assert load_secret_refs(str(path)) == [("api-key", "latest"), ("db-url", "3")]
+
+
+@pytest.mark.parametrize("line", ["api key", "apiVersion: v1", "db-url:3 extra"])
+def test_plain_list_rejects_malformed_lines(tmp_path, line):
+    path = tmp_path / "secrets.txt"
+    path.write_text(f"api-key\n{line}\n")
+
+    with pytest.raises(ValueError, match="secrets.txt:2"):
+        load_secret_refs(str(path))
+
+
+def test_prewarm_fills_the_cache(emulator):
+    for secret in SECRETS[:2]:
+        emulator.add_secret_version(PROJECT, secret, secret.encode())
+    client = CachedSecretManagerClient(PROJECT, endpoint=emulator.endpoint, log_hits=False)
+    try:
+        report = prewarm.prewarm(client, [(secret, "latest") for secret in SECRETS])
+    finally:
+        client.close()
+
+    assert sorted(report.loaded) == sorted(f"{secret}:latest" for secret in SECRETS[:2])
+    assert list(report.errors) == ["demo-app-db-url:latest"] and not report.ok
+    assert client.cache.peek("demo-app-api-key:latest") == "demo-app-api-key"
+
+
+@pytest.fixture
+def socket_path():
+    directory = tempfile.mkdtemp(prefix="pw-")
+    yield str(Path(directory) / "cache.sock")
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def _run_main(monkeypatch, *args):
+    monkeypatch.setattr(sys, "argv", ["prewarm.py", "--project", PROJECT, *args])
+    return main()
+
+
+@pytest.fixture
+def secrets_file(emulator, tmp_path):
+    for secret in SECRETS:
+        emulator.add_secret_version(PROJECT, secret, b"value")
+    path = tmp_path / "secrets.txt"
+    path.write_text("\n".join(SECRETS) + "\n")
+    return path
+
+
+def test_main_writes_ready_file(emulator, secrets_file, tmp_path, monkeypatch):
+    ready = tmp_path / "ready"
+
+    assert _run_main(monkeypatch, "--manifest", str(secrets_file), "--endpoint", emulator.endpoint,
+                     "--ready-file", str(ready)) == 0
+    assert ready.read_text().startswith("secrets=3 ")
+
+
+def test_main_shared_warms_the_server(emulator, secrets_file, socket_path, tmp_path, monkeypatch):
+    ready = tmp_path / "ready"
+    server = SharedCachedSecretManagerClient(PROJECT, socket_path, endpoint=emulator.endpoint,
+                                             log_hits=False)
+    try:
+        assert _run_main(monkeypatch, "--manifest", str(secrets_file), "--endpoint",
+                         emulator.endpoint, "--shared", "--socket", socket_path,
+                         "--ready-file", str(ready)) == 0
+        assert server.cache.stats()["size"] == 3
+    finally:
+        server.close()
+    assert ready.exists()
+
+
+def test_main_shared_without_server_is_not_ready(emulator, secrets_file, socket_path, tmp_path,
+                                                 monkeypatch, capsys):
+    ready = tmp_path / "ready"
+
+    assert _run_main(monkeypatch, "--manifest", str(secrets_file), "--endpoint", emulator.endpoint,
+                     "--shared", "--socket", socket_path, "--ready-file", str(ready)) == 1
+    assert "No shared cache server" in capsys.readouterr().err
+    assert not ready.exists()
+    assert emulator.calls.get("AccessSecretVersion", 0) == 0
@@ -0,0 +1,38 @@
+"""Tests for read_secret_direct.py against the local Secret Manager emulator."""
+
+import pytest
+
+from read_secret_direct import SecretManagerClient
+
+PROJECT = "test-project"
+
+
+@pytest.fixture
+def client(emulator):
+    emulator.add_secret_version(PROJECT, "api-key", b"v1")
+    emulator.add_secret_version(PROJECT, "api-key", b"v2")
+    return SecretManagerClient(PROJECT, endpoint=emulator.endpoint)
+
+
+def test_access_latest_and_pinned_versions(client):
+    assert client.access_secret_version("api-key") == "v2"
+    assert client.access_secret_version("api-key", "1") == "v1"
+
+
+def test_missing_secret_raises_value_error(client):
+    with pytest.raises(ValueError, match="not found"):
+        client.access_secret_version("missing")
+
+
+def test_access_many_splits_values_and_errors(client):
+    values, errors = client.access_many(["api-key", "api-key:1", "missing"])
+
+    assert values == {"api-key:latest": "v2", "api-key:1": "v1"}
+    assert set(errors) == {"missing:latest"}
+    assert isinstance(errors["missing:latest"], ValueError)
+
+
+def test_iter_secret_versions_of_missing_secret(client):
+    assert len(list(client.iter_secret_versions("api-key"))) == 2
+    with pytest.raises(ValueError):
+        list(client.iter_secret_versions("missing"))
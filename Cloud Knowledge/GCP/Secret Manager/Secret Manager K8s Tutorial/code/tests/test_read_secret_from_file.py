@@ -0,0 +1,74 @@
+"""Tests for read_secret_from_file.py."""
+
+import json
+
+import pytest
+
+from read_secret_from_file import SecretFileReader, StorageClientExample
+
+KEY = {
+    "type": "service_account",
+    "project_id": "test-project",
+    "private_key_id": "key-1",
+    "private_key": "unused with anonymous emulator credentials",
+    "client_email": "uploader@test-project.iam.gserviceaccount.com",
+    "client_id": "1234",
+}
+
+
+@pytest.fixture
+def secrets_dir(tmp_path, monkeypatch):
+    # Emulator endpoints use anonymous credentials; nothing listens there
+    monkeypatch.setenv("STORAGE_EMULATOR_HOST", "http://127.0.0.1:9")
+    (tmp_path / "credentials.json").write_text(json.dumps(KEY))
+    (tmp_path / "api-key.txt").write_text("abc123\n")
+    return tmp_path
+
+
+def test_reads_are_memoized_until_the_file_changes(secrets_dir):
+    reader = SecretFileReader(str(secrets_dir))
+
+    assert reader.read_text_secret("api-key.txt") == "abc123"
+    assert reader.read_text_secret("api-key.txt") == "abc123"
+    assert (reader.stat_hits, reader.parses) == (1, 1)
+
+    (secrets_dir / "api-key.txt").write_text("rotated-value\n")
+    assert reader.read_text_secret("api-key.txt") == "rotated-value"
+    assert reader.parses == 2
+
+
+def test_missing_secret_file(secrets_dir):
+    with pytest.raises(FileNotFoundError):
+        SecretFileReader(str(secrets_dir)).read_json_secret("missing.json")
+
+
+def test_reinitializing_closes_the_previous_rotating_client(secrets_dir, monkeypatch):
+    monkeypatch.setenv("GOOGLE_APPLICATION_CREDENTIALS", str(secrets_dir / "credentials.json"))
+    example = StorageClientExample(str(secrets_dir))
+
+    example.initialize_client()
+    first = example.credential_manager
+    example.initialize_client()
+
+    assert example.credential_manager is not first
+    assert not first._reloader.is_alive()
+
+    second = example.credential_manager
+    example.close()
+    assert not second._reloader.is_alive()
+    assert example.credential_manager is None
+    assert example.storage_client is None
+
+
+def test_relative_credentials_path_is_resolved_against_cwd(secrets_dir, tmp_path_factory, monkeypatch):
+    cwd = tmp_path_factory.mktemp("cwd")
+    (cwd / "local-key.json").write_text(json.dumps(dict(KEY, private_key_id="local-key")))
+    monkeypatch.chdir(cwd)
+    monkeypatch.setenv("GOOGLE_APPLICATION_CREDENTIALS", "local-key.json")
+
+    example = StorageClientExample(str(secrets_dir))
+    try:
+        example.initialize_client()
+        assert example.credential_manager.stats()["key_id"] == "local-key"
+    finally:
+        example.close()
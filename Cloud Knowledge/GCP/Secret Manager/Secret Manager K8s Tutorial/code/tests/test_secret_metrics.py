@@ -0,0 +1,86 @@
+"""Spans and counters reported by the Secret Manager clients, caches and file readers."""
+
+import pytest
+
+from instrumentation import (
+    Instrumentation,
+    RecordingInstrumentation,
+    get_instrumentation,
+    set_instrumentation,
+)
+from read_secret_direct import SecretCache, SecretManagerClient
+from read_secret_from_file import SecretFileReader
+
+PROJECT = "test-project"
+
+
+@pytest.fixture
+def recorder():
+    recorder = RecordingInstrumentation()
+    previous = set_instrumentation(recorder)
+    yield recorder
+    set_instrumentation(previous)
+
+
+@pytest.fixture
+def client(emulator):
+    emulator.add_secret_version(PROJECT, "api-key", b"secret-value")
+    return SecretManagerClient(PROJECT, endpoint=emulator.endpoint)
+
+
+def _durations(recorder, name):
+    return recorder.snapshot()["histograms"].get(f"{name}.duration", {})
+
+
+def test_access_secret_version(client, recorder):
+    client.access_secret_version("api-key")
+    with pytest.raises(ValueError):
+        client.access_secret_version("missing")
+
+    durations = _durations(recorder, "secretmanager.access_secret_version")
+    assert durations["outcome=ok"]["count"] == 1
+    assert durations["outcome=error"]["count"] == 1
+    assert recorder.counter("secretmanager.payload.bytes") == len(b"secret-value")
+
+
+def test_secret_cache(recorder):
+    cache = SecretCache(ttl_seconds=60, max_entries=1)
+    cache.get("a")
+    cache.set("a", "1")
+    cache.get("a")
+    cache.set("b", "2")
+
+    assert recorder.counter("secret_cache.lookups", {"result": "miss"}) == 1
+    assert recorder.counter("secret_cache.lookups", {"result": "hit"}) == 1
+    assert recorder.counter("secret_cache.sets") == 2
+    assert recorder.counter("secret_cache.evictions") == 1
+
+
+def test_secret_file_reader(tmp_path, recorder):
+    (tmp_path / "api-key.txt").write_text("abc123\n")
+    reader = SecretFileReader(str(tmp_path))
+    reader.read_text_secret("api-key.txt")
+    reader.read_text_secret("api-key.txt")
+
+    assert recorder.counter("secret_file.reads", {"kind": "text", "result": "parsed"}) == 1
+    assert recorder.counter("secret_file.reads", {"kind": "text", "result": "stat_hit"}) == 1
+    assert recorder.counter("secret_file.bytes", {"kind": "text"}) == len("abc123\n")
+    assert _durations(recorder, "secret_file.parse")["kind=text,outcome=ok"]["count"] == 1
+
+
+def test_default_instrumentation_records_nothing(client, tmp_path, monkeypatch):
+    # The no-op default must not be asked to count anything on the hot paths
+    calls = []
+    monkeypatch.setattr(Instrumentation, "add", lambda self, *args, **kwargs: calls.append(args))
+    monkeypatch.setattr(Instrumentation, "record", lambda self, *args, **kwargs: calls.append(args))
+    assert type(get_instrumentation()) is Instrumentation
+    (tmp_path / "api-key.txt").write_text("abc123\n")
+
+    assert client.access_secret_version("api-key") == "secret-value"
+    cache = SecretCache()
+    cache.set("a", "1")
+    assert cache.get("a") == "1"
+    reader = SecretFileReader(str(tmp_path))
+    assert reader.read_text_secret("api-key.txt") == reader.read_text_secret("api-key.txt")
+
+    assert calls == []
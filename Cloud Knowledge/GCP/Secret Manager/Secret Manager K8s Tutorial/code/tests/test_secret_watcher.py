@@ -0,0 +1,72 @@
+"""Tests for WatchingSecretFileReader (secret_watcher.py)."""
+
+import os
+import threading
+
+import pytest
+
+from secret_watcher import WatchingSecretFileReader
+
+
+def _replace(path, text):
+    # Swap the file atomically, as the CSI driver does
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+
+class _Rotations:
+    """Rotation callback that records file names and signals each one."""
+
+    def __init__(self):
+        self.files = []
+        self._events = {}
+        self._lock = threading.Lock()
+
+    def _event(self, filename):
+        with self._lock:
+            return self._events.setdefault(filename, threading.Event())
+
+    def __call__(self, filename):
+        self.files.append(filename)
+        self._event(filename).set()
+
+    def wait_for(self, filename, timeout=5.0):
+        return self._event(filename).wait(timeout)
+
+
+@pytest.fixture(params=["inotify", "poll"])
+def reader(request, tmp_path):
+    (tmp_path / "api-key.txt").write_text("v1")
+    watcher = WatchingSecretFileReader(str(tmp_path), poll_interval=0.05,
+                                       use_inotify=request.param == "inotify")
+    yield watcher
+    watcher.stop()
+
+
+def test_rotation_invalidates_cached_value(reader, tmp_path):
+    rotations = _Rotations()
+    reader.on_rotation(rotations)
+    assert reader.read_text_secret("api-key.txt") == "v1"
+
+    _replace(tmp_path / "api-key.txt", "v2")
+
+    assert rotations.wait_for("api-key.txt")
+    assert rotations.files == ["api-key.txt"]
+    assert reader.read_text_secret("api-key.txt") == "v2"
+
+
+def test_untracked_files_do_not_fire_callbacks(reader, tmp_path):
+    rotations = _Rotations()
+    reader.on_rotation(rotations)
+    assert reader.read_text_secret("api-key.txt") == "v1"
+
+    # Never read through the reader: neither counts as a rotation, however often it changes
+    (tmp_path / "unrelated.txt").write_text("x")
+    (tmp_path / "unrelated.txt").write_text("xy")
+    _replace(tmp_path / "api-key.txt", "v2")
+
+    # Events arrive in order, so anything about unrelated.txt came first
+    assert rotations.wait_for("api-key.txt")
+    assert rotations.files == ["api-key.txt"]
+    assert "unrelated.txt" not in reader._signatures
@@ -0,0 +1,104 @@
+"""Tests for the pod-wide cache server protocol (shared_secret_cache.py)."""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from resilience import NO_RETRY
+from shared_secret_cache import SharedCachedSecretManagerClient
+
+PROJECT = "test-project"
+
+# Nothing listens here, so every RPC fails with UNAVAILABLE
+DEAD_ENDPOINT = "127.0.0.1:9"
+
+
+@pytest.fixture
+def socket_path():
+    # Unix socket paths are limited to ~100 bytes; pytest's tmp_path can be longer
+    directory = tempfile.mkdtemp(prefix="sc-")
+    yield str(Path(directory) / "cache.sock")
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+@pytest.fixture
+def make_client(socket_path):
+    clients = []
+
+    def make(endpoint, **kwargs):
+        kwargs.setdefault("log_hits", False)
+        kwargs.setdefault("retry_policy", NO_RETRY)
+        client = SharedCachedSecretManagerClient(PROJECT, socket_path, endpoint=endpoint, **kwargs)
+        clients.append(client)
+        return client
+
+    yield make
+    for client in reversed(clients):
+        client.close()
+
+
+def test_workers_share_the_server_cache(emulator, make_client):
+    emulator.add_secret_version(PROJECT, "api-key", b"v1")
+    server = make_client(emulator.endpoint)
+    worker = make_client(emulator.endpoint, elect_server=False)
+
+    assert server.server is not None and worker.server is None
+    assert worker.access_secret_version("api-key") == "v1"
+    assert server.access_secret_version("api-key") == "v1"
+    assert emulator.calls["AccessSecretVersion"] == 1
+    assert worker.shared_stats()["size"] == 1
+
+
+def test_missing_secret_is_passed_through(emulator, make_client):
+    make_client(emulator.endpoint)
+    worker = make_client(emulator.endpoint, elect_server=False)
+
+    with pytest.raises(ValueError):
+        worker.access_secret_version("missing")
+
+
+def test_worker_falls_back_when_server_cannot_reach_secret_manager(emulator, make_client):
+    emulator.add_secret_version(PROJECT, "api-key", b"v1")
+    make_client(DEAD_ENDPOINT)
+    worker = make_client(emulator.endpoint, elect_server=False)
+
+    assert worker.access_secret_version("api-key") == "v1"
+    assert emulator.calls["AccessSecretVersion"] == 1
+
+
+def test_worker_serves_its_own_stale_value(emulator, make_client):
+    emulator.add_secret_version(PROJECT, "api-key", b"v1")
+    make_client(DEAD_ENDPOINT)
+    worker = make_client(emulator.endpoint, elect_server=False, cache_ttl=0, max_staleness=60)
+    assert worker.access_secret_version("api-key") == "v1"
+
+    emulator.faults.error_rate = 1.0
+    assert worker.access_secret_version("api-key") == "v1"
+    assert worker.stale_served == 1
+
+
+def test_worker_keeps_server_values_for_the_server_ttl(emulator, make_client):
+    emulator.add_secret_version(PROJECT, "api-key", b"v1")
+    emulator.add_secret_version(PROJECT, "api-key", b"v2")
+    server = make_client(emulator.endpoint, cache_ttl=300)
+    worker = make_client(emulator.endpoint, elect_server=False)
+
+    assert worker.access_secret_version("api-key") == "v2"
+    assert worker.access_secret_version("api-key") == "v2"
+    assert worker.access_secret_version("api-key", "1") == "v1"
+    assert server.cache.stats()["hits"] == 0
+    assert 299 < worker.cache.lookup("api-key:latest")[1] <= 300
+    assert worker.cache.lookup("api-key:1")[1] == float("inf")
+
+
+def test_worker_serves_stale_server_value_when_server_loses_secret_manager(emulator, make_client):
+    emulator.add_secret_version(PROJECT, "api-key", b"v1")
+    make_client(emulator.endpoint, cache_ttl=0)
+    worker = make_client(DEAD_ENDPOINT, elect_server=False, max_staleness=60)
+    assert worker.access_secret_version("api-key") == "v1"
+
+    emulator.faults.error_rate = 1.0
+    assert worker.access_secret_version("api-key") == "v1"
+    assert worker.stale_served == 1
@@ -0,0 +1,112 @@
+"""Tests for singleflight.py."""
+
+import asyncio
+import threading
+
+import pytest
+
+from singleflight import AsyncSingleFlight, SingleFlight
+
+
+def test_concurrent_calls_share_one_fetch():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "value"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("key", fetch)))
+    leader.start()
+    started.wait(5)
+    waiters = [threading.Thread(target=lambda: results.append(flight.do("key", fetch))) for _ in range(4)]
+    for waiter in waiters:
+        waiter.start()
+    while flight.coalesced < 4:
+        threading.Event().wait(0.001)
+    release.set()
+    for thread in [leader] + waiters:
+        thread.join(5)
+
+    assert results == ["value"] * 5
+    assert len(calls) == 1
+
+
+def test_error_is_raised_in_every_caller_and_not_cached():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flight.do("key", fail)
+    assert flight.do("key", lambda: "ok") == "ok"
+
+
+def test_async_concurrent_calls_share_one_fetch():
+    async def scenario():
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "value"
+
+        results = await asyncio.gather(*(flight.do("key", fetch) for _ in range(5)))
+        return results, calls, flight.coalesced
+
+    results, calls, coalesced = asyncio.run(scenario())
+    assert results == ["value"] * 5
+    assert len(calls) == 1
+    assert coalesced == 4
+
+
+def test_async_cancelled_leader_does_not_cancel_waiters():
+    async def scenario():
+        flight = AsyncSingleFlight()
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return "value"
+
+        leader = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        return leader, await waiter
+
+    leader, result = asyncio.run(scenario())
+    assert leader.cancelled()
+    assert result == "value"
+
+
+def test_async_error_reaches_waiters_and_next_call_refetches():
+    async def scenario():
+        flight = AsyncSingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        outcomes = await asyncio.gather(flight.do("key", fail), flight.do("key", fail),
+                                        return_exceptions=True)
+
+        async def ok():
+            return "ok"
+
+        return outcomes, await flight.do("key", ok)
+
+    outcomes, retried = asyncio.run(scenario())
+    assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+    assert retried == "ok"
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Minimal latency/throughput harness shared by the benchmark scripts.
+
+Runs an operation a fixed number of times from N worker threads, records the
+latency of every call and reports p50/p95/p99 and ops/sec. Reports are JSON
+so runs can be stored and compared over time.
+
+Usage:
+    result = run_benchmark("cache_get", lambda i: cache.get("k"), ops=10000, concurrency=8)
+    report = write_report([result], "results.json", config={"latency_ms": 5})
+    regressions = compare_reports(load_report("baseline.json"), report, max_regression=0.2)
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from instrumentation import (
+    OpenTelemetryInstrumentation,
+    RecordingInstrumentation,
+    get_instrumentation,
+    set_instrumentation,
+)
+
+# An operation receives its sequence number; returning False counts as an error
+Operation = Callable[[int], Any]
+
+# p99 changes smaller than this are timer noise, never a regression
+MIN_P99_DELTA_MS = 0.05
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+@dataclass
+class BenchResult:
+    """Latency distribution and throughput of one benchmark case."""
+
+    name: str
+    ops: int
+    concurrency: int
+    seconds: float
+    errors: int
+    latency_ms: Dict[str, float]
+    params: Dict[str, Any] = field(default_factory=dict)
+    # Observations such as RPCs sent; unlike params, not part of the case key
+    counters: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def ops_per_sec(self) -> float:
+        return self.ops / self.seconds if self.seconds else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = asdict(self)
+        result["ops_per_sec"] = round(self.ops_per_sec, 1)
+        return result
+
+    def summary(self) -> str:
+        """One human-readable line."""
+        latency = self.latency_ms
+        params = " ".join(f"{key}={value}" for key, value in self.params.items())
+        counters = "".join(f"  {key}={value}" for key, value in self.counters.items())
+        return (f"{self.name:<20} c={self.concurrency:<3} {params:<16} "
+                f"{self.ops_per_sec:>10,.0f} ops/s  p50={latency['p50']:.3f} "
+                f"p95={latency['p95']:.3f} p99={latency['p99']:.3f} ms{counters}"
+                + (f"  errors={self.errors}" if self.errors else ""))
+
+
+def run_benchmark(
+    name: str,
+    operation: Operation,
+    ops: int,
+    concurrency: int = 1,
+    warmup: int = 0,
+    params: Optional[Dict[str, Any]] = None
+) -> BenchResult:
+    """
+    Run `operation` `ops` times across `concurrency` threads.
+
+    Args:
+        name: Case name in the report
+        operation: Callable taking the operation's sequence number
+        ops: Total measured operations
+        concurrency: Worker threads issuing operations
+        warmup: Unmeasured operations run first (single-threaded)
+        params: Extra parameters recorded with the result (e.g. size)
+
+    Returns:
+        BenchResult with latency percentiles in milliseconds
+    """
+    for i in range(warmup):
+        operation(-1 - i)
+
+    latencies: List[float] = [0.0] * ops
+    errors = [0]
+    errors_lock = threading.Lock()
+    next_op = iter(range(ops))
+    next_lock = threading.Lock()
+
+    def worker() -> None:
+        while True:
+            with next_lock:
+                i = next(next_op, None)
+            if i is None:
+                return
+
+            started = time.perf_counter()
+            try:
+                ok = operation(i) is not False
+            except Exception:
+                ok = False
+            latencies[i] = time.perf_counter() - started
+
+            if not ok:
+                with errors_lock:
+                    errors[0] += 1
+
+    started = time.perf_counter()
+    if concurrency == 1:
+        worker()
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for _ in range(concurrency):
+                executor.submit(worker)
+    elapsed = time.perf_counter() - started
+
+    ordered = sorted(latency * 1000 for latency in latencies)
+    return BenchResult(
+        name=name,
+        ops=ops,
+        concurrency=concurrency,
+        seconds=round(elapsed, 6),
+        errors=errors[0],
+        latency_ms={
+            "p50": round(percentile(ordered, 50), 4),
+            "p95": round(percentile(ordered, 95), 4),
+            "p99": round(percentile(ordered, 99), 4),
+            "mean": round(sum(ordered) / len(ordered), 4) if ordered else 0.0,
+            "max": round(ordered[-1], 4) if ordered else 0.0,
+        },
+        params=params or {},
+    )
+
+
+def parse_int_list(value: str) -> List[int]:
+    """Parse "1,8,32" into [1, 8, 32]."""
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def parse_size(value: str) -> int:
+    """Parse sizes like "512", "64KiB" or "16MiB" into bytes."""
+    units = {"kib": 1024, "mib": 1024 ** 2, "gib": 1024 ** 3, "kb": 1000, "mb": 1000 ** 2, "b": 1}
+    text = value.strip().lower()
+    for unit, factor in units.items():
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * factor)
+    return int(text)
+
+
+def write_report(
+    results: List[BenchResult],
+    output: Optional[str] = None,
+    config: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Print a summary and write the JSON report.
+
+    Args:
+        results: Benchmark results
+        output: File to write the JSON report to (default: stdout)
+        config: Benchmark settings recorded with the results
+
+    Returns:
+        The report as a dictionary
+    """
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "config": config or {},
+        "results": [result.to_dict() for result in results],
+    }
+
+    hooks = get_instrumentation()
+    if isinstance(hooks, RecordingInstrumentation):
+        report["instrumentation"] = hooks.snapshot()
+
+    for result in results:
+        print(result.summary(), file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
+        print(f"✓ Wrote {len(results)} result(s) to {output}", file=sys.stderr)
+    else:
+        print(text)
+    return report
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    """Load a report written by write_report."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def _case_key(result: Dict[str, Any]) -> Tuple[str, int, str]:
+    return result["name"], result["concurrency"], json.dumps(result.get("params", {}), sort_keys=True)
+
+
+def compare_reports(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    max_regression: float = 0.2
+) -> List[str]:
+    """
+    Compare two reports case by case.
+
+    A case regresses when its throughput drops, or its p99 latency grows, by
+    more than `max_regression` (a fraction) relative to the baseline. Cases
+    missing from either report are ignored, and so are p99 changes below
+    MIN_P99_DELTA_MS.
+
+    Returns:
+        Descriptions of the regressed cases (empty if none)
+    """
+    previous = {_case_key(result): result for result in baseline.get("results", [])}
+    regressions = []
+
+    for result in current.get("results", []):
+        old = previous.get(_case_key(result))
+        if old is None:
+            continue
+
+        label = f"{result['name']} c={result['concurrency']}"
+        if result.get("params"):
+            label += " " + " ".join(f"{key}={value}" for key, value in result["params"].items())
+
+        if old["ops_per_sec"] and result["ops_per_sec"] < old["ops_per_sec"] * (1 - max_regression):
+            regressions.append(f"{label}: {old['ops_per_sec']:,.0f} -> "
+                               f"{result['ops_per_sec']:,.0f} ops/s")
+        old_p99, new_p99 = old["latency_ms"]["p99"], result["latency_ms"]["p99"]
+        if (old_p99 and new_p99 > old_p99 * (1 + max_regression)
+                and new_p99 - old_p99 >= MIN_P99_DELTA_MS):
+            regressions.append(f"{label}: p99 {old_p99:.3f} -> {new_p99:.3f} ms")
+
+    return regressions
+
+
+def add_report_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add --output/--baseline/--max-regression/--instrumentation."""
+    parser.add_argument("--output", help="Write the JSON report to this file (default: stdout)")
+    parser.add_argument("--instrumentation", choices=("none", "memory", "otel"), default="none",
+                        help="Hooks active during the run, to measure their overhead; 'memory' "
+                             "adds the recorded metrics to the report (default: none)")
+    parser.add_argument("--baseline", help="Earlier report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="Allowed throughput/p99 regression vs --baseline (default: 0.2 = 20%%)")
+
+
+def install_instrumentation(args: argparse.Namespace) -> None:
+    """Activate the hooks selected with --instrumentation."""
+    if args.instrumentation == "memory":
+        set_instrumentation(RecordingInstrumentation())
+    elif args.instrumentation == "otel":
+        set_instrumentation(OpenTelemetryInstrumentation())
+
+
+def finish_report(
+    results: List[BenchResult],
+    args: argparse.Namespace,
+    config: Dict[str, Any]
+) -> int:
+    """
+    Write the report and check it against --baseline.
+
+    Returns:
+        Exit code: 1 if any case regressed, else 0
+    """
+    report = write_report(results, args.output, config)
+    failed = False
+    if any(result.errors for result in results):
+        print("⚠ Some operations failed; their latency is still included", file=sys.stderr)
+
+    if args.baseline:
+        regressions = compare_reports(load_report(args.baseline), report, args.max_regression)
+        for regression in regressions:
+            print(f"✗ Regression: {regression}", file=sys.stderr)
+        if not regressions:
+            print(f"✓ No regressions vs {args.baseline} "
+                  f"(threshold {args.max_regression:.0%})", file=sys.stderr)
+        failed = failed or bool(regressions)
+
+    return 1 if failed else 0
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Injected latency, errors and quota throttling for the local emulators.
+
+Real services are slow sometimes, fail sometimes and throttle bursts. The
+emulators ask a FaultInjector before serving each request; it sleeps for the
+configured latency and decides whether the request is rejected:
+
+    • THROTTLED:   the token bucket (rate_limit requests/s, `burst` deep) is
+                   empty -> HTTP 429 / gRPC RESOURCE_EXHAUSTED
+    • UNAVAILABLE: random failure with probability error_rate
+                   -> HTTP 503 / gRPC UNAVAILABLE
+
+Usage:
+    faults = FaultInjector(latency_ms=20, jitter_ms=5, error_rate=0.01, rate_limit=100)
+    fault = faults.inject()   # None, THROTTLED or UNAVAILABLE
+"""
+
+import argparse
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+THROTTLED = "throttled"
+UNAVAILABLE = "unavailable"
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `rate` tokens/s."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Initialize a full bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens (burst size, default: one second's worth)
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        """Take one token; returns False if the bucket is empty."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class FaultInjector:
+    """Decides, per request, how long to wait and whether to fail."""
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit: Optional[float] = None,
+        burst: Optional[float] = None,
+        seed: Optional[int] = None
+    ):
+        """
+        Initialize injector.
+
+        Args:
+            latency_ms: Added latency per request in milliseconds
+            jitter_ms: Uniform random extra latency, 0..jitter_ms
+            error_rate: Probability (0-1) that a request fails as unavailable
+            rate_limit: Requests per second before throttling (optional)
+            burst: Token bucket size for rate_limit (optional)
+            seed: Random seed for reproducible runs (optional)
+        """
+        if not 0 <= error_rate <= 1:
+            raise ValueError(f"error_rate must be between 0 and 1, got {error_rate}")
+
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self._bucket = TokenBucket(rate_limit, burst) if rate_limit else None
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        self.requests = 0
+        self.throttled = 0
+        self.failed = 0
+
+    def inject(self) -> Optional[str]:
+        """
+        Apply the configured latency and pick the request's fate.
+
+        Throttled requests are rejected immediately, like a real quota check.
+
+        Returns:
+            None to serve the request normally, THROTTLED or UNAVAILABLE
+        """
+        with self._lock:
+            self.requests += 1
+            jitter = self._random.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0
+            fail = self.error_rate > 0 and self._random.random() < self.error_rate
+
+        if self._bucket is not None and not self._bucket.take():
+            with self._lock:
+                self.throttled += 1
+            return THROTTLED
+
+        delay = (self.latency_ms + jitter) / 1000
+        if delay > 0:
+            time.sleep(delay)
+
+        if fail:
+            with self._lock:
+                self.failed += 1
+            return UNAVAILABLE
+
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Requests seen and how many were throttled or failed."""
+        with self._lock:
+            return {"requests": self.requests, "throttled": self.throttled, "failed": self.failed}
+
+
+def add_fault_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add --latency-ms/--jitter-ms/--error-rate/--rate-limit/--burst/--seed."""
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="Added latency per request in ms (default: 0)")
+    parser.add_argument("--jitter-ms", type=float, default=0.0,
+                        help="Random extra latency, 0..N ms (default: 0)")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fraction of requests failing as unavailable (default: 0)")
+    parser.add_argument("--rate-limit", type=float, default=None,
+                        help="Requests per second before throttling (default: unlimited)")
+    parser.add_argument("--burst", type=float, default=None,
+                        help="Burst size for --rate-limit (default: one second's worth)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Random seed for reproducible fault injection")
+
+
+def fault_injector_from_args(args: argparse.Namespace) -> FaultInjector:
+    """Build a FaultInjector from arguments added by add_fault_arguments."""
+    return FaultInjector(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        burst=args.burst,
+        seed=args.seed,
+    )
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Process-wide pool of Cloud Storage clients.
+
+Calling `storage.Client()` repeats credential discovery, the OAuth token fetch
+and HTTP session setup every time. This module builds one client per
+(credentials path, project) pair, backs it with an `AuthorizedSession` whose
+connection pool is large enough for parallel uploads, and hands the same
+instance to every caller so repeated uploads reuse warm keep-alive TCP/TLS
+connections.
+
+Set STORAGE_EMULATOR_HOST (e.g. http://localhost:9023, see gcs_emulator.py)
+to send everything to a local emulator with anonymous credentials.
+
+Usage:
+    from gcs_client_pool import get_storage_client
+
+    client = get_storage_client()  # uses GOOGLE_APPLICATION_CREDENTIALS / ADC
+    client.bucket("my-bucket").blob("file.txt").upload_from_filename("file.txt")
+"""
+
+import os
+import threading
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+# google-cloud-storage and google-auth are imported where they are first
+# needed, so importing this module (and CLIs built on it) stays cheap
+if TYPE_CHECKING:
+    from google.auth.transport.requests import AuthorizedSession
+    from google.cloud import storage
+
+
+# Connections kept alive per host. Should be at least the number of threads
+# sharing one client, otherwise urllib3 discards connections after each use.
+DEFAULT_POOL_SIZE = 32
+
+# Project used when talking to an emulator without a configured project
+EMULATOR_PROJECT = "emulator-project"
+
+_PoolKey = Tuple[Optional[str], Optional[str]]
+
+_lock = threading.Lock()
+_clients: Dict[_PoolKey, "storage.Client"] = {}
+_sessions: Dict[_PoolKey, "AuthorizedSession"] = {}
+
+
+def _load_credentials(credentials_path: Optional[str]):
+    """Load credentials from a key file, or fall back to Application Default Credentials."""
+    import google.auth
+    from google.cloud import storage
+    from google.oauth2 import service_account
+
+    if credentials_path:
+        credentials = service_account.Credentials.from_service_account_file(
+            credentials_path, scopes=storage.Client.SCOPE
+        )
+        return credentials, credentials.project_id
+
+    return google.auth.default(scopes=storage.Client.SCOPE)
+
+
+def resolve_api_endpoint(api_endpoint: Optional[str] = None) -> Optional[str]:
+    """
+    Pick the JSON API endpoint override, if any.
+
+    Args:
+        api_endpoint: Explicit endpoint (optional, defaults to STORAGE_EMULATOR_HOST)
+
+    Returns:
+        Endpoint URL with a scheme (plain hosts get http://), or None for the
+        default Cloud Storage endpoint
+    """
+    api_endpoint = api_endpoint or os.environ.get("STORAGE_EMULATOR_HOST")
+    if not api_endpoint:
+        return None
+    if "://" not in api_endpoint:
+        api_endpoint = f"http://{api_endpoint}"
+    return api_endpoint.rstrip("/")
+
+
+def is_emulator_endpoint(api_endpoint: Optional[str]) -> bool:
+    """Plain-HTTP endpoints are local emulators, which need no credentials."""
+    return bool(api_endpoint) and api_endpoint.startswith("http://")
+
+
+def build_authorized_session(credentials, pool_size: int = DEFAULT_POOL_SIZE) -> "AuthorizedSession":
+    """
+    Create an authenticated HTTP session with a keep-alive connection pool.
+
+    Args:
+        credentials: google.auth credentials used to sign requests
+        pool_size: Maximum number of pooled connections per host
+
+    Returns:
+        AuthorizedSession that refreshes tokens automatically
+    """
+    from google.auth.transport.requests import AuthorizedSession
+    from requests.adapters import HTTPAdapter
+
+    session = AuthorizedSession(credentials)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def build_storage_client(
+    credentials_path: Optional[str] = None,
+    project: Optional[str] = None,
+    pool_size: int = DEFAULT_POOL_SIZE,
+    api_endpoint: Optional[str] = None,
+) -> Tuple["storage.Client", "AuthorizedSession"]:
+    """
+    Build a new (uncached) storage client and the session backing it.
+
+    Args:
+        credentials_path: Service account key file (optional, defaults to ADC)
+        project: GCP project ID (optional, defaults to the credentials' project)
+        pool_size: Maximum number of pooled connections per host
+        api_endpoint: JSON API endpoint override (optional, defaults to
+            STORAGE_EMULATOR_HOST); plain-HTTP endpoints use anonymous credentials
+
+    Returns:
+        Tuple of (storage.Client, AuthorizedSession)
+    """
+    from google.cloud import storage
+
+    api_endpoint = resolve_api_endpoint(api_endpoint)
+    if is_emulator_endpoint(api_endpoint):
+        from google.auth.credentials import AnonymousCredentials
+
+        credentials, default_project = AnonymousCredentials(), EMULATOR_PROJECT
+    else:
+        credentials, default_project = _load_credentials(credentials_path)
+
+    session = build_authorized_session(credentials, pool_size)
+    client = storage.Client(
+        project=project or default_project,
+        credentials=credentials,
+        _http=session,
+        client_options={"api_endpoint": api_endpoint} if api_endpoint else None,
+    )
+    return client, session
+
+
+def _pool_key(credentials_path: Optional[str], project: Optional[str]) -> _PoolKey:
+    if credentials_path is None:
+        credentials_path = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS") or None
+    return credentials_path, project
+
+
+def _get_or_build(credentials_path: Optional[str], project: Optional[str]) -> _PoolKey:
+    key = _pool_key(credentials_path, project)
+    with _lock:
+        if key not in _clients:
+            client, session = build_storage_client(*key)
+            _clients[key] = client
+            _sessions[key] = session
+    return key
+
+
+def get_storage_client(
+    credentials_path: Optional[str] = None,
+    project: Optional[str] = None,
+) -> "storage.Client":
+    """
+    Get the shared storage client for a credentials path and project.
+
+    The first call for a key builds the client; later calls return the same
+    instance. `storage.Client` is safe to share between threads.
+
+    Args:
+        credentials_path: Service account key file (defaults to
+            GOOGLE_APPLICATION_CREDENTIALS, then Application Default Credentials)
+        project: GCP project ID (optional)
+
+    Returns:
+        Shared storage.Client
+    """
+    key = _get_or_build(credentials_path, project)
+    return _clients[key]
+
+
+def get_authorized_session(
+    credentials_path: Optional[str] = None,
+    project: Optional[str] = None,
+) -> "AuthorizedSession":
+    """
+    Get the pooled HTTP session behind the shared client for raw JSON API calls.
+
+    Args:
+        credentials_path: Service account key file (optional)
+        project: GCP project ID (optional)
+
+    Returns:
+        AuthorizedSession shared with `get_storage_client()` for the same key
+    """
+    key = _get_or_build(credentials_path, project)
+    return _sessions[key]
+
+
+def clear_client_pool() -> None:
+    """Close and forget every pooled client (e.g. after a key rotation)."""
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _clients.clear()
+        _sessions.clear()
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Pluggable metrics/tracing hooks for the clients in the GCP tutorials.
+
+Secret access, the secret caches and file readers, and every upload report
+spans, counters and histograms through the current Instrumentation:
+
+    • Instrumentation (default): does nothing; hot paths check `enabled`
+      and skip building attributes, so the hooks cost one attribute read
+    • RecordingInstrumentation: keeps counters and latency distributions in
+      memory, e.g. for benchmarks or a /debug endpoint
+    • OpenTelemetryInstrumentation: forwards to the OpenTelemetry API, so
+      whatever SDK/exporter the application configures receives them
+
+Every span also records its duration in milliseconds to the histogram
+"<span name>.duration", tagged with `metric_attributes` and the outcome
+(ok/error). Keep high-cardinality values such as object names out of
+metric attributes; put them on the span instead.
+
+Usage:
+    from instrumentation import OpenTelemetryInstrumentation, set_instrumentation
+    set_instrumentation(OpenTelemetryInstrumentation())
+
+    # Or inspect in-process
+    recorder = RecordingInstrumentation()
+    set_instrumentation(recorder)
+    ...
+    print(recorder.snapshot())
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+Attributes = Dict[str, Any]
+
+# Latency samples kept per histogram series by RecordingInstrumentation
+DEFAULT_MAX_SAMPLES = 10000
+
+
+class Span:
+    """A unit of work; the default implementation ignores everything."""
+
+    def __enter__(self) -> "Span":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach an attribute to the span (not to its duration metric)."""
+
+
+_NOOP_SPAN = Span()
+
+
+class Instrumentation:
+    """No-op hooks, the default. Subclasses record."""
+
+    enabled = False
+
+    def span(
+        self,
+        name: str,
+        attributes: Optional[Attributes] = None,
+        metric_attributes: Optional[Attributes] = None
+    ) -> Span:
+        """
+        Trace a unit of work and record its duration.
+
+        Args:
+            name: Span name, e.g. "secretmanager.access_secret_version"
+            attributes: Span attributes
+            metric_attributes: Low-cardinality attributes for the duration metric
+
+        Returns:
+            Span to use as a context manager
+        """
+        return _NOOP_SPAN
+
+    def add(self, name: str, value: float = 1, attributes: Optional[Attributes] = None) -> None:
+        """Increment a counter."""
+
+    def record(self, name: str, value: float, attributes: Optional[Attributes] = None) -> None:
+        """Record a histogram value (durations in ms, sizes in bytes)."""
+
+
+class _TimedSpan(Span):
+    """Span that reports its duration and outcome back to its Instrumentation."""
+
+    def __init__(self, owner: Instrumentation, name: str, metric_attributes: Optional[Attributes]):
+        self._owner = owner
+        self._name = name
+        self._metric_attributes = metric_attributes
+        self._started = 0.0
+
+    def __enter__(self) -> "_TimedSpan":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        elapsed_ms = (time.perf_counter() - self._started) * 1000
+        attributes = dict(self._metric_attributes or {})
+        attributes["outcome"] = "ok" if exc_type is None else "error"
+        self._owner.record(f"{self._name}.duration", elapsed_ms, attributes)
+        return False
+
+
+def _series_key(attributes: Optional[Attributes]) -> str:
+    if not attributes:
+        return ""
+    return ",".join(f"{key}={attributes[key]}" for key in sorted(attributes))
+
+
+def _percentile(ordered, pct: float) -> float:
+    return ordered[max(1, math.ceil(pct / 100 * len(ordered))) - 1]
+
+
+class _Histogram:
+    def __init__(self, max_samples: int):
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.samples: Deque[float] = deque(maxlen=max_samples)
+
+    def record(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.samples.append(value)
+
+    def summary(self) -> Dict[str, float]:
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 4),
+            "min": round(self.min, 4),
+            "max": round(self.max, 4),
+            "p50": round(_percentile(ordered, 50), 4),
+            "p95": round(_percentile(ordered, 95), 4),
+            "p99": round(_percentile(ordered, 99), 4),
+        }
+
+
+class RecordingInstrumentation(Instrumentation):
+    """Thread-safe in-memory counters and histograms."""
+
+    enabled = True
+
+    def __init__(self, max_samples: int = DEFAULT_MAX_SAMPLES):
+        """
+        Initialize recorder.
+
+        Args:
+            max_samples: Most recent values kept per histogram series for
+                percentiles (count/sum/min/max cover every value)
+        """
+        self.max_samples = max_samples
+        self._counters: Dict[str, Dict[str, float]] = {}
+        self._histograms: Dict[str, Dict[str, _Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def span(
+        self,
+        name: str,
+        attributes: Optional[Attributes] = None,
+        metric_attributes: Optional[Attributes] = None
+    ) -> Span:
+        return _TimedSpan(self, name, metric_attributes)
+
+    def add(self, name: str, value: float = 1, attributes: Optional[Attributes] = None) -> None:
+        key = _series_key(attributes)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def record(self, name: str, value: float, attributes: Optional[Attributes] = None) -> None:
+        key = _series_key(attributes)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(self.max_samples)
+            histogram.record(value)
+
+    def counter(self, name: str, attributes: Optional[Attributes] = None) -> float:
+        """Current value of one counter series (0 if never incremented)."""
+        with self._lock:
+            return self._counters.get(name, {}).get(_series_key(attributes), 0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Everything recorded so far.
+
+        Returns:
+            {"counters": {name: {series: value}},
+             "histograms": {name: {series: {count, sum, min, max, p50, p95, p99}}}},
+            where series is "key=value,..." of the attributes ("" for none)
+        """
+        with self._lock:
+            return {
+                "counters": {name: dict(series) for name, series in self._counters.items()},
+                "histograms": {
+                    name: {key: histogram.summary() for key, histogram in series.items()}
+                    for name, series in self._histograms.items()
+                },
+            }
+
+    def reset(self) -> None:
+        """Forget everything recorded so far."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+class _OpenTelemetrySpan(_TimedSpan):
+    def __init__(self, owner: "OpenTelemetryInstrumentation", name: str,
+                 attributes: Optional[Attributes], metric_attributes: Optional[Attributes]):
+        super().__init__(owner, name, metric_attributes)
+        self._context = owner._tracer.start_as_current_span(name, attributes=attributes)
+        self._span = None
+
+    def __enter__(self) -> "_OpenTelemetrySpan":
+        self._span = self._context.__enter__()
+        return super().__enter__()
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        super().__exit__(exc_type, exc, tb)
+        # Records the exception and sets an error status, then ends the span
+        return bool(self._context.__exit__(exc_type, exc, tb))
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if self._span is not None:
+            self._span.set_attribute(key, value)
+
+
+class OpenTelemetryInstrumentation(Instrumentation):
+    """Forwards spans and metrics to the OpenTelemetry API."""
+
+    enabled = True
+
+    def __init__(self, name: str = "gcp-tutorial", tracer_provider=None, meter_provider=None):
+        """
+        Initialize from the global (or given) tracer and meter providers.
+
+        Args:
+            name: Instrumentation scope name
+            tracer_provider: TracerProvider (optional, defaults to the global one)
+            meter_provider: MeterProvider (optional, defaults to the global one)
+
+        Raises:
+            ImportError: If opentelemetry-api is not installed
+        """
+        try:
+            from opentelemetry import metrics, trace
+        except ImportError:
+            raise ImportError(
+                "OpenTelemetry is not installed. Install it with: "
+                "pip install opentelemetry-api opentelemetry-sdk"
+            ) from None
+
+        self._tracer = trace.get_tracer(name, tracer_provider=tracer_provider)
+        self._meter = metrics.get_meter(name, meter_provider=meter_provider)
+        self._counters: Dict[str, Any] = {}
+        self._histograms: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def span(
+        self,
+        name: str,
+        attributes: Optional[Attributes] = None,
+        metric_attributes: Optional[Attributes] = None
+    ) -> Span:
+        return _OpenTelemetrySpan(self, name, attributes, metric_attributes)
+
+    def add(self, name: str, value: float = 1, attributes: Optional[Attributes] = None) -> None:
+        counter = self._counters.get(name)
+        if counter is None:
+            unit = "By" if "bytes" in name else "1"
+            with self._lock:
+                counter = self._counters.get(name) or self._meter.create_counter(name, unit=unit)
+                self._counters[name] = counter
+        counter.add(value, attributes)
+
+    def record(self, name: str, value: float, attributes: Optional[Attributes] = None) -> None:
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            unit = "ms" if name.endswith(".duration") else "By"
+            with self._lock:
+                histogram = self._histograms.get(name) or self._meter.create_histogram(name, unit=unit)
+                self._histograms[name] = histogram
+        histogram.record(value, attributes)
+
+
+_current: Instrumentation = Instrumentation()
+
+
+def get_instrumentation() -> Instrumentation:
+    """The Instrumentation hooks report to (no-op unless one was set)."""
+    return _current
+
+
+def set_instrumentation(instrumentation: Optional[Instrumentation]) -> Instrumentation:
+    """
+    Replace the process-wide Instrumentation.
+
+    Args:
+        instrumentation: New hooks, or None to restore the no-op default
+
+    Returns:
+        The previous Instrumentation
+    """
+    global _current
+    previous = _current
+    _current = instrumentation or Instrumentation()
+    return previous
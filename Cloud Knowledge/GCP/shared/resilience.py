@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Retries with backoff, deadline budgets and a circuit breaker.
+
+Shared by secret access and uploads so both degrade the same way when the
+backend is having a bad time:
+
+    • RetryPolicy: retries transient failures with capped exponential backoff
+      and full jitter (sleep uniformly in [0, backoff]), so callers that failed
+      together don't retry together; call_async does the same for coroutines
+    • Deadline: one time budget per call across all attempts; no retry starts
+      if its backoff would not finish before the budget runs out, and each
+      attempt is told how much time is left (use it as the RPC timeout)
+    • is_retryable: network errors, timeouts, 408/429/5xx and their gRPC
+      equivalents; NotFound, PermissionDenied, bad requests... fail at once
+    • CircuitBreaker: after `failure_threshold` consecutive transient failures
+      it opens and calls fail immediately with CircuitOpenError for
+      `reset_timeout` seconds, then one trial call decides whether it closes
+
+Without a breaker, a dependency outage holds every caller for the full
+deadline; with one, callers fail (or fall back to a cached value) in
+microseconds and threads don't pile up. CircuitOpenError is a
+ConnectionError, so callers that already treat connection failures as
+"unavailable" (e.g. serving stale secrets) handle it without changes.
+
+Retries and breaker state changes are reported through instrumentation
+("retry.attempts", "circuit_breaker.transitions", "circuit_breaker.rejected").
+
+Usage:
+    policy = RetryPolicy(max_attempts=4, initial_backoff=0.1, deadline=10)
+    breaker = CircuitBreaker("secretmanager", failure_threshold=5, reset_timeout=30)
+    value = policy.call(lambda timeout: fetch(timeout=timeout), breaker=breaker,
+                        operation_name="secretmanager.access")
+"""
+
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from instrumentation import get_instrumentation
+
+T = TypeVar("T")
+
+# HTTP statuses worth retrying (gRPC errors from google-api-core carry the
+# equivalent HTTP code: UNAVAILABLE is 503, DEADLINE_EXCEEDED 504, ...)
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+# requests/urllib3 network errors don't derive from the builtin ConnectionError
+_RETRYABLE_ERROR_NAMES = frozenset({
+    "ConnectionError", "Timeout", "ConnectTimeout", "ReadTimeout",
+    "ChunkedEncodingError", "ProtocolError",
+})
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised instead of calling a backend whose circuit breaker is open."""
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a call's time budget ran out before it could be attempted."""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Whether an error is transient, i.e. the same call may succeed later.
+
+    Args:
+        error: Exception raised by an attempt
+
+    Returns:
+        True for network errors, timeouts and 408/429/5xx responses
+    """
+    if isinstance(error, (CircuitOpenError, DeadlineExceeded)):
+        return False
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+
+    code = getattr(error, "code", None)
+    if isinstance(code, int):
+        return code in RETRYABLE_STATUS_CODES
+
+    return any(
+        cls.__name__ in _RETRYABLE_ERROR_NAMES and cls.__module__.startswith(("requests", "urllib3"))
+        for cls in type(error).__mro__
+    )
+
+
+class Deadline:
+    """A point in time by which a call must be finished."""
+
+    def __init__(self, seconds: Optional[float] = None):
+        """
+        Start the budget now.
+
+        Args:
+            seconds: Budget in seconds (None for no limit)
+        """
+        self.expires = math.inf if seconds is None else time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """Seconds left (never negative; inf without a limit)."""
+        return max(0.0, self.expires - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() == 0.0
+
+    def timeout(self) -> Optional[float]:
+        """Seconds left as a per-request timeout (None without a limit)."""
+        remaining = self.remaining()
+        return None if remaining == math.inf else remaining
+
+
+class CircuitBreaker:
+    """
+    Thread-safe consecutive-failure circuit breaker.
+
+    closed: calls pass; transient failures are counted, successes reset the count
+    open: calls are rejected until `reset_timeout` has passed
+    half-open: up to `half_open_max_calls` trial calls pass; a success closes
+        the circuit, a failure opens it again
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str = "default",
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1
+    ):
+        """
+        Initialize a closed breaker.
+
+        Args:
+            name: Backend name, used in errors and metrics
+            failure_threshold: Consecutive transient failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a trial call
+            half_open_max_calls: Concurrent trial calls allowed while half-open
+        """
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trials = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open_locked()
+            return self._state
+
+    def _transition_locked(self, state: str) -> None:
+        self._state = state
+        if state == self.OPEN:
+            self._opened_at = time.monotonic()
+        if state != self.CLOSED:
+            self._trials = 0
+        get_instrumentation().add("circuit_breaker.transitions", 1,
+                                  {"breaker": self.name, "state": state})
+
+    def _maybe_half_open_locked(self) -> None:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._transition_locked(self.HALF_OPEN)
+
+    def before_call(self) -> None:
+        """
+        Reserve permission to call the backend.
+
+        Raises:
+            CircuitOpenError: The circuit is open (or half-open with a trial
+                call already in flight)
+        """
+        with self._lock:
+            self._maybe_half_open_locked()
+            if self._state == self.CLOSED:
+                return
+            if self._state == self.HALF_OPEN and self._trials < self.half_open_max_calls:
+                self._trials += 1
+                return
+            retry_in = max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+        get_instrumentation().add("circuit_breaker.rejected", 1, {"breaker": self.name})
+        raise CircuitOpenError(f"Circuit breaker '{self.name}' is open; "
+                               f"failing fast (next trial in {retry_in:.1f}s)")
+
+    def record_success(self) -> None:
+        """The backend answered (possibly with a non-transient error)."""
+        with self._lock:
+            self._failures = 0
+            if self._state != self.CLOSED:
+                self._transition_locked(self.CLOSED)
+
+    def record_failure(self) -> None:
+        """The backend failed transiently."""
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or (
+                self._state == self.CLOSED and self._failures >= self.failure_threshold
+            ):
+                self._transition_locked(self.OPEN)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    How often and how patiently to retry one call.
+
+    Attributes:
+        max_attempts: Total attempts including the first (1 disables retries)
+        initial_backoff: Backoff ceiling in seconds before the first retry
+        max_backoff: Upper bound for the backoff ceiling
+        multiplier: Growth of the backoff ceiling per retry
+        deadline: Time budget in seconds for all attempts together (None for
+            no limit)
+        retryable: Decides which errors are retried
+    """
+
+    max_attempts: int = 4
+    initial_backoff: float = 0.1
+    max_backoff: float = 5.0
+    multiplier: float = 2.0
+    deadline: Optional[float] = 30.0
+    retryable: Callable[[BaseException], bool] = is_retryable
+
+    def backoff(self, retry: int) -> float:
+        """Full-jitter delay in seconds before retry number `retry` (1-based)."""
+        ceiling = min(self.max_backoff, self.initial_backoff * self.multiplier ** (retry - 1))
+        return random.uniform(0, ceiling)
+
+    def call(
+        self,
+        operation: Callable[[Optional[float]], T],
+        breaker: Optional[CircuitBreaker] = None,
+        deadline: Optional[Deadline] = None,
+        operation_name: str = "call",
+        on_retry: Optional[Callable[[int, BaseException, float], None]] = None
+    ) -> T:
+        """
+        Run `operation`, retrying transient failures.
+
+        Args:
+            operation: Callable receiving the seconds left in the budget
+                (None without a limit), to use as its request timeout
+            breaker: Circuit breaker guarding the backend (optional)
+            deadline: Budget shared with the caller (default: a new one of
+                `self.deadline` seconds)
+            operation_name: Name used in metrics
+            on_retry: Called with (attempt, error, delay) before each retry
+
+        Returns:
+            What `operation` returned
+
+        Raises:
+            CircuitOpenError: The breaker rejected the call
+            DeadlineExceeded: The budget ran out before the first attempt
+            Exception: The last attempt's error, once it isn't retryable, the
+                attempts are used up, or the next backoff would overrun the budget
+        """
+        deadline = deadline or Deadline(self.deadline)
+        attempt = 0
+
+        while True:
+            self._before_attempt(breaker, deadline, operation_name)
+            attempt += 1
+            try:
+                result = operation(deadline.timeout())
+            except Exception as e:
+                time.sleep(self._retry_delay(e, attempt, breaker, deadline, operation_name, on_retry))
+                continue
+
+            if breaker is not None:
+                breaker.record_success()
+            return result
+
+    async def call_async(
+        self,
+        operation: Callable[[Optional[float]], Awaitable[T]],
+        breaker: Optional[CircuitBreaker] = None,
+        deadline: Optional[Deadline] = None,
+        operation_name: str = "call",
+        on_retry: Optional[Callable[[int, BaseException, float], None]] = None
+    ) -> T:
+        """
+        Like call(), for a coroutine function; backoff doesn't block the event loop.
+
+        Args:
+            operation: Async callable receiving the seconds left in the budget
+            breaker, deadline, operation_name, on_retry: As for call()
+
+        Returns:
+            What `operation` returned
+        """
+        # Only coroutine callers pay for importing asyncio
+        import asyncio
+
+        deadline = deadline or Deadline(self.deadline)
+        attempt = 0
+
+        while True:
+            self._before_attempt(breaker, deadline, operation_name)
+            attempt += 1
+            try:
+                result = await operation(deadline.timeout())
+            except Exception as e:
+                await asyncio.sleep(
+                    self._retry_delay(e, attempt, breaker, deadline, operation_name, on_retry)
+                )
+                continue
+
+            if breaker is not None:
+                breaker.record_success()
+            return result
+
+    @staticmethod
+    def _before_attempt(breaker: Optional[CircuitBreaker], deadline: Deadline, operation_name: str) -> None:
+        if deadline.expired:
+            raise DeadlineExceeded(f"No time left to attempt {operation_name}")
+        if breaker is not None:
+            breaker.before_call()
+
+    def _retry_delay(
+        self,
+        error: Exception,
+        attempt: int,
+        breaker: Optional[CircuitBreaker],
+        deadline: Deadline,
+        operation_name: str,
+        on_retry: Optional[Callable[[int, BaseException, float], None]]
+    ) -> float:
+        """Record a failed attempt; return the backoff before the next one, or re-raise."""
+        retryable = self.retryable(error)
+        if breaker is not None:
+            # Non-transient errors (NotFound, ...) mean the backend is up
+            if retryable:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+
+        if not retryable or attempt >= self.max_attempts:
+            raise error
+        delay = self.backoff(attempt)
+        if delay >= deadline.remaining():
+            raise error
+
+        get_instrumentation().add("retry.attempts", 1,
+                                  {"operation": operation_name, "error": type(error).__name__})
+        if on_retry is not None:
+            on_retry(attempt, error, delay)
+        return delay
+
+
+# Single attempt, no budget: the behaviour before retries were added
+NO_RETRY = RetryPolicy(max_attempts=1, deadline=None)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Startup-time budget check for the tutorials' CLI entry points.
+
+Init containers and CronJobs pay interpreter startup plus every module-level
+import on each run. The Google client libraries (and gRPC/protobuf under
+them) dwarf everything else, so the entry points only import them once a
+client is actually built. This script keeps it that way: each target runs in
+a fresh interpreter with `python -X importtime`, and the check fails if
+
+    • the total import time exceeds the budget, or
+    • a heavy client library is imported just to start up (e.g. for --help)
+
+Each tutorial's bench_startup.py lists its own entry points and hands them
+to run_startup_check.
+
+Usage:
+    sys.exit(run_startup_check(CODE_DIR, ["upload_to_gcs.py --help"]))
+"""
+
+import argparse
+import json
+import shlex
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+DEFAULT_BUDGET_MS = 150.0
+DEFAULT_RUNS = 5
+
+# Modules that must not be imported at startup
+HEAVY_MODULES = (
+    "google.cloud.storage",
+    "google.cloud.secretmanager",
+    "google.api_core",
+    "google.auth",
+    "google.oauth2",
+    "google.protobuf",
+    "grpc",
+    "proto",
+    "requests",
+    "urllib3",
+)
+
+
+def _is_heavy(module: str) -> bool:
+    return any(module == heavy or module.startswith(heavy + ".") for heavy in HEAVY_MODULES)
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """
+    Parse `-X importtime` output.
+
+    Returns:
+        Mapping of module name to its self import time in microseconds
+    """
+    modules: Dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, _cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(self_us)
+    return modules
+
+
+def measure(target: str, runs: int, code_dir: Path) -> Dict[str, Any]:
+    """
+    Run one target `runs` times and summarize its startup cost.
+
+    Args:
+        target: Interpreter arguments, e.g. "upload_to_gcs.py --help"
+        runs: Number of fresh interpreter runs (the median is reported)
+        code_dir: Directory the interpreter is started in
+
+    Returns:
+        Dictionary with wall/import times in ms, heavy modules and slowest imports
+    """
+    command = [sys.executable, "-X", "importtime"] + shlex.split(target)
+    wall_ms: List[float] = []
+    import_ms: List[float] = []
+    modules: Dict[str, int] = {}
+
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = subprocess.run(command, cwd=code_dir, capture_output=True, text=True)
+        wall_ms.append((time.perf_counter() - started) * 1000)
+
+        if result.returncode != 0:
+            raise RuntimeError(f"'{target}' exited with {result.returncode}:\n{result.stderr[-2000:]}")
+
+        modules = parse_importtime(result.stderr)
+        import_ms.append(sum(modules.values()) / 1000)
+
+    slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:5]
+    return {
+        "target": target,
+        "wall_ms": round(statistics.median(wall_ms), 1),
+        "import_ms": round(statistics.median(import_ms), 1),
+        "modules": len(modules),
+        "heavy_modules": sorted(name for name in modules if _is_heavy(name)),
+        "slowest_imports": [{"module": name, "self_ms": round(us / 1000, 1)} for name, us in slowest],
+    }
+
+
+def run_startup_check(code_dir: Path, default_targets: List[str],
+                      argv: Optional[List[str]] = None) -> int:
+    """
+    Run the benchmark and enforce the budget.
+
+    Args:
+        code_dir: Directory the targets are run from
+        default_targets: Interpreter arguments measured without --target
+        argv: Command-line arguments (default: sys.argv[1:])
+
+    Returns:
+        Process exit code: 1 if any target is over budget, else 0
+    """
+    parser = argparse.ArgumentParser(description="Check CLI startup time against a budget")
+    parser.add_argument("--target", action="append",
+                        help="Interpreter arguments to measure (repeatable; default: the CLI entry points)")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"Maximum total import time per target (default: {DEFAULT_BUDGET_MS:.0f})")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS,
+                        help=f"Runs per target; the median is used (default: {DEFAULT_RUNS})")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = [measure(target, args.runs, code_dir) for target in args.target or default_targets]
+    failed = False
+    for result in results:
+        result["within_budget"] = result["import_ms"] <= args.budget_ms and not result["heavy_modules"]
+        failed = failed or not result["within_budget"]
+
+    if args.json:
+        print(json.dumps({"budget_ms": args.budget_ms, "results": results}, indent=2))
+        return 1 if failed else 0
+
+    for result in results:
+        mark = "✓" if result["within_budget"] else "✗"
+        print(f"{mark} {result['target']}: {result['import_ms']:.1f} ms imports "
+              f"({result['modules']} modules), {result['wall_ms']:.1f} ms wall "
+              f"[budget {args.budget_ms:.0f} ms]")
+        for entry in result["slowest_imports"]:
+            print(f"    {entry['self_ms']:6.1f} ms  {entry['module']}")
+        if result["heavy_modules"]:
+            print(f"  ✗ Heavy modules imported at startup: {', '.join(result['heavy_modules'])}",
+                  file=sys.stderr)
+
+    return 1 if failed else 0
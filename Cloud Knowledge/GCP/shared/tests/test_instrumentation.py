@@ -0,0 +1,94 @@
+"""Tests for instrumentation.py."""
+
+import pytest
+
+from instrumentation import (
+    Instrumentation,
+    RecordingInstrumentation,
+    get_instrumentation,
+    set_instrumentation,
+)
+from resilience import CircuitBreaker, CircuitOpenError, RetryPolicy
+
+
+@pytest.fixture
+def recorder():
+    recorder = RecordingInstrumentation()
+    previous = set_instrumentation(recorder)
+    yield recorder
+    set_instrumentation(previous)
+
+
+def test_default_is_a_noop():
+    hooks = get_instrumentation()
+
+    assert type(hooks) is Instrumentation and not hooks.enabled
+    with hooks.span("work", {"key": "value"}) as span:
+        span.set_attribute("key", "value")
+    hooks.add("counter")
+    hooks.record("histogram", 1.0)
+
+
+def test_set_instrumentation_returns_previous_and_none_restores_default():
+    recorder = RecordingInstrumentation()
+    previous = set_instrumentation(recorder)
+    try:
+        assert get_instrumentation() is recorder
+    finally:
+        assert set_instrumentation(None) is recorder
+    assert type(get_instrumentation()) is Instrumentation
+    set_instrumentation(previous)
+
+
+def test_counters_are_kept_per_attribute_series(recorder):
+    recorder.add("requests", 1, {"route": "a", "code": 200})
+    recorder.add("requests", 2, {"code": 200, "route": "a"})
+    recorder.add("requests")
+
+    assert recorder.counter("requests", {"route": "a", "code": 200}) == 3
+    assert recorder.counter("requests") == 1
+    assert recorder.counter("never") == 0
+    assert recorder.snapshot()["counters"] == {"requests": {"code=200,route=a": 3, "": 1}}
+
+
+def test_span_records_duration_and_outcome(recorder):
+    with recorder.span("work", {"object": "high-cardinality"}, {"kind": "a"}):
+        pass
+    with pytest.raises(KeyError):
+        with recorder.span("work", metric_attributes={"kind": "a"}):
+            raise KeyError("boom")
+
+    durations = recorder.snapshot()["histograms"]["work.duration"]
+    assert set(durations) == {"kind=a,outcome=ok", "kind=a,outcome=error"}
+    assert durations["kind=a,outcome=ok"]["count"] == 1
+
+
+def test_histogram_summary_and_reset():
+    recorder = RecordingInstrumentation(max_samples=10)
+    for value in range(1, 101):
+        recorder.record("size", value)
+
+    summary = recorder.snapshot()["histograms"]["size"][""]
+    assert (summary["count"], summary["sum"], summary["min"], summary["max"]) == (100, 5050, 1, 100)
+    # Percentiles come from the most recent max_samples values
+    assert summary["p50"] == 95
+
+    recorder.reset()
+    assert recorder.snapshot() == {"counters": {}, "histograms": {}}
+
+
+def test_resilience_reports_retries_and_breaker_transitions(recorder):
+    fast = RetryPolicy(max_attempts=2, initial_backoff=0.001, max_backoff=0.001, deadline=5)
+    breaker = CircuitBreaker("backend", failure_threshold=2, reset_timeout=60)
+
+    def fail(timeout):
+        raise ConnectionError("down")
+
+    with pytest.raises(ConnectionError):
+        fast.call(fail, breaker, operation_name="backend.get")
+    with pytest.raises(CircuitOpenError):
+        fast.call(fail, breaker, operation_name="backend.get")
+
+    assert recorder.counter("retry.attempts", {"operation": "backend.get", "error": "ConnectionError"}) == 1
+    assert recorder.counter("circuit_breaker.transitions", {"breaker": "backend", "state": "open"}) == 1
+    assert recorder.counter("circuit_breaker.rejected", {"breaker": "backend"}) == 1
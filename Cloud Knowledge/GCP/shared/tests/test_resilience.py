@@ -0,0 +1,166 @@
+"""Tests for resilience.py."""
+
+import asyncio
+
+import pytest
+
+from resilience import (
+    NO_RETRY,
+    CircuitBreaker,
+    CircuitOpenError,
+    Deadline,
+    DeadlineExceeded,
+    RetryPolicy,
+    is_retryable,
+)
+
+FAST = RetryPolicy(max_attempts=4, initial_backoff=0.001, max_backoff=0.001, deadline=5)
+
+
+class HTTPError(Exception):
+    def __init__(self, code):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+def flaky(failures, error=ConnectionError):
+    """Operation that fails `failures` times before returning "ok"."""
+    calls = []
+
+    def operation(timeout):
+        calls.append(timeout)
+        if len(calls) <= failures:
+            raise error("transient")
+        return "ok"
+
+    return operation, calls
+
+
+@pytest.mark.parametrize("error, expected", [
+    (ConnectionError(), True),
+    (TimeoutError(), True),
+    (HTTPError(503), True),
+    (HTTPError(429), True),
+    (HTTPError(404), False),
+    (ValueError(), False),
+    (CircuitOpenError(), False),
+    (DeadlineExceeded(), False),
+])
+def test_is_retryable(error, expected):
+    assert is_retryable(error) is expected
+
+
+def test_retries_transient_failures_until_success():
+    operation, calls = flaky(2)
+    retries = []
+    assert FAST.call(operation, on_retry=lambda *args: retries.append(args)) == "ok"
+    assert len(calls) == 3
+    assert [attempt for attempt, _, _ in retries] == [1, 2]
+    assert all(timeout is not None and timeout <= 5 for timeout in calls)
+
+
+def test_gives_up_after_max_attempts():
+    operation, calls = flaky(10)
+    with pytest.raises(ConnectionError):
+        FAST.call(operation)
+    assert len(calls) == FAST.max_attempts
+
+
+def test_non_retryable_error_fails_at_once():
+    operation, calls = flaky(1, error=ValueError)
+    with pytest.raises(ValueError):
+        FAST.call(operation)
+    assert len(calls) == 1
+
+
+def test_no_retry_runs_once_without_timeout():
+    operation, calls = flaky(1)
+    with pytest.raises(ConnectionError):
+        NO_RETRY.call(operation)
+    assert calls == [None]
+
+
+def test_backoff_that_overruns_deadline_stops_retrying(monkeypatch):
+    # Full jitter may pick a tiny delay, so force the worst case
+    monkeypatch.setattr(RetryPolicy, "backoff", lambda self, retry: self.initial_backoff)
+    policy = RetryPolicy(max_attempts=10, initial_backoff=60, max_backoff=60, deadline=0.05)
+    operation, calls = flaky(5)
+    with pytest.raises(ConnectionError):
+        policy.call(operation)
+    assert len(calls) == 1
+
+
+def test_expired_deadline_raises_before_attempting():
+    operation, calls = flaky(0)
+    with pytest.raises(DeadlineExceeded):
+        FAST.call(operation, deadline=Deadline(0))
+    assert calls == []
+
+
+def test_backoff_is_capped_full_jitter():
+    policy = RetryPolicy(initial_backoff=0.1, max_backoff=0.3, multiplier=2)
+    for retry in range(1, 10):
+        assert 0 <= policy.backoff(retry) <= min(0.3, 0.1 * 2 ** (retry - 1))
+
+
+def test_breaker_opens_after_threshold_and_rejects():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=60)
+    operation, calls = flaky(10)
+    with pytest.raises(ConnectionError):
+        NO_RETRY.call(operation, breaker=breaker)
+    assert breaker.state == CircuitBreaker.CLOSED
+    with pytest.raises(ConnectionError):
+        NO_RETRY.call(operation, breaker=breaker)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(CircuitOpenError):
+        NO_RETRY.call(operation, breaker=breaker)
+    assert len(calls) == 2
+
+
+def test_breaker_half_open_trial_closes_or_reopens():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    # One trial at a time while half-open
+    breaker.before_call()
+    breaker.reset_timeout = 60
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    breaker.reset_timeout = 0
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_non_transient_errors_count_as_backend_up():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    with pytest.raises(ValueError):
+        NO_RETRY.call(flaky(1, error=ValueError)[0], breaker=breaker)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_call_async_retries_and_feeds_the_breaker():
+    breaker = CircuitBreaker("test", failure_threshold=10, reset_timeout=60)
+    operation, calls = flaky(2)
+
+    async def async_operation(timeout):
+        return operation(timeout)
+
+    assert asyncio.run(FAST.call_async(async_operation, breaker=breaker)) == "ok"
+    assert len(calls) == 3
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=60)
+    operation, calls = flaky(1)
+    with pytest.raises(ConnectionError):
+        asyncio.run(NO_RETRY.call_async(async_operation, breaker=breaker))
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(NO_RETRY.call_async(async_operation, breaker=breaker))
+    assert len(calls) == 1
@@ -0,0 +1,23 @@
+"""Tests for startup_budget.py."""
+
+from startup_budget import parse_importtime, run_startup_check
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      2500 |       2620 | json
+"""
+
+
+def test_parse_importtime_reads_self_times():
+    assert parse_importtime(IMPORTTIME) == {"_io": 120, "json": 2500}
+
+
+def test_heavy_import_fails_the_check(tmp_path):
+    (tmp_path / "light.py").write_text("import json\n")
+    # Stand-in named like a heavy client library, found first from the cwd
+    (tmp_path / "grpc.py").write_text("")
+    args = ["--runs", "1", "--budget-ms", "10000"]
+
+    assert run_startup_check(tmp_path, ["light.py"], args) == 0
+    assert run_startup_check(tmp_path, ["-c 'import grpc'"], args) == 1